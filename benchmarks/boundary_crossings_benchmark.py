@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Count the calls into the _nassl extension (and the exceptions it raises) needed to perform one handshake.
+
+Compares the step-by-step loop (SSL.do_handshake() raising WantReadError, then BIO.pending(), BIO.read() and BIO.write()
+on the network BIO, which is how SslClient.do_handshake() used to work) with SslClient.do_handshake(), which relies on
+the single SSL.do_handshake_pump() call per round trip.
+
+Usage:
+    python benchmarks/boundary_crossings_benchmark.py HOST PORT [--handshakes N] [--tls-version VERSION]
+"""
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import argparse
+import os
+import socket
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from nassl import _nassl  # noqa: E402
+from nassl._nassl import WantReadError  # noqa: E402
+from nassl.ssl_client import OpenSslVersionEnum, OpenSslVerifyEnum, SslClient  # noqa: E402
+
+
+_NASSL_TYPES = (_nassl.SSL, _nassl.BIO, _nassl.SSL_CTX)
+
+
+class BoundaryCrossingsCounter(object):
+    """Profiling hook counting the calls to methods of _nassl objects.
+    """
+
+    def __init__(self):
+        self.calls_nb = 0
+        self.exceptions_nb = 0
+
+    def __call__(self, frame, event, arg):
+        if event in ('c_call', 'c_exception') and isinstance(getattr(arg, '__self__', None), _NASSL_TYPES):
+            if event == 'c_call':
+                self.calls_nb += 1
+            else:
+                self.exceptions_nb += 1
+
+
+def handshake_with_steps(ssl_client):
+    sock = ssl_client.get_underlying_socket()
+    while True:
+        try:
+            ssl_client._ssl.do_handshake()
+            return
+        except WantReadError:
+            # Send available handshake data to the peer
+            length_to_read = ssl_client._network_bio.pending()
+            while length_to_read:
+                sock.sendall(ssl_client._network_bio.read(length_to_read))
+                length_to_read = ssl_client._network_bio.pending()
+
+            # Pass the peer's response to the SSL engine
+            data = sock.recv(4096)
+            if not data:
+                raise IOError('Peer did not send data back.')
+            ssl_client._network_bio.write(data)
+
+
+def handshake_with_pump(ssl_client):
+    ssl_client.do_handshake()
+
+
+def run(host, port, handshakes_nb, ssl_version, handshake_function):
+    counter = BoundaryCrossingsCounter()
+    duration = 0.0
+    for _ in range(handshakes_nb):
+        sock = socket.create_connection((host, port), timeout=5)
+        ssl_client = SslClient(ssl_version=ssl_version, underlying_socket=sock, ssl_verify=OpenSslVerifyEnum.NONE)
+        try:
+            start = time.time()
+            sys.setprofile(counter)
+            try:
+                handshake_function(ssl_client)
+            finally:
+                sys.setprofile(None)
+            duration += time.time() - start
+        finally:
+            ssl_client.shutdown()
+            sock.close()
+
+    return counter.calls_nb / handshakes_nb, counter.exceptions_nb / handshakes_nb, handshakes_nb / duration
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Python/C boundary crossings per handshake.')
+    parser.add_argument('host')
+    parser.add_argument('port', type=int)
+    parser.add_argument('--handshakes', type=int, default=200)
+    parser.add_argument('--tls-version', default='TLSV1_2', choices=[v.name for v in OpenSslVersionEnum])
+    args = parser.parse_args()
+    ssl_version = OpenSslVersionEnum[args.tls_version]
+
+    print('{:>8} {:>14} {:>15} {:>14}'.format('loop', 'calls/hs', 'exceptions/hs', 'handshakes/s'))
+    for name, handshake_function in (('steps', handshake_with_steps), ('pump', handshake_with_pump)):
+        calls, exceptions, rate = run(args.host, args.port, args.handshakes, ssl_version, handshake_function)
+        print('{:>8} {:>14.1f} {:>15.1f} {:>14.1f}'.format(name, calls, exceptions, rate))
+
+
+if __name__ == '__main__':
+    main()
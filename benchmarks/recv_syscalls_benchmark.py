@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Count the socket receive calls needed to perform one handshake.
+
+Compares receiving the peer's data in fixed 4096-byte bytes objects (which is how SslClient used to work) with
+SslClient's reusable receive buffer, sized from what the BIO pair can accept. The difference is the most visible with
+servers sending a large certificate chain over a real network; on the loopback interface, the client may be fast
+enough to receive the server's data as it gets written.
+
+Usage:
+    python benchmarks/recv_syscalls_benchmark.py HOST PORT [--handshakes N] [--tls-version VERSION]
+"""
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import argparse
+import os
+import socket
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from nassl.connection_timings import monotonic  # noqa: E402
+from nassl.ssl_client import OpenSslVersionEnum, OpenSslVerifyEnum, SslClient, SslDeadlineExceeded  # noqa: E402
+
+
+class FixedBufferSslClient(SslClient):
+    """An SslClient receiving the peer's data in fixed-size bytes objects.
+    """
+
+    def _receive_from_peer(self, error_msg, deadline=None):
+        try:
+            incoming_data = self._sock.recv(self._DEFAULT_BUFFER_SIZE)
+        except socket.timeout:
+            if deadline is not None and monotonic() >= deadline:
+                raise SslDeadlineExceeded('Timed out waiting for data from the peer.')
+            raise
+        if len(incoming_data) == 0:
+            raise IOError(error_msg)
+        return incoming_data
+
+
+class RecvCallsCounter(object):
+    """Profiling hook counting the calls to the receive methods of sockets.
+    """
+
+    def __init__(self):
+        self.calls_nb = 0
+
+    def __call__(self, frame, event, arg):
+        if event == 'c_call' and arg.__name__ in ('recv', 'recv_into') \
+                and isinstance(getattr(arg, '__self__', None), socket.socket):
+            self.calls_nb += 1
+
+
+def run(host, port, handshakes_nb, ssl_version, ssl_client_cls):
+    counter = RecvCallsCounter()
+    duration = 0.0
+    for _ in range(handshakes_nb):
+        sock = socket.create_connection((host, port), timeout=5)
+        ssl_client = ssl_client_cls(ssl_version=ssl_version, underlying_socket=sock, ssl_verify=OpenSslVerifyEnum.NONE)
+        try:
+            start = time.time()
+            sys.setprofile(counter)
+            try:
+                ssl_client.do_handshake()
+            finally:
+                sys.setprofile(None)
+            duration += time.time() - start
+        finally:
+            ssl_client.shutdown()
+            sock.close()
+
+    return counter.calls_nb / handshakes_nb, handshakes_nb / duration
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Socket receive calls per handshake.')
+    parser.add_argument('host')
+    parser.add_argument('port', type=int)
+    parser.add_argument('--handshakes', type=int, default=200)
+    parser.add_argument('--tls-version', default='TLSV1_2', choices=[v.name for v in OpenSslVersionEnum])
+    args = parser.parse_args()
+    ssl_version = OpenSslVersionEnum[args.tls_version]
+
+    print('{:>10} {:>10} {:>14}'.format('buffer', 'recv/hs', 'handshakes/s'))
+    for name, ssl_client_cls in (('fixed', FixedBufferSslClient), ('adaptive', SslClient)):
+        recv_calls, rate = run(args.host, args.port, args.handshakes, ssl_version, ssl_client_cls)
+        print('{:>10} {:>10.1f} {:>14.1f}'.format(name, recv_calls, rate))
+
+
+if __name__ == '__main__':
+    main()
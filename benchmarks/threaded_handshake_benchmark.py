@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Measure how the number of handshakes per second scales with the number of threads.
+
+The _nassl extension releases the GIL while OpenSSL performs the handshake so the key exchange and the signature
+verification of several connections can run on different cores. Point this script to a server that is able to handle
+many concurrent connections (nginx, HAProxy, etc.); a single-threaded "openssl s_server" will be the bottleneck.
+
+Usage:
+    python benchmarks/threaded_handshake_benchmark.py HOST PORT [--handshakes N] [--max-threads N]
+"""
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import argparse
+import multiprocessing
+import os
+import socket
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from nassl.ssl_client import OpenSslVersionEnum, OpenSslVerifyEnum, SslClient  # noqa: E402
+
+
+def do_handshakes(host, port, count, ssl_version):
+    for _ in range(count):
+        sock = socket.create_connection((host, port), timeout=5)
+        ssl_client = SslClient(ssl_version=ssl_version, underlying_socket=sock, ssl_verify=OpenSslVerifyEnum.NONE)
+        try:
+            ssl_client.do_handshake()
+        finally:
+            ssl_client.shutdown()
+            sock.close()
+
+
+def run(host, port, threads_nb, handshakes_nb, ssl_version):
+    handshakes_per_thread = max(1, handshakes_nb // threads_nb)
+    threads = [threading.Thread(target=do_handshakes, args=(host, port, handshakes_per_thread, ssl_version))
+               for _ in range(threads_nb)]
+
+    start = time.time()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    duration = time.time() - start
+
+    return (handshakes_per_thread * threads_nb) / duration
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Multi-threaded handshake benchmark.')
+    parser.add_argument('host')
+    parser.add_argument('port', type=int)
+    parser.add_argument('--handshakes', type=int, default=2000, help='Total number of handshakes per run.')
+    parser.add_argument('--max-threads', type=int, default=multiprocessing.cpu_count())
+    parser.add_argument('--tls-version', default='TLSV1_2', choices=[v.name for v in OpenSslVersionEnum])
+    args = parser.parse_args()
+    ssl_version = OpenSslVersionEnum[args.tls_version]
+
+    # Warm up the server and the client
+    do_handshakes(args.host, args.port, 10, ssl_version)
+
+    threads_nb = 1
+    baseline = None
+    print('{:>8} {:>14} {:>9}'.format('threads', 'handshakes/s', 'speedup'))
+    while threads_nb <= args.max_threads:
+        rate = run(args.host, args.port, threads_nb, args.handshakes, ssl_version)
+        if baseline is None:
+            baseline = rate
+        print('{:>8} {:>14.1f} {:>8.2f}x'.format(threads_nb, rate, rate / baseline))
+        threads_nb *= 2
+
+
+if __name__ == '__main__':
+    main()
@@ -9,6 +9,10 @@
 #include <openssl/ssl.h>
 #include <openssl/rand.h>
 
+#ifdef LEGACY_OPENSSL
+#include "pythread.h"
+#endif
+
 #include "nassl_errors.h"
 #include "nassl_SSL_CTX.h"
 #include "nassl_SSL.h"
@@ -18,6 +22,74 @@
 #include "nassl_X509_NAME_ENTRY.h"
 #include "nassl_SSL_SESSION.h"
 #include "nassl_OCSP_RESPONSE.h"
+#include "nassl_X509_STORE.h"
+
+
+#ifdef LEGACY_OPENSSL
+// OpenSSL 1.0.2 is only thread-safe if the application supplies locking callbacks; this is required now that the
+// GIL gets released during handshakes, reads and writes. OpenSSL 1.1.0+ does its own locking.
+// Based on what CPython's _ssl module does for OpenSSL < 1.1.0
+static PyThread_type_lock *openssl_locks = NULL;
+
+static void openssl_locking_callback(int mode, int n, const char *file, int line)
+{
+    if (mode & CRYPTO_LOCK)
+    {
+        PyThread_acquire_lock(openssl_locks[n], WAIT_LOCK);
+    }
+    else
+    {
+        PyThread_release_lock(openssl_locks[n]);
+    }
+}
+
+
+static void openssl_threadid_callback(CRYPTO_THREADID *id)
+{
+    CRYPTO_THREADID_set_numeric(id, PyThread_get_thread_ident());
+}
+
+
+static int setup_openssl_threads(void)
+{
+    int i = 0;
+    int locksCount = CRYPTO_num_locks();
+
+    if (openssl_locks != NULL)
+    {
+        // Already done
+        return 1;
+    }
+
+    openssl_locks = (PyThread_type_lock *) PyMem_Malloc(sizeof(PyThread_type_lock) * locksCount);
+    if (openssl_locks == NULL)
+    {
+        PyErr_NoMemory();
+        return 0;
+    }
+
+    for (i=0; i<locksCount; i++)
+    {
+        openssl_locks[i] = PyThread_allocate_lock();
+        if (openssl_locks[i] == NULL)
+        {
+            int j;
+            for (j=0; j<i; j++)
+            {
+                PyThread_free_lock(openssl_locks[j]);
+            }
+            PyMem_Free(openssl_locks);
+            openssl_locks = NULL;
+            PyErr_SetString(PyExc_RuntimeError, "Could not allocate the OpenSSL locks");
+            return 0;
+        }
+    }
+
+    CRYPTO_set_locking_callback(openssl_locking_callback);
+    CRYPTO_THREADID_set_callback(openssl_threadid_callback);
+    return 1;
+}
+#endif
 
 
 static PyMethodDef nassl_methods[] =
@@ -111,6 +183,10 @@ PyMODINIT_FUNC init_nassl(void)
 #ifdef LEGACY_OPENSSL
     SSL_library_init();
     SSL_load_error_strings();
+    if (!setup_openssl_threads())
+    {
+        INITERROR;
+    }
 #else
     OPENSSL_init_ssl(0, NULL);
 #endif
@@ -150,6 +226,7 @@ PyMODINIT_FUNC init_nassl(void)
     module_add_X509_NAME_ENTRY(module);
     module_add_SSL_SESSION(module);
     module_add_OCSP_RESPONSE(module);
+    module_add_X509_STORE(module);
 
     state = GETSTATE(module);
     state->error = PyErr_NewException("nassl._nassl.Error", NULL, NULL);
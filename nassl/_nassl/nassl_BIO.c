@@ -67,6 +67,7 @@ static PyObject* nassl_BIO_read(nassl_BIO_Object *self, PyObject *args)
 {
     char *readBuffer;
     PyObject *res = NULL;
+    int returnValue;
 
     unsigned int readSize;
     if (!PyArg_ParseTuple(args, "I", &readSize))
@@ -80,9 +81,13 @@ static PyObject* nassl_BIO_read(nassl_BIO_Object *self, PyObject *args)
         return PyErr_NoMemory();
     }
 
-    if (BIO_read(self->bio, readBuffer, readSize) > 0)
+    Py_BEGIN_ALLOW_THREADS
+    returnValue = BIO_read(self->bio, readBuffer, readSize);
+    Py_END_ALLOW_THREADS
+
+    if (returnValue > 0)
     {
-        res = PyBytes_FromStringAndSize(readBuffer, readSize);
+        res = PyBytes_FromStringAndSize(readBuffer, returnValue);
     }
     else
     {
@@ -94,6 +99,40 @@ static PyObject* nassl_BIO_read(nassl_BIO_Object *self, PyObject *args)
 }
 
 
+static PyObject* nassl_BIO_read_into(nassl_BIO_Object *self, PyObject *args)
+{
+    Py_buffer readBuffer;
+    Py_ssize_t maxSize;
+    unsigned int nbytes = 0;
+    int returnValue;
+
+    if (!PyArg_ParseTuple(args, "w*|I", &readBuffer, &nbytes))
+    {
+        return NULL;
+    }
+
+    maxSize = (readBuffer.len > INT_MAX) ? INT_MAX : readBuffer.len;
+    if ((Py_ssize_t) nbytes > maxSize)
+    {
+        PyBuffer_Release(&readBuffer);
+        PyErr_SetString(PyExc_ValueError, "nbytes is greater than the length of the buffer");
+        return NULL;
+    }
+
+    Py_BEGIN_ALLOW_THREADS
+    returnValue = BIO_read(self->bio, readBuffer.buf, (nbytes == 0) ? (int) maxSize : (int) nbytes);
+    Py_END_ALLOW_THREADS
+    PyBuffer_Release(&readBuffer);
+
+    if (returnValue <= 0)
+    {
+        PyErr_SetString(PyExc_IOError, "BIO_read() failed.");
+        return NULL;
+    }
+    return Py_BuildValue("i", returnValue);
+}
+
+
 static PyObject* nassl_BIO_pending(nassl_BIO_Object *self, PyObject *args)
 {
     size_t returnValue = BIO_ctrl_pending(self->bio);
@@ -101,18 +140,35 @@ static PyObject* nassl_BIO_pending(nassl_BIO_Object *self, PyObject *args)
 }
 
 
+static PyObject* nassl_BIO_get_write_guarantee(nassl_BIO_Object *self, PyObject *args)
+{
+    size_t returnValue = BIO_ctrl_get_write_guarantee(self->bio);
+    return Py_BuildValue("I", returnValue);
+}
+
+
 static PyObject* nassl_BIO_write(nassl_BIO_Object *self, PyObject *args)
 {
     PyObject *res = NULL;
-    unsigned int writeSize;
     int returnValue;
-    char *writeBuffer;
-    if (!PyArg_ParseTuple(args, "s#", &writeBuffer, &writeSize))
+    Py_buffer writeBuffer;
+    if (!PyArg_ParseTuple(args, "s*", &writeBuffer))
+    {
+        return NULL;
+    }
+
+    if (writeBuffer.len > INT_MAX)
     {
+        PyBuffer_Release(&writeBuffer);
+        PyErr_SetString(PyExc_OverflowError, "Data to write is too large");
         return NULL;
     }
 
-    returnValue = BIO_write(self->bio, writeBuffer, writeSize);
+    Py_BEGIN_ALLOW_THREADS
+    returnValue = BIO_write(self->bio, writeBuffer.buf, (int) writeBuffer.len);
+    Py_END_ALLOW_THREADS
+    PyBuffer_Release(&writeBuffer);
+
     if (returnValue > 0)
     {
         // Write OK
@@ -134,9 +190,16 @@ static PyMethodDef nassl_BIO_Object_methods[] =
     {"read", (PyCFunction)nassl_BIO_read, METH_VARARGS,
      "OpenSSL's BIO_read()."
     },
+    {"read_into", (PyCFunction)nassl_BIO_read_into, METH_VARARGS,
+     "OpenSSL's BIO_read(), writing the data directly into the supplied writable buffer. Reads up to nbytes bytes, or "
+     "the length of the buffer if nbytes is not set, and returns the number of bytes read."
+    },
     {"pending", (PyCFunction)nassl_BIO_pending, METH_NOARGS,
      "OpenSSL's BIO_ctrl_pending()."
     },
+    {"get_write_guarantee", (PyCFunction)nassl_BIO_get_write_guarantee, METH_NOARGS,
+     "OpenSSL's BIO_ctrl_get_write_guarantee()."
+    },
     {"write", (PyCFunction)nassl_BIO_write, METH_VARARGS,
      "OpenSSL's BIO_write()."
     },
@@ -9,10 +9,12 @@
 
 #include <openssl/x509.h>
 #include <openssl/ocsp.h>
+#include <openssl/err.h>
 
 #include "python_utils.h"
 #include "nassl_errors.h"
 #include "nassl_OCSP_RESPONSE.h"
+#include "nassl_X509_STORE.h"
 
 
 static PyObject* nassl_OCSP_RESPONSE_new(PyTypeObject *type, PyObject *args, PyObject *kwds)
@@ -85,7 +87,14 @@ static PyObject* nassl_OCSP_RESPONSE_basic_verify(nassl_OCSP_RESPONSE_Object *se
     int certNum = 0, verifyRes = 0, i = 0, respStatus = 0;
     OCSP_BASICRESP *basicResp = NULL;
     char *caFilePath = NULL;
-    if (PyArg_ParseFilePath(args, &caFilePath) == NULL)
+    PyObject *trustStore_PyObject = NULL;
+
+    // The trusted CA certs are either an already-loaded X509_STORE or a file path
+    if ((PyTuple_Size(args) == 1) && PyObject_TypeCheck(PyTuple_GetItem(args, 0), &nassl_X509_STORE_Type))
+    {
+        trustStore_PyObject = PyTuple_GetItem(args, 0);
+    }
+    else if (PyArg_ParseFilePath(args, &caFilePath) == NULL)
     {
         return NULL;
     }
@@ -98,14 +107,28 @@ static PyObject* nassl_OCSP_RESPONSE_basic_verify(nassl_OCSP_RESPONSE_Object *se
         return NULL;
     }
 
-    // Load the file containing the trusted CA certs
-    trustedCAs = X509_STORE_new();
-    if (trustedCAs == NULL)
+    if (trustStore_PyObject != NULL)
     {
-        return raise_OpenSSL_error();
+        trustedCAs = ((nassl_X509_STORE_Object *) trustStore_PyObject)->x509Store;
+        X509_STORE_up_ref_compat(trustedCAs);
+    }
+    else
+    {
+        trustedCAs = X509_STORE_new();
+        if (trustedCAs == NULL)
+        {
+            return raise_OpenSSL_error();
+        }
     }
 
-    X509_STORE_load_locations(trustedCAs, caFilePath, NULL);
+    // Parsing the trust store and verifying the signature do not need the GIL
+    ERR_clear_error();
+    Py_BEGIN_ALLOW_THREADS
+    if (caFilePath != NULL)
+    {
+        // Load the file containing the trusted CA certs
+        X509_STORE_load_locations(trustedCAs, caFilePath, NULL);
+    }
 
     // Verify the OCSP response
     basicResp = OCSP_response_get1_basic(self->ocspResp);
@@ -121,6 +144,9 @@ static PyObject* nassl_OCSP_RESPONSE_basic_verify(nassl_OCSP_RESPONSE_Object *se
 
     verifyRes = OCSP_basic_verify(basicResp, NULL, trustedCAs, 0);
     OCSP_BASICRESP_free(basicResp);
+    X509_STORE_free(trustedCAs);
+    Py_END_ALLOW_THREADS
+
     if (verifyRes <= 0)
     {
         return raise_OpenSSL_error();
@@ -142,7 +168,8 @@ static PyMethodDef nassl_OCSP_RESPONSE_Object_methods[] =
      "OpenSSL's OCSP_RESPONSE_print()."
     },
     {"basic_verify", (PyCFunction)nassl_OCSP_RESPONSE_basic_verify, METH_VARARGS,
-     "OpenSSL's OCSP_basic_verify()."
+     "OpenSSL's OCSP_basic_verify(), using either an X509_STORE or the path to a file containing the trusted CA "
+     "certificates."
     },
     {"get_status", (PyCFunction)nassl_OCSP_RESPONSE_status, METH_VARARGS,
      "OpenSSL's OCSP_response_status() ."
@@ -16,10 +16,15 @@
 // https://bugs.launchpad.net/pyopenssl/+bug/570101
 #ifdef _WIN32
 #include "winsock.h"
+#else
+#include <time.h>
 #endif
 
 #include <openssl/ssl.h>
+#include <openssl/err.h>
 #include <openssl/ocsp.h>
+#include <openssl/ec.h>
+#include <openssl/dh.h>
 
 
 #include "nassl_errors.h"
@@ -31,6 +36,75 @@
 #include "openssl_utils.h"
 
 
+// Random value of a ServerHello that is actually a TLS 1.3 HelloRetryRequest
+static const unsigned char HELLO_RETRY_REQUEST_RANDOM[32] = {
+    0xCF, 0x21, 0xAD, 0x74, 0xE5, 0x9A, 0x61, 0x11, 0xBE, 0x1D, 0x8C, 0x02, 0x1E, 0x65, 0xB8, 0x91,
+    0xC2, 0xA2, 0x11, 0x16, 0x7A, 0xBB, 0x8C, 0x5E, 0x07, 0x9E, 0x09, 0xE2, 0xC8, 0xA8, 0x33, 0x9C
+};
+
+// Handshake type reported for HelloRetryRequest messages, which was its code point in the TLS 1.3 drafts
+#define NASSL_MT_HELLO_RETRY_REQUEST 6
+
+
+static double get_monotonic_time(void)
+{
+#ifdef _WIN32
+    return GetTickCount64() / 1000.0;
+#else
+    struct timespec now;
+    clock_gettime(CLOCK_MONOTONIC, &now);
+    return now.tv_sec + now.tv_nsec / 1000000000.0;
+#endif
+}
+
+
+static void free_message_trace(nassl_SSL_MessageTrace *messageTrace)
+{
+    PyMem_Free(messageTrace->entries);
+    PyMem_Free(messageTrace);
+}
+
+
+// Called by OpenSSL for every TLS message sent or received, while the GIL is released
+static void message_trace_callback(int writeP, int version, int contentType, const void *buf, size_t len, SSL *ssl,
+                                   void *arg)
+{
+    nassl_SSL_MessageTrace *messageTrace = (nassl_SSL_MessageTrace *) arg;
+    nassl_SSL_MessageTraceEntry *entry;
+    const unsigned char *message = (const unsigned char *) buf;
+
+    // Ignore the pseudo content types used by OpenSSL 1.1.1 to pass record headers and TLS 1.3 inner content types
+    if (contentType >= 0x100)
+    {
+        return;
+    }
+
+    entry = &messageTrace->entries[messageTrace->nextIndex];
+    entry->isSent = writeP;
+    entry->contentType = contentType;
+    entry->handshakeType = -1;
+    entry->length = len;
+    entry->timestamp = get_monotonic_time();
+
+    if ((contentType == SSL3_RT_HANDSHAKE) && (len > 0))
+    {
+        entry->handshakeType = message[0];
+        // Message type (1 byte), length (3 bytes), legacy version (2 bytes) and random (32 bytes)
+        if ((message[0] == SSL3_MT_SERVER_HELLO) && (len >= 38)
+            && (memcmp(message + 6, HELLO_RETRY_REQUEST_RANDOM, sizeof(HELLO_RETRY_REQUEST_RANDOM)) == 0))
+        {
+            entry->handshakeType = NASSL_MT_HELLO_RETRY_REQUEST;
+        }
+    }
+
+    messageTrace->nextIndex = (messageTrace->nextIndex + 1) % messageTrace->capacity;
+    if (messageTrace->entriesNb < messageTrace->capacity)
+    {
+        messageTrace->entriesNb++;
+    }
+}
+
+
 // nassl.SSL.new()
 static PyObject* nassl_SSL_new(PyTypeObject *type, PyObject *args, PyObject *kwds)
 {
@@ -47,6 +121,7 @@ static PyObject* nassl_SSL_new(PyTypeObject *type, PyObject *args, PyObject *kwd
     self->ssl = NULL;
     self->sslCtx_Object = NULL;
     self->networkBio_Object = NULL;
+    self->messageTrace = NULL;
 
     // Recover and store the corresponding ssl_ctx
     if (!PyArg_ParseTuple(args, "O!", &nassl_SSL_CTX_Type, &sslCtx_Object))
@@ -99,6 +174,12 @@ static void nassl_SSL_dealloc(nassl_SSL_Object *self)
         self->ssl = NULL;
     }
 
+    if (self->messageTrace != NULL)
+    {
+        free_message_trace(self->messageTrace);
+        self->messageTrace = NULL;
+    }
+
     if (self->sslCtx_Object != NULL)
     {
         Py_DECREF(self->sslCtx_Object);
@@ -157,7 +238,16 @@ static PyObject* nassl_SSL_set_mode(nassl_SSL_Object *self, PyObject *args)
 
 static PyObject* nassl_SSL_do_handshake(nassl_SSL_Object *self, PyObject *args)
 {
-    int result = SSL_do_handshake(self->ssl);
+    int result;
+
+    // The error queue is per-thread; clear it so that SSL_get_error() only looks at errors from this call
+    ERR_clear_error();
+
+    // The handshake can be CPU-intensive (key exchange, certificate verification) so let other threads run
+    Py_BEGIN_ALLOW_THREADS
+    result = SSL_do_handshake(self->ssl);
+    Py_END_ALLOW_THREADS
+
     if (result != 1)
     {
         return raise_OpenSSL_ssl_error(self->ssl, result);
@@ -183,7 +273,11 @@ static PyObject* nassl_SSL_read(nassl_SSL_Object *self, PyObject *args)
         return PyErr_NoMemory();
     }
 
+    ERR_clear_error();
+    Py_BEGIN_ALLOW_THREADS
     returnValue = SSL_read(self->ssl, readBuffer, readSize);
+    Py_END_ALLOW_THREADS
+
     if (returnValue > 0)
     {
         // Read OK
@@ -200,55 +294,228 @@ static PyObject* nassl_SSL_read(nassl_SSL_Object *self, PyObject *args)
 }
 
 
+// Parse the (buffer, nbytes=0) arguments of the read_into() methods; nbytes defaults to the size of the buffer
+static int parse_read_into_args(PyObject *args, Py_buffer *readBuffer, int *readSize)
+{
+    Py_ssize_t maxSize;
+    unsigned int nbytes = 0;
+
+    if (!PyArg_ParseTuple(args, "w*|I", readBuffer, &nbytes))
+    {
+        return 0;
+    }
+
+    maxSize = (readBuffer->len > INT_MAX) ? INT_MAX : readBuffer->len;
+    if ((Py_ssize_t) nbytes > maxSize)
+    {
+        PyBuffer_Release(readBuffer);
+        PyErr_SetString(PyExc_ValueError, "nbytes is greater than the length of the buffer");
+        return 0;
+    }
+    *readSize = (nbytes == 0) ? (int) maxSize : (int) nbytes;
+    return 1;
+}
+
+
+static PyObject* nassl_SSL_read_into(nassl_SSL_Object *self, PyObject *args)
+{
+    int returnValue, readSize;
+    Py_buffer readBuffer;
+
+    if (!parse_read_into_args(args, &readBuffer, &readSize))
+    {
+        return NULL;
+    }
+
+    ERR_clear_error();
+    Py_BEGIN_ALLOW_THREADS
+    returnValue = SSL_read(self->ssl, readBuffer.buf, readSize);
+    Py_END_ALLOW_THREADS
+    PyBuffer_Release(&readBuffer);
+
+    if (returnValue <= 0)
+    {
+        // Read failed
+        return raise_OpenSSL_ssl_error(self->ssl, returnValue);
+    }
+    return Py_BuildValue("i", returnValue);
+}
+
+
+static PyObject* nassl_SSL_try_read_into(nassl_SSL_Object *self, PyObject *args)
+{
+    int returnValue, readSize, sslStatus;
+    Py_buffer readBuffer;
+
+    if (!parse_read_into_args(args, &readBuffer, &readSize))
+    {
+        return NULL;
+    }
+
+    ERR_clear_error();
+    Py_BEGIN_ALLOW_THREADS
+    returnValue = SSL_read(self->ssl, readBuffer.buf, readSize);
+    Py_END_ALLOW_THREADS
+    PyBuffer_Release(&readBuffer);
+
+    sslStatus = get_OpenSSL_ssl_status(self->ssl, returnValue);
+    if (sslStatus < 0)
+    {
+        return NULL;
+    }
+    return Py_BuildValue("ii", sslStatus, (returnValue > 0) ? returnValue : 0);
+}
+
+
+// Parse the data argument of the write() methods, which can be a text string or any object supporting the buffer protocol
+static int parse_write_args(PyObject *args, Py_buffer *writeBuffer)
+{
+    if (!PyArg_ParseTuple(args, "s*", writeBuffer))
+    {
+        return 0;
+    }
+
+    if (writeBuffer->len > INT_MAX)
+    {
+        PyBuffer_Release(writeBuffer);
+        PyErr_SetString(PyExc_OverflowError, "Data to write is too large");
+        return 0;
+    }
+    return 1;
+}
+
+
 static PyObject* nassl_SSL_write(nassl_SSL_Object *self, PyObject *args)
 {
-    int returnValue, writeSize;
-    char *writeBuffer;
+    int returnValue;
+    Py_buffer writeBuffer;
+
+    if (!parse_write_args(args, &writeBuffer))
+    {
+        return NULL;
+    }
+
+    ERR_clear_error();
+    Py_BEGIN_ALLOW_THREADS
+    returnValue = SSL_write(self->ssl, writeBuffer.buf, (int) writeBuffer.len);
+    Py_END_ALLOW_THREADS
+    PyBuffer_Release(&writeBuffer);
+
+    if (returnValue <= 0)
+    {
+        // Write failed
+        return raise_OpenSSL_ssl_error(self->ssl, returnValue);
+    }
+    return Py_BuildValue("I", returnValue);
+}
+
+static PyObject* nassl_SSL_try_do_handshake(nassl_SSL_Object *self, PyObject *args)
+{
+    int result, sslStatus;
+
+    ERR_clear_error();
+    Py_BEGIN_ALLOW_THREADS
+    result = SSL_do_handshake(self->ssl);
+    Py_END_ALLOW_THREADS
+
+    sslStatus = get_OpenSSL_ssl_status(self->ssl, result);
+    if (sslStatus < 0)
+    {
+        return NULL;
+    }
+    return Py_BuildValue("i", sslStatus);
+}
+
+
+static PyObject* nassl_SSL_try_read(nassl_SSL_Object *self, PyObject *args)
+{
+    int returnValue, readSize, sslStatus;
+    PyObject *decryptedBytes = NULL;
     PyObject *res = NULL;
 
-    if (!PyArg_ParseTuple(args, "s#", &writeBuffer, &writeSize))
+    if (!PyArg_ParseTuple(args, "I", &readSize))
     {
         return NULL;
     }
 
-    returnValue = SSL_write(self->ssl, writeBuffer, writeSize);
-    if (returnValue > 0)
+    decryptedBytes = PyBytes_FromStringAndSize(NULL, readSize);
+    if (decryptedBytes == NULL)
     {
-        // Write OK
-        res = Py_BuildValue("I", returnValue);
+        return NULL;
     }
-    else
+
+    ERR_clear_error();
+    Py_BEGIN_ALLOW_THREADS
+    returnValue = SSL_read(self->ssl, PyBytes_AS_STRING(decryptedBytes), readSize);
+    Py_END_ALLOW_THREADS
+
+    sslStatus = get_OpenSSL_ssl_status(self->ssl, returnValue);
+    if (sslStatus < 0)
     {
-        // Write failed
-        raise_OpenSSL_ssl_error(self->ssl, returnValue);
+        Py_DECREF(decryptedBytes);
+        return NULL;
     }
+
+    if (_PyBytes_Resize(&decryptedBytes, (returnValue > 0) ? returnValue : 0) < 0)
+    {
+        return NULL;
+    }
+
+    res = Py_BuildValue("iO", sslStatus, decryptedBytes);
+    Py_DECREF(decryptedBytes);
     return res;
 }
 
-#ifndef LEGACY_OPENSSL
-static PyObject* nassl_SSL_write_early_data(nassl_SSL_Object *self, PyObject *args)
+
+static PyObject* nassl_SSL_try_write(nassl_SSL_Object *self, PyObject *args)
 {
-    int returnValue, writeSize, writtenDataSize;
-    char *writeBuffer;
-    PyObject *res = NULL;
+    int returnValue, sslStatus;
+    Py_buffer writeBuffer;
 
-    if (!PyArg_ParseTuple(args, "s#", &writeBuffer, &writeSize))
+    if (!parse_write_args(args, &writeBuffer))
     {
         return NULL;
     }
 
-    returnValue = SSL_write_early_data(self->ssl, writeBuffer, writeSize, &writtenDataSize);
-    if (returnValue > 0)
+    ERR_clear_error();
+    Py_BEGIN_ALLOW_THREADS
+    returnValue = SSL_write(self->ssl, writeBuffer.buf, (int) writeBuffer.len);
+    Py_END_ALLOW_THREADS
+    PyBuffer_Release(&writeBuffer);
+
+    sslStatus = get_OpenSSL_ssl_status(self->ssl, returnValue);
+    if (sslStatus < 0)
     {
-        // Write OK
-        res = Py_BuildValue("I", writtenDataSize);
+        return NULL;
     }
-    else
+    return Py_BuildValue("ii", sslStatus, (returnValue > 0) ? returnValue : 0);
+}
+
+
+#ifndef LEGACY_OPENSSL
+static PyObject* nassl_SSL_write_early_data(nassl_SSL_Object *self, PyObject *args)
+{
+    int returnValue;
+    size_t writtenDataSize;
+    Py_buffer writeBuffer;
+
+    if (!parse_write_args(args, &writeBuffer))
+    {
+        return NULL;
+    }
+
+    ERR_clear_error();
+    Py_BEGIN_ALLOW_THREADS
+    returnValue = SSL_write_early_data(self->ssl, writeBuffer.buf, (size_t) writeBuffer.len, &writtenDataSize);
+    Py_END_ALLOW_THREADS
+    PyBuffer_Release(&writeBuffer);
+
+    if (returnValue <= 0)
     {
         // Write failed
-        raise_OpenSSL_ssl_error(self->ssl, returnValue);
+        return raise_OpenSSL_ssl_error(self->ssl, returnValue);
     }
-    return res;
+    return Py_BuildValue("I", (unsigned int) writtenDataSize);
 }
 
 static PyObject* nassl_SSL_get_early_data_status(nassl_SSL_Object *self, PyObject *args)
@@ -268,9 +535,14 @@ static PyObject* nassl_SSL_get_max_early_data(nassl_SSL_Object *self, PyObject *
 
 static PyObject* nassl_SSL_shutdown(nassl_SSL_Object *self, PyObject *args)
 {
-    int returnValue = SSL_shutdown(self->ssl);
+    int returnValue;
     PyObject *res = NULL;
 
+    ERR_clear_error();
+    Py_BEGIN_ALLOW_THREADS
+    returnValue = SSL_shutdown(self->ssl);
+    Py_END_ALLOW_THREADS
+
     if (returnValue >= 0)
     {
         res = Py_BuildValue("I", returnValue);
@@ -283,6 +555,174 @@ static PyObject* nassl_SSL_shutdown(nassl_SSL_Object *self, PyObject *args)
 }
 
 
+// Pass as much of the encrypted data received from the peer as possible to the network BIO
+// Returns the number of bytes that were consumed, or -1 if an exception was raised
+static Py_ssize_t pump_write_to_network_bio(nassl_SSL_Object *self, Py_buffer *incomingBuffer)
+{
+    int writeSize, returnValue;
+
+    if (self->networkBio_Object == NULL || self->networkBio_Object->bio == NULL)
+    {
+        PyErr_SetString(PyExc_RuntimeError, "The network BIO must be set using set_network_bio_to_free_when_dealloc()");
+        return -1;
+    }
+
+    if (incomingBuffer->len == 0)
+    {
+        return 0;
+    }
+
+    // The BIO pair only accepts what fits in its buffer; the caller keeps the rest for the next call
+    writeSize = (incomingBuffer->len > INT_MAX) ? INT_MAX : (int) incomingBuffer->len;
+    returnValue = BIO_write(self->networkBio_Object->bio, incomingBuffer->buf, writeSize);
+    return (returnValue > 0) ? returnValue : 0;
+}
+
+
+// Retrieve all the encrypted data generated by the SSL engine, to be sent to the peer
+static PyObject* pump_read_from_network_bio(nassl_SSL_Object *self)
+{
+    PyObject *outgoingBytes = NULL;
+    size_t pendingSize = BIO_ctrl_pending(self->networkBio_Object->bio);
+    int readSize = 0;
+
+    if (pendingSize > INT_MAX)
+    {
+        pendingSize = INT_MAX;
+    }
+
+    outgoingBytes = PyBytes_FromStringAndSize(NULL, pendingSize);
+    if (outgoingBytes == NULL || pendingSize == 0)
+    {
+        return outgoingBytes;
+    }
+
+    readSize = BIO_read(self->networkBio_Object->bio, PyBytes_AS_STRING(outgoingBytes), (int) pendingSize);
+    if (readSize < 0)
+    {
+        readSize = 0;
+    }
+    if ((size_t) readSize != pendingSize)
+    {
+        if (_PyBytes_Resize(&outgoingBytes, readSize) < 0)
+        {
+            return NULL;
+        }
+    }
+    return outgoingBytes;
+}
+
+
+static PyObject* nassl_SSL_do_handshake_pump(nassl_SSL_Object *self, PyObject *args)
+{
+    Py_buffer incomingBuffer;
+    Py_ssize_t consumedSize;
+    PyObject *outgoingBytes = NULL;
+    PyObject *res = NULL;
+    int result, sslStatus;
+
+#if PY_MAJOR_VERSION >= 3
+    if (!PyArg_ParseTuple(args, "y*", &incomingBuffer))
+#else
+    if (!PyArg_ParseTuple(args, "s*", &incomingBuffer))
+#endif
+    {
+        return NULL;
+    }
+
+    consumedSize = pump_write_to_network_bio(self, &incomingBuffer);
+    PyBuffer_Release(&incomingBuffer);
+    if (consumedSize < 0)
+    {
+        return NULL;
+    }
+
+    ERR_clear_error();
+    Py_BEGIN_ALLOW_THREADS
+    result = SSL_do_handshake(self->ssl);
+    Py_END_ALLOW_THREADS
+
+    sslStatus = get_OpenSSL_ssl_status(self->ssl, result);
+    if (sslStatus < 0)
+    {
+        return NULL;
+    }
+
+    outgoingBytes = pump_read_from_network_bio(self);
+    if (outgoingBytes == NULL)
+    {
+        return NULL;
+    }
+
+    res = Py_BuildValue("iOn", sslStatus, outgoingBytes, consumedSize);
+    Py_DECREF(outgoingBytes);
+    return res;
+}
+
+
+static PyObject* nassl_SSL_read_pump(nassl_SSL_Object *self, PyObject *args)
+{
+    Py_buffer incomingBuffer;
+    Py_ssize_t consumedSize;
+    PyObject *outgoingBytes = NULL;
+    PyObject *decryptedBytes = NULL;
+    PyObject *res = NULL;
+    int returnValue, readSize, sslStatus;
+
+#if PY_MAJOR_VERSION >= 3
+    if (!PyArg_ParseTuple(args, "y*I", &incomingBuffer, &readSize))
+#else
+    if (!PyArg_ParseTuple(args, "s*I", &incomingBuffer, &readSize))
+#endif
+    {
+        return NULL;
+    }
+
+    consumedSize = pump_write_to_network_bio(self, &incomingBuffer);
+    PyBuffer_Release(&incomingBuffer);
+    if (consumedSize < 0)
+    {
+        return NULL;
+    }
+
+    decryptedBytes = PyBytes_FromStringAndSize(NULL, readSize);
+    if (decryptedBytes == NULL)
+    {
+        return NULL;
+    }
+
+    ERR_clear_error();
+    Py_BEGIN_ALLOW_THREADS
+    returnValue = SSL_read(self->ssl, PyBytes_AS_STRING(decryptedBytes), readSize);
+    Py_END_ALLOW_THREADS
+
+    sslStatus = get_OpenSSL_ssl_status(self->ssl, returnValue);
+    if (sslStatus < 0)
+    {
+        Py_DECREF(decryptedBytes);
+        return NULL;
+    }
+
+    if (_PyBytes_Resize(&decryptedBytes, (returnValue > 0) ? returnValue : 0) < 0)
+    {
+        return NULL;
+    }
+
+    // Reading can also generate data to send, for example when the peer initiates a TLS 1.3 key update
+    outgoingBytes = pump_read_from_network_bio(self);
+    if (outgoingBytes == NULL)
+    {
+        Py_DECREF(decryptedBytes);
+        return NULL;
+    }
+
+    res = Py_BuildValue("iOOn", sslStatus, decryptedBytes, outgoingBytes, consumedSize);
+    Py_DECREF(decryptedBytes);
+    Py_DECREF(outgoingBytes);
+    return res;
+}
+
+
 static PyObject* nassl_SSL_pending(nassl_SSL_Object *self, PyObject *args)
 {
     int returnValue = SSL_pending(self->ssl);
@@ -547,7 +987,8 @@ static const SSL_CIPHER* get_tmp_new_cipher(nassl_SSL_Object *self)
     }
     return self->ssl->s3->tmp.new_cipher;
 #else
-    return NULL;
+    // Set once the ServerHello was processed, while SSL_get_current_cipher() returns NULL until the ChangeCipherSpec
+    return SSL_get_pending_cipher(self->ssl);
 #endif
 }
 
@@ -584,7 +1025,7 @@ static PyObject* nassl_SSL_get_cipher_protocol_id(nassl_SSL_Object *self, PyObje
 #ifdef LEGACY_OPENSSL
     unsigned short id = (unsigned short) (cipher->id & 0x0000FFFF);
 #else
-    unsigned short id = SSL_CIPHER_get_protocol_id(self->ssl);
+    unsigned short id = SSL_CIPHER_get_protocol_id(cipher);
 #endif
     return Py_BuildValue("H", id);
 }
@@ -697,6 +1138,12 @@ static PyObject* nassl_SSL_set_session(nassl_SSL_Object *self, PyObject *args)
 }
 
 
+static PyObject* nassl_SSL_session_reused(nassl_SSL_Object *self)
+{
+    return PyBool_FromLong(SSL_session_reused(self->ssl));
+}
+
+
 static PyObject* nassl_SSL_set_options(nassl_SSL_Object *self, PyObject *args)
 {
     long sslOption = 0;
@@ -720,6 +1167,81 @@ static PyObject* nassl_SSL_set_tlsext_status_type(nassl_SSL_Object *self, PyObje
 }
 
 
+static PyObject* nassl_SSL_set1_groups_list(nassl_SSL_Object *self, PyObject *args)
+{
+    char *groupsList = NULL;
+    int returnValue;
+    if (!PyArg_ParseTuple(args, "s", &groupsList))
+    {
+        return NULL;
+    }
+
+#ifdef LEGACY_OPENSSL
+    returnValue = SSL_set1_curves_list(self->ssl, groupsList);
+#else
+    returnValue = SSL_set1_groups_list(self->ssl, groupsList);
+#endif
+    if (!returnValue)
+    {
+        // Unknown groups are reported through the return value; don't leave the error for the next operation
+        ERR_clear_error();
+    }
+    return Py_BuildValue("I", returnValue);
+}
+
+
+// Based on OpenSSL 1.1.1 ssl_print_tmp_key() which is responsible for the
+// "Server Temp Key: xxx" output when using openssl s_client to connect to
+// an SSL/TLS server.
+// See: https://github.com/openssl/openssl/blob/OpenSSL_1_1_1-stable/apps/s_cb.c#L398
+static PyObject* nassl_SSL_get_negotiated_group(nassl_SSL_Object *self, PyObject *args)
+{
+    EVP_PKEY *tmpKey = NULL;
+    int nid = NID_undef;
+
+    if (!SSL_get_server_tmp_key(self->ssl, &tmpKey))
+    {
+        Py_RETURN_NONE;
+    }
+
+    switch (EVP_PKEY_id(tmpKey))
+    {
+        case EVP_PKEY_EC:
+        {
+            EC_KEY *ecKey = EVP_PKEY_get1_EC_KEY(tmpKey);
+            nid = EC_GROUP_get_curve_name(EC_KEY_get0_group(ecKey));
+            EC_KEY_free(ecKey);
+            break;
+        }
+#ifndef LEGACY_OPENSSL
+        case EVP_PKEY_DH:
+        {
+            // NID_undef unless the parameters are a named group, such as the RFC 7919 ffdhe groups
+            DH *dh = EVP_PKEY_get1_DH(tmpKey);
+            nid = DH_get_nid(dh);
+            DH_free(dh);
+            break;
+        }
+        case EVP_PKEY_X25519:
+#ifdef EVP_PKEY_X448
+        case EVP_PKEY_X448:
+#endif
+            nid = EVP_PKEY_id(tmpKey);
+            break;
+#endif
+        default:
+            break;
+    }
+    EVP_PKEY_free(tmpKey);
+
+    if (nid == NID_undef)
+    {
+        Py_RETURN_NONE;
+    }
+    return PyUnicode_FromString(OBJ_nid2sn(nid));
+}
+
+
 // Based on OpenSSL 1.1.1 ssl_print_sigalgs() which is responsible for the
 // "Peer signing digest: xxx" output when using openssl s_client to connect to
 // an SSL/TLS server.
@@ -827,106 +1349,324 @@ static PyObject* nassl_SSL_state_string_long(nassl_SSL_Object *self, PyObject *a
     const char *stateString = SSL_state_string_long(self->ssl);
     return PyUnicode_FromString(stateString);
 }
+#endif
 
-
-static PyObject* nassl_SSL_get_dh_param(nassl_SSL_Object *self)
+// Return a big-endian representation of the number, or None if it is not set
+static PyObject* bignum_to_bytes(const BIGNUM *bn)
 {
-    DH *dh_srvr;
-    SSL_SESSION* session;
-    const SSL_CIPHER *cipher = get_tmp_new_cipher(self);
-    long alg_k;
+    PyObject *bnBytes;
+    if (bn == NULL)
+    {
+        Py_RETURN_NONE;
+    }
 
-    if (cipher == NULL)
+    bnBytes = PyBytes_FromStringAndSize(NULL, BN_num_bytes(bn));
+    if (bnBytes == NULL)
     {
-        PyErr_SetString(PyExc_TypeError, "Invalid session (unable to get master key derivation algorithm)");
-        return NULL;
+        return PyErr_NoMemory();
     }
-    alg_k = cipher->algorithm_mkey;
-    session = SSL_get1_session(self->ssl);
+    BN_bn2bin(bn, (unsigned char *) PyBytes_AS_STRING(bnBytes));
+    return bnBytes;
+}
+
 
-    if (!(alg_k & (SSL_kEDH|SSL_kDHr|SSL_kDHd)))
+static PyObject* ec_point_to_bytes(const EC_GROUP *group, const EC_POINT *point, point_conversion_form_t form)
+{
+    PyObject *pointBytes;
+    size_t pointSize;
+    if (point == NULL)
     {
-        PyErr_SetString(PyExc_TypeError, "Diffie-Hellman is not used in this session");
-        return NULL;
+        Py_RETURN_NONE;
     }
 
-    if (session == NULL)
+    pointSize = EC_POINT_point2oct(group, point, form, NULL, 0, NULL);
+    pointBytes = PyBytes_FromStringAndSize(NULL, pointSize);
+    if (pointBytes == NULL)
     {
-        PyErr_SetString(PyExc_TypeError, "Unable to get Diffie-Hellman parameters");
-        return NULL;
+        return PyErr_NoMemory();
+    }
+    EC_POINT_point2oct(group, point, form, (unsigned char *) PyBytes_AS_STRING(pointBytes), pointSize, NULL);
+    return pointBytes;
+}
+
+
+// Return the key the server used for the key exchange, which is its ephemeral key except with the static DH and ECDH
+// cipher suites supported by the legacy OpenSSL
+static EVP_PKEY* get_server_key_exchange_key(nassl_SSL_Object *self)
+{
+    EVP_PKEY *serverKey = NULL;
+#ifdef LEGACY_OPENSSL
+    const SSL_CIPHER *cipher;
+    X509 *serverCert;
+#endif
+
+    if (SSL_get_server_tmp_key(self->ssl, &serverKey))
+    {
+        return serverKey;
     }
 
-    if ((session->sess_cert == NULL) || (session->sess_cert->peer_dh_tmp == NULL))
+#ifdef LEGACY_OPENSSL
+    cipher = get_tmp_new_cipher(self);
+    if ((cipher != NULL) && (cipher->algorithm_mkey & (SSL_kDHr|SSL_kDHd|SSL_kECDHr|SSL_kECDHe)))
     {
-        PyErr_SetString(PyExc_TypeError, "Unable to get Diffie-Hellman parameters");
-        return NULL;
+        serverCert = SSL_get_peer_certificate(self->ssl);
+        if (serverCert != NULL)
+        {
+            serverKey = X509_get_pubkey(serverCert);
+            X509_free(serverCert);
+        }
     }
-    dh_srvr = session->sess_cert->peer_dh_tmp;
+#endif
+    return serverKey;
+}
 
-    if ((dh_srvr->p == NULL) ||(dh_srvr->g == NULL) ||(dh_srvr->pub_key == NULL))
+
+static PyObject* nassl_SSL_get_dh_param(nassl_SSL_Object *self, PyObject *args)
+{
+    EVP_PKEY *serverKey = get_server_key_exchange_key(self);
+    DH *dh;
+    const BIGNUM *prime, *generator, *publicKey;
+    PyObject *dhParams = NULL, *primeBytes, *generatorBytes, *publicKeyBytes;
+
+    if ((serverKey == NULL) || (EVP_PKEY_id(serverKey) != EVP_PKEY_DH))
     {
-        PyErr_SetString(PyExc_TypeError, "Unable to get Diffie-Hellman parameters");
+        EVP_PKEY_free(serverKey);
+        PyErr_SetString(PyExc_TypeError, "Diffie-Hellman is not used in this session");
         return NULL;
     }
+    dh = EVP_PKEY_get1_DH(serverKey);
+    EVP_PKEY_free(serverKey);
 
-    return generic_print_to_string((int (*)(BIO *, const void *)) &DHparams_print, dh_srvr);
+#ifdef LEGACY_OPENSSL
+    prime = dh->p;
+    generator = dh->g;
+    publicKey = dh->pub_key;
+#else
+    DH_get0_pqg(dh, &prime, NULL, &generator);
+    DH_get0_key(dh, &publicKey, NULL);
+#endif
+
+    primeBytes = bignum_to_bytes(prime);
+    generatorBytes = bignum_to_bytes(generator);
+    publicKeyBytes = bignum_to_bytes(publicKey);
+    if ((primeBytes != NULL) && (generatorBytes != NULL) && (publicKeyBytes != NULL))
+    {
+        // The "N" references are stolen even if building the dictionary fails
+        dhParams = Py_BuildValue("{s:i,s:N,s:N,s:N}",
+                                 "group_size", BN_num_bits(prime),
+                                 "prime", primeBytes,
+                                 "generator", generatorBytes,
+                                 "public_key", publicKeyBytes);
+    }
+    else
+    {
+        Py_XDECREF(primeBytes);
+        Py_XDECREF(generatorBytes);
+        Py_XDECREF(publicKeyBytes);
+    }
+    DH_free(dh);
+    return dhParams;
 }
 
 
-/* mostly ripped from OpenSSL's s3_clnt.c */
-static PyObject* nassl_SSL_get_ecdh_param(nassl_SSL_Object *self)
+#ifndef LEGACY_OPENSSL
+// X25519 and X448 keys only consist of a public value, so the fields describing the curve are set to None
+static PyObject* get_ecx_param(EVP_PKEY *serverKey)
 {
-    EC_KEY *ec_key;
-    SSL_SESSION* session;
-    const SSL_CIPHER *cipher = get_tmp_new_cipher(self);
-    long alg_k;
-    EVP_PKEY *srvr_pub_pkey = NULL;
+    int curveNid = EVP_PKEY_id(serverKey);
+    int groupSize = EVP_PKEY_bits(serverKey);
+    PyObject *publicKeyBytes = NULL;
+#ifdef EVP_PKEY_X448
+    // EVP_PKEY_get_raw_public_key() was added to OpenSSL 1.1.1 along with X448
+    size_t publicKeySize = 0;
+
+    if (EVP_PKEY_get_raw_public_key(serverKey, NULL, &publicKeySize))
+    {
+        publicKeyBytes = PyBytes_FromStringAndSize(NULL, publicKeySize);
+        if ((publicKeyBytes != NULL) && !EVP_PKEY_get_raw_public_key(
+                serverKey, (unsigned char *) PyBytes_AS_STRING(publicKeyBytes), &publicKeySize))
+        {
+            Py_DECREF(publicKeyBytes);
+            publicKeyBytes = NULL;
+            raise_OpenSSL_error();
+        }
+    }
+    else
+    {
+        raise_OpenSSL_error();
+    }
+#else
+    unsigned char *publicKey = NULL;
+    size_t publicKeySize = EVP_PKEY_get1_tls_encodedpoint(serverKey, &publicKey);
 
-    if (cipher == NULL)
+    if (publicKeySize == 0)
     {
-        PyErr_SetString(PyExc_TypeError, "Invalid session (unable to get master key derivation algorithm)");
-        return NULL;
+        raise_OpenSSL_error();
     }
-    alg_k = cipher->algorithm_mkey;
-    session = SSL_get1_session(self->ssl);
+    else
+    {
+        publicKeyBytes = PyBytes_FromStringAndSize((char *) publicKey, publicKeySize);
+    }
+    OPENSSL_free(publicKey);
+#endif
+    EVP_PKEY_free(serverKey);
 
-    if (!(alg_k & (SSL_kECDHr|SSL_kECDHe|SSL_kEECDH)))
+    if (publicKeyBytes == NULL)
     {
-        PyErr_SetString(PyExc_TypeError, "Elliptic curve Diffie-Hellman is not used in this session");
         return NULL;
     }
+    // The "N" reference is stolen even if building the dictionary fails
+    return Py_BuildValue("{s:i,s:i,s:s,s:O,s:O,s:O,s:O,s:O,s:O,s:O,s:O,s:O,s:O,s:N}",
+                         "group_size", groupSize,
+                         "curve_nid", curveNid,
+                         "curve_name", OBJ_nid2sn(curveNid),
+                         "nist_curve_name", Py_None,
+                         "field_type", Py_None,
+                         "prime", Py_None,
+                         "a", Py_None,
+                         "b", Py_None,
+                         "generator", Py_None,
+                         "point_conversion_form", Py_None,
+                         "order", Py_None,
+                         "cofactor", Py_None,
+                         "seed", Py_None,
+                         "public_key", publicKeyBytes);
+}
+#endif
+
 
-    if ((session == NULL) || (session->sess_cert == NULL))
+static PyObject* nassl_SSL_get_ecdh_param(nassl_SSL_Object *self, PyObject *args)
+{
+    EVP_PKEY *serverKey = get_server_key_exchange_key(self);
+    EC_KEY *ecKey;
+    const EC_GROUP *group;
+    int curveNid, fieldTypeNid;
+    const char *nistCurveName;
+    point_conversion_form_t pointForm;
+    BIGNUM *prime = NULL, *a = NULL, *b = NULL, *order = NULL, *cofactor = NULL;
+    BN_CTX *bnCtx = NULL;
+    PyObject *ecdhParams = NULL, *seed = NULL, *primeBytes = NULL, *aBytes = NULL, *bBytes = NULL;
+    PyObject *generatorBytes = NULL, *orderBytes = NULL, *cofactorBytes = NULL, *publicKeyBytes = NULL;
+
+#ifndef LEGACY_OPENSSL
+#ifdef EVP_PKEY_X448
+    if ((serverKey != NULL)
+        && ((EVP_PKEY_id(serverKey) == EVP_PKEY_X25519) || (EVP_PKEY_id(serverKey) == EVP_PKEY_X448)))
+#else
+    if ((serverKey != NULL) && (EVP_PKEY_id(serverKey) == EVP_PKEY_X25519))
+#endif
     {
-        PyErr_SetString(PyExc_TypeError, "Unable to get ECDH parameters - Invalid session");
-        return NULL;
+        return get_ecx_param(serverKey);
     }
+#endif
 
+    if ((serverKey == NULL) || (EVP_PKEY_id(serverKey) != EVP_PKEY_EC))
+    {
+        EVP_PKEY_free(serverKey);
+        PyErr_SetString(PyExc_TypeError, "Elliptic curve Diffie-Hellman is not used in this session");
+        return NULL;
+    }
+    ecKey = EVP_PKEY_get1_EC_KEY(serverKey);
+    EVP_PKEY_free(serverKey);
+    group = EC_KEY_get0_group(ecKey);
+    curveNid = EC_GROUP_get_curve_name(group);
+    nistCurveName = (curveNid == NID_undef) ? NULL : EC_curve_nid2nist(curveNid);
+    fieldTypeNid = EC_METHOD_get_field_type(EC_GROUP_method_of(group));
+    pointForm = EC_GROUP_get_point_conversion_form(group);
 
-    if (session->sess_cert->peer_ecdh_tmp != NULL)
+    bnCtx = BN_CTX_new();
+    prime = BN_new();
+    a = BN_new();
+    b = BN_new();
+    order = BN_new();
+    cofactor = BN_new();
+    if ((bnCtx == NULL) || (prime == NULL) || (a == NULL) || (b == NULL) || (order == NULL) || (cofactor == NULL))
     {
-        ec_key = session->sess_cert->peer_ecdh_tmp;
+        PyErr_NoMemory();
+        goto end;
     }
-    else
+
+    // The prime for prime fields or the polynomial for binary fields
+    if (fieldTypeNid == NID_X9_62_prime_field)
     {
-        /* Get the Server Public Key from Cert */
-        srvr_pub_pkey = X509_get_pubkey(session-> \
-            sess_cert->peer_pkeys[SSL_PKEY_ECC].x509);
-        if ((srvr_pub_pkey == NULL) ||
-            (srvr_pub_pkey->type != EVP_PKEY_EC) ||
-            (srvr_pub_pkey->pkey.ec == NULL))
+        if (!EC_GROUP_get_curve_GFp(group, prime, a, b, bnCtx))
         {
-            if (srvr_pub_pkey)
-                EVP_PKEY_free(srvr_pub_pkey);
-            PyErr_SetString(PyExc_TypeError, "Unable to get server public key.");
-            return NULL;
+            raise_OpenSSL_error();
+            goto end;
         }
-        ec_key = srvr_pub_pkey->pkey.ec;
+    }
+#ifndef OPENSSL_NO_EC2M
+    else if (!EC_GROUP_get_curve_GF2m(group, prime, a, b, bnCtx))
+    {
+        raise_OpenSSL_error();
+        goto end;
+    }
+#endif
+    if (!EC_GROUP_get_order(group, order, bnCtx) || !EC_GROUP_get_cofactor(group, cofactor, bnCtx))
+    {
+        raise_OpenSSL_error();
+        goto end;
     }
 
-    return generic_print_to_string((int (*)(BIO *, const void *)) &ECParameters_print, ec_key);
+    if (EC_GROUP_get0_seed(group) != NULL)
+    {
+        seed = PyBytes_FromStringAndSize((char *) EC_GROUP_get0_seed(group), EC_GROUP_get_seed_len(group));
+    }
+    else
+    {
+        Py_INCREF(Py_None);
+        seed = Py_None;
+    }
+    primeBytes = bignum_to_bytes(prime);
+    aBytes = bignum_to_bytes(a);
+    bBytes = bignum_to_bytes(b);
+    generatorBytes = ec_point_to_bytes(group, EC_GROUP_get0_generator(group), pointForm);
+    orderBytes = bignum_to_bytes(order);
+    cofactorBytes = bignum_to_bytes(cofactor);
+    publicKeyBytes = ec_point_to_bytes(group, EC_KEY_get0_public_key(ecKey), POINT_CONVERSION_UNCOMPRESSED);
+    if ((seed == NULL) || (primeBytes == NULL) || (aBytes == NULL) || (bBytes == NULL) || (generatorBytes == NULL)
+        || (orderBytes == NULL) || (cofactorBytes == NULL) || (publicKeyBytes == NULL))
+    {
+        goto end;
+    }
+
+    // The "N" references are stolen even if building the dictionary fails
+    ecdhParams = Py_BuildValue("{s:i,s:i,s:z,s:z,s:s,s:N,s:N,s:N,s:N,s:i,s:N,s:N,s:N,s:N}",
+                               "group_size", EC_GROUP_get_degree(group),
+                               "curve_nid", curveNid,
+                               "curve_name", (curveNid == NID_undef) ? NULL : OBJ_nid2sn(curveNid),
+                               "nist_curve_name", nistCurveName,
+                               "field_type", OBJ_nid2sn(fieldTypeNid),
+                               "prime", primeBytes,
+                               "a", aBytes,
+                               "b", bBytes,
+                               "generator", generatorBytes,
+                               "point_conversion_form", (int) pointForm,
+                               "order", orderBytes,
+                               "cofactor", cofactorBytes,
+                               "seed", seed,
+                               "public_key", publicKeyBytes);
+    seed = primeBytes = aBytes = bBytes = generatorBytes = orderBytes = cofactorBytes = publicKeyBytes = NULL;
+
+end:
+    Py_XDECREF(seed);
+    Py_XDECREF(primeBytes);
+    Py_XDECREF(aBytes);
+    Py_XDECREF(bBytes);
+    Py_XDECREF(generatorBytes);
+    Py_XDECREF(orderBytes);
+    Py_XDECREF(cofactorBytes);
+    Py_XDECREF(publicKeyBytes);
+    BN_free(prime);
+    BN_free(a);
+    BN_free(b);
+    BN_free(order);
+    BN_free(cofactor);
+    BN_CTX_free(bnCtx);
+    EC_KEY_free(ecKey);
+    return ecdhParams;
 }
-#endif
+
 
 static PyObject* nassl_SSL_get_peer_cert_chain(nassl_SSL_Object *self, PyObject *args)
 {
@@ -990,6 +1730,100 @@ static PyObject* nassl_SSL_version(nassl_SSL_Object *self, PyObject *args)
 }
 
 
+static PyObject* nassl_SSL_enable_message_trace(nassl_SSL_Object *self, PyObject *args)
+{
+    unsigned int capacity;
+    nassl_SSL_MessageTrace *messageTrace;
+
+    if (!PyArg_ParseTuple(args, "I", &capacity))
+    {
+        return NULL;
+    }
+    if (capacity == 0)
+    {
+        PyErr_SetString(PyExc_ValueError, "The capacity of the message trace must be greater than 0");
+        return NULL;
+    }
+
+    messageTrace = (nassl_SSL_MessageTrace *) PyMem_Malloc(sizeof(nassl_SSL_MessageTrace));
+    if (messageTrace == NULL)
+    {
+        return PyErr_NoMemory();
+    }
+    messageTrace->entries = (nassl_SSL_MessageTraceEntry *) PyMem_Malloc(capacity * sizeof(nassl_SSL_MessageTraceEntry));
+    if (messageTrace->entries == NULL)
+    {
+        PyMem_Free(messageTrace);
+        return PyErr_NoMemory();
+    }
+    messageTrace->capacity = capacity;
+    messageTrace->nextIndex = 0;
+    messageTrace->entriesNb = 0;
+
+    SSL_set_msg_callback(self->ssl, message_trace_callback);
+    SSL_set_msg_callback_arg(self->ssl, messageTrace);
+    if (self->messageTrace != NULL)
+    {
+        free_message_trace(self->messageTrace);
+    }
+    self->messageTrace = messageTrace;
+    Py_RETURN_NONE;
+}
+
+
+static PyObject* nassl_SSL_get_message_trace(nassl_SSL_Object *self, PyObject *args)
+{
+    nassl_SSL_MessageTrace *messageTrace = self->messageTrace;
+    nassl_SSL_MessageTraceEntry *entry;
+    PyObject *entriesList, *entryTuple, *handshakeType;
+    unsigned int i, firstIndex;
+
+    if (messageTrace == NULL)
+    {
+        PyErr_SetString(PyExc_RuntimeError, "The message trace was not enabled");
+        return NULL;
+    }
+
+    entriesList = PyList_New(messageTrace->entriesNb);
+    if (entriesList == NULL)
+    {
+        return NULL;
+    }
+
+    // Return the entries from the oldest to the newest
+    firstIndex = (messageTrace->nextIndex + messageTrace->capacity - messageTrace->entriesNb) % messageTrace->capacity;
+    for (i = 0; i < messageTrace->entriesNb; i++)
+    {
+        entry = &messageTrace->entries[(firstIndex + i) % messageTrace->capacity];
+        if (entry->handshakeType < 0)
+        {
+            Py_INCREF(Py_None);
+            handshakeType = Py_None;
+        }
+        else
+        {
+            handshakeType = Py_BuildValue("i", entry->handshakeType);
+            if (handshakeType == NULL)
+            {
+                Py_DECREF(entriesList);
+                return NULL;
+            }
+        }
+
+        entryTuple = Py_BuildValue("OiNnd", entry->isSent ? Py_True : Py_False, entry->contentType, handshakeType,
+                                   (Py_ssize_t) entry->length, entry->timestamp);
+        if (entryTuple == NULL)
+        {
+            Py_DECREF(entriesList);
+            return NULL;
+        }
+        // PyList_SET_ITEM() steals the reference
+        PyList_SET_ITEM(entriesList, i, entryTuple);
+    }
+    return entriesList;
+}
+
+
 static PyMethodDef nassl_SSL_Object_methods[] =
 {
     {"set_bio", (PyCFunction)nassl_SSL_set_bio, METH_VARARGS,
@@ -1001,6 +1835,16 @@ static PyMethodDef nassl_SSL_Object_methods[] =
     {"do_handshake", (PyCFunction)nassl_SSL_do_handshake, METH_NOARGS,
      "OpenSSL's SSL_do_handshake()."
     },
+    {"do_handshake_pump", (PyCFunction)nassl_SSL_do_handshake_pump, METH_VARARGS,
+     "Write the supplied encrypted data to the network BIO, call OpenSSL's SSL_do_handshake() and read all the "
+     "encrypted data available in the network BIO, in a single call. Returns a tuple of (SSL_get_error() code, "
+     "outgoing data, number of bytes of the supplied data that were consumed); exceptions are only raised for actual "
+     "errors."
+    },
+    {"try_do_handshake", (PyCFunction)nassl_SSL_try_do_handshake, METH_NOARGS,
+     "OpenSSL's SSL_do_handshake(), returning the SSL_get_error() code instead of raising an exception when the "
+     "handshake cannot complete yet (SSL_ERROR_WANT_READ, etc.); exceptions are only raised for actual errors."
+    },
     {"set_connect_state", (PyCFunction)nassl_SSL_set_connect_state, METH_NOARGS,
      "OpenSSL's SSL_set_connect_state()."
     },
@@ -1010,9 +1854,32 @@ static PyMethodDef nassl_SSL_Object_methods[] =
     {"read", (PyCFunction)nassl_SSL_read, METH_VARARGS,
      "OpenSSL's SSL_read()."
     },
+    {"read_pump", (PyCFunction)nassl_SSL_read_pump, METH_VARARGS,
+     "Write the supplied encrypted data to the network BIO, call OpenSSL's SSL_read() and read all the encrypted data "
+     "available in the network BIO, in a single call. Returns a tuple of (SSL_get_error() code, decrypted data, "
+     "outgoing data, number of bytes of the supplied data that were consumed); exceptions are only raised for actual "
+     "errors."
+    },
+    {"try_read", (PyCFunction)nassl_SSL_try_read, METH_VARARGS,
+     "OpenSSL's SSL_read(), returning a tuple of (SSL_get_error() code, decrypted data) instead of raising an exception "
+     "when no data can be read yet; exceptions are only raised for actual errors."
+    },
+    {"read_into", (PyCFunction)nassl_SSL_read_into, METH_VARARGS,
+     "OpenSSL's SSL_read(), writing the decrypted data directly into the supplied writable buffer instead of allocating "
+     "a new bytes object. Reads up to nbytes bytes, or the length of the buffer if nbytes is not set, and returns the "
+     "number of bytes read."
+    },
+    {"try_read_into", (PyCFunction)nassl_SSL_try_read_into, METH_VARARGS,
+     "Same as read_into() but returns a tuple of (SSL_get_error() code, number of bytes read) instead of raising an "
+     "exception when no data can be read yet; exceptions are only raised for actual errors."
+    },
     {"write", (PyCFunction)nassl_SSL_write, METH_VARARGS,
      "OpenSSL's SSL_write()."
     },
+    {"try_write", (PyCFunction)nassl_SSL_try_write, METH_VARARGS,
+     "OpenSSL's SSL_write(), returning a tuple of (SSL_get_error() code, number of bytes written) instead of raising an "
+     "exception when the data cannot be written yet; exceptions are only raised for actual errors."
+    },
 #ifndef LEGACY_OPENSSL
     {"write_early_data", (PyCFunction)nassl_SSL_write_early_data, METH_VARARGS,
      "OpenSSL's SSL_write_early_data()."
@@ -1045,6 +1912,23 @@ static PyMethodDef nassl_SSL_Object_methods[] =
     {"set_tlsext_host_name", (PyCFunction)nassl_SSL_set_tlsext_host_name, METH_VARARGS,
      "OpenSSL's SSL_set_tlsext_host_name()."
     },
+    {"set1_groups_list", (PyCFunction)nassl_SSL_set1_groups_list, METH_VARARGS,
+     "OpenSSL's SSL_set1_groups_list(), or SSL_set1_curves_list() with the legacy OpenSSL."
+    },
+    {"get_dh_param", (PyCFunction)nassl_SSL_get_dh_param, METH_NOARGS,
+     "Return the server's Diffie-Hellman parameters as a dictionary with the group_size, and the prime, generator and "
+     "public_key as big-endian bytes."
+    },
+    {"get_ecdh_param", (PyCFunction)nassl_SSL_get_ecdh_param, METH_NOARGS,
+     "Return the server's elliptic curve Diffie-Hellman parameters as a dictionary with the group_size, curve_nid, "
+     "curve_name and nist_curve_name (None for explicit curves), field_type, point_conversion_form, and the prime (or "
+     "polynomial), a, b, generator, order, cofactor, seed and public_key as bytes; only the curve and the raw "
+     "public_key are set for X25519 and X448."
+    },
+    {"get_negotiated_group", (PyCFunction)nassl_SSL_get_negotiated_group, METH_NOARGS,
+     "Use OpenSSL's SSL_get_server_tmp_key() to return the short name of the group used for the ephemeral key exchange, "
+     "or None if there was none or if its finite field parameters are not a group known to DH_get_nid()."
+    },
 #ifndef LEGACY_OPENSSL
     {"get_peer_signature_digest", (PyCFunction)nassl_SSL_get_peer_signature_digest, METH_NOARGS,
     "Wraps OpenSSL's SSL_get_peer_signature_nid() returning the short name of the digest algorithm used by the peer to sign TLS messages."
@@ -1095,6 +1979,9 @@ static PyMethodDef nassl_SSL_Object_methods[] =
     {"set_session", (PyCFunction)nassl_SSL_set_session, METH_VARARGS,
      "OpenSSL's SSL_set_session(). Argument is an _nassl.SSL_SESSION object."
     },
+    {"session_reused", (PyCFunction)nassl_SSL_session_reused, METH_NOARGS,
+     "OpenSSL's SSL_session_reused()."
+    },
     {"set_options", (PyCFunction)nassl_SSL_set_options, METH_VARARGS,
      "OpenSSL's SSL_set_options()."
     },
@@ -1104,16 +1991,19 @@ static PyMethodDef nassl_SSL_Object_methods[] =
     {"get_tlsext_status_ocsp_resp", (PyCFunction)nassl_SSL_get_tlsext_status_ocsp_resp, METH_NOARGS,
      "OpenSSL's SSL_get_tlsext_status_ocsp_resp(). Returns an _nassl.OCSP_RESPONSE object."
     },
+    {"enable_message_trace", (PyCFunction)nassl_SSL_enable_message_trace, METH_VARARGS,
+     "Record the last capacity TLS messages sent or received using OpenSSL's SSL_set_msg_callback(); the messages are "
+     "recorded in C without acquiring the GIL."
+    },
+    {"get_message_trace", (PyCFunction)nassl_SSL_get_message_trace, METH_NOARGS,
+     "Return the recorded TLS messages, from the oldest to the newest, as a list of (is_sent, content_type, "
+     "handshake_type, length, timestamp) tuples. handshake_type is None for messages other than handshake messages, "
+     "and 6 for TLS 1.3 HelloRetryRequest messages. timestamp uses the system's monotonic clock."
+    },
 #ifdef LEGACY_OPENSSL
     {"state_string_long", (PyCFunction)nassl_SSL_state_string_long, METH_NOARGS,
      "OpenSSL's SSL_state_string_long()."
     },
-    {"get_dh_param", (PyCFunction)nassl_SSL_get_dh_param, METH_NOARGS,
-     "return Diffie-Hellman parameters as a string."
-    },
-    {"get_ecdh_param", (PyCFunction)nassl_SSL_get_ecdh_param, METH_NOARGS,
-     "return elliptic curve Diffie-Hellman parameters as a string."
-    },
 #endif
     {"get_peer_cert_chain", (PyCFunction)nassl_SSL_get_peer_cert_chain, METH_NOARGS,
      "OpenSSL's SSL_get_peer_cert_chain(). Returns an array of _nassl.X509 objects."
@@ -3,6 +3,23 @@
 #include "nassl_SSL_CTX.h"
 #include "nassl_BIO.h"
 
+// A TLS message sent or received, as recorded by the message callback
+typedef struct {
+    int isSent;
+    int contentType;
+    int handshakeType;
+    size_t length;
+    double timestamp;
+} nassl_SSL_MessageTraceEntry;
+
+// Ring buffer of the last TLS messages; the message callback writes to it without having to acquire the GIL
+typedef struct {
+    nassl_SSL_MessageTraceEntry *entries;
+    unsigned int capacity;
+    unsigned int nextIndex;
+    unsigned int entriesNb;
+} nassl_SSL_MessageTrace;
+
 // nassl.SSL Python class
 typedef struct {
     PyObject_HEAD
@@ -12,6 +29,9 @@ typedef struct {
     // We only keep a reference of the network BIO so we know when to free the BIO object
     // The internal BIO is auto-freed by SSL_free() which is called in nassl_SSL_dealloc
     nassl_BIO_Object *networkBio_Object;
+
+    // NULL unless enable_message_trace() was called
+    nassl_SSL_MessageTrace *messageTrace;
 } nassl_SSL_Object;
 
 
@@ -2,9 +2,11 @@
 #include <Python.h>
 
 #include <openssl/ssl.h>
+#include <openssl/err.h>
 
 #include "nassl_errors.h"
 #include "nassl_SSL_CTX.h"
+#include "nassl_X509_STORE.h"
 #include "python_utils.h"
 
 
@@ -161,12 +163,18 @@ static PyObject* nassl_SSL_CTX_set_verify(nassl_SSL_CTX_Object *self, PyObject *
 static PyObject* nassl_SSL_CTX_load_verify_locations(nassl_SSL_CTX_Object *self, PyObject *args)
 {
     char *caFilePath = NULL;
+    int returnValue;
     if (PyArg_ParseFilePath(args, &caFilePath) == NULL)
     {
         return NULL;
     }
 
-    if (!SSL_CTX_load_verify_locations(self->sslCtx, caFilePath, NULL))
+    // Parsing a large trust store takes a while; let other threads run
+    Py_BEGIN_ALLOW_THREADS
+    returnValue = SSL_CTX_load_verify_locations(self->sslCtx, caFilePath, NULL);
+    Py_END_ALLOW_THREADS
+
+    if (!returnValue)
     {
         return raise_OpenSSL_error();
     }
@@ -175,6 +183,21 @@ static PyObject* nassl_SSL_CTX_load_verify_locations(nassl_SSL_CTX_Object *self,
 }
 
 
+static PyObject* nassl_SSL_CTX_set_cert_store(nassl_SSL_CTX_Object *self, PyObject *args)
+{
+    nassl_X509_STORE_Object *x509Store_PyObject = NULL;
+    if (!PyArg_ParseTuple(args, "O!", &nassl_X509_STORE_Type, &x509Store_PyObject))
+    {
+        return NULL;
+    }
+
+    // The SSL_CTX takes ownership of the store, which can be shared with other SSL_CTXs
+    X509_STORE_up_ref_compat(x509Store_PyObject->x509Store);
+    SSL_CTX_set_cert_store(self->sslCtx, x509Store_PyObject->x509Store);
+    Py_RETURN_NONE;
+}
+
+
 static PyObject* nassl_SSL_CTX_use_certificate_chain_file(nassl_SSL_CTX_Object *self, PyObject *args)
 {
     char *filePath = NULL;
@@ -307,6 +330,29 @@ static PyObject* nassl_SSL_CTX_set1_sigalgs_list(nassl_SSL_CTX_Object *self, PyO
 }
 
 
+static PyObject* nassl_SSL_CTX_set1_groups_list(nassl_SSL_CTX_Object *self, PyObject *args)
+{
+    char *groupsList = NULL;
+    int returnValue;
+    if (!PyArg_ParseTuple(args, "s", &groupsList))
+    {
+        return NULL;
+    }
+
+#ifdef LEGACY_OPENSSL
+    returnValue = SSL_CTX_set1_curves_list(self->sslCtx, groupsList);
+#else
+    returnValue = SSL_CTX_set1_groups_list(self->sslCtx, groupsList);
+#endif
+    if (!returnValue)
+    {
+        // Unknown groups are reported through the return value; don't leave the error for the next operation
+        ERR_clear_error();
+    }
+    return Py_BuildValue("I", returnValue);
+}
+
+
 static PyMethodDef nassl_SSL_CTX_Object_methods[] =
 {
     {"set_verify", (PyCFunction)nassl_SSL_CTX_set_verify, METH_VARARGS,
@@ -315,6 +361,9 @@ static PyMethodDef nassl_SSL_CTX_Object_methods[] =
     {"load_verify_locations", (PyCFunction)nassl_SSL_CTX_load_verify_locations, METH_VARARGS,
      "OpenSSL's SSL_CTX_load_verify_locations() with a NULL CAPath."
     },
+    {"set_cert_store", (PyCFunction)nassl_SSL_CTX_set_cert_store, METH_VARARGS,
+     "OpenSSL's SSL_CTX_set_cert_store(); the X509_STORE can be shared by multiple SSL_CTXs."
+    },
     {"use_certificate_chain_file", (PyCFunction)nassl_SSL_CTX_use_certificate_chain_file, METH_VARARGS,
      "OpenSSL's SSL_CTX_use_certificate_chain_file()."
     },
@@ -333,6 +382,9 @@ static PyMethodDef nassl_SSL_CTX_Object_methods[] =
     {"set1_sigalgs_list", (PyCFunction)nassl_SSL_CTX_set1_sigalgs_list, METH_VARARGS,
      "OpenSSL's SSL_CTX_set1_sigalgs_list()."
     },
+    {"set1_groups_list", (PyCFunction)nassl_SSL_CTX_set1_groups_list, METH_VARARGS,
+     "OpenSSL's SSL_CTX_set1_groups_list(), or SSL_CTX_set1_curves_list() with the legacy OpenSSL."
+    },
     {NULL}  // Sentinel
 };
 /*
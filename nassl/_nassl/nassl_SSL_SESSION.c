@@ -1,6 +1,8 @@
 
+#define PY_SSIZE_T_CLEAN
 #include <Python.h>
 
+#include <limits.h>
 #include <openssl/ssl.h>
 
 #include "nassl_errors.h"
@@ -10,7 +12,7 @@
 
 static PyObject* nassl_SSL_SESSION_new(PyTypeObject *type, PyObject *args, PyObject *kwds)
 {
-    PyErr_SetString(PyExc_NotImplementedError, "Cannot directly create an SSL_SESSION object. Get it from SSL.get_session()");
+    PyErr_SetString(PyExc_NotImplementedError, "Cannot directly create an SSL_SESSION object. Get it from SSL.get_session() or SSL_SESSION.from_der()");
     return NULL;
 }
 
@@ -31,6 +33,116 @@ static PyObject* nassl_SSL_SESSION_as_text(nassl_SSL_SESSION_Object *self)
     return generic_print_to_string((int (*)(BIO *, const void *)) &SSL_SESSION_print, self->sslSession);
 }
 
+
+static PyObject* nassl_SSL_SESSION_to_der(nassl_SSL_SESSION_Object *self)
+{
+    PyObject *derBytes = NULL;
+    unsigned char *derPtr = NULL;
+    int derSize = i2d_SSL_SESSION(self->sslSession, NULL);
+    if (derSize <= 0)
+    {
+        return raise_OpenSSL_error();
+    }
+
+    derBytes = PyBytes_FromStringAndSize(NULL, derSize);
+    if (derBytes == NULL)
+    {
+        return PyErr_NoMemory();
+    }
+
+    // i2d_SSL_SESSION() moves the pointer past the encoded session
+    derPtr = (unsigned char *) PyBytes_AS_STRING(derBytes);
+    if (i2d_SSL_SESSION(self->sslSession, &derPtr) != derSize)
+    {
+        Py_DECREF(derBytes);
+        return raise_OpenSSL_error();
+    }
+    return derBytes;
+}
+
+
+static PyObject* nassl_SSL_SESSION_from_der(PyTypeObject *type, PyObject *args)
+{
+    nassl_SSL_SESSION_Object *sslSession_PyObject = NULL;
+    SSL_SESSION *sslSession = NULL;
+    const unsigned char *derPtr = NULL;
+    Py_ssize_t derSize = 0;
+
+#if PY_MAJOR_VERSION >= 3
+    if (!PyArg_ParseTuple(args, "y#", &derPtr, &derSize))
+#else
+    if (!PyArg_ParseTuple(args, "s#", &derPtr, &derSize))
+#endif
+    {
+        return NULL;
+    }
+
+    if (derSize > LONG_MAX)
+    {
+        PyErr_SetString(PyExc_OverflowError, "DER data is too large");
+        return NULL;
+    }
+
+    sslSession = d2i_SSL_SESSION(NULL, &derPtr, (long) derSize);
+    if (sslSession == NULL)
+    {
+        return raise_OpenSSL_error();
+    }
+
+    sslSession_PyObject = (nassl_SSL_SESSION_Object *)type->tp_alloc(type, 0);
+    if (sslSession_PyObject == NULL)
+    {
+        SSL_SESSION_free(sslSession);
+        return PyErr_NoMemory();
+    }
+
+    sslSession_PyObject->sslSession = sslSession;
+    return (PyObject *) sslSession_PyObject;
+}
+
+
+static PyObject* nassl_SSL_SESSION_get_time(nassl_SSL_SESSION_Object *self)
+{
+    return Py_BuildValue("l", SSL_SESSION_get_time(self->sslSession));
+}
+
+
+static PyObject* nassl_SSL_SESSION_get_timeout(nassl_SSL_SESSION_Object *self)
+{
+    return Py_BuildValue("l", SSL_SESSION_get_timeout(self->sslSession));
+}
+
+
+static PyObject* nassl_SSL_SESSION_get_ticket_lifetime_hint(nassl_SSL_SESSION_Object *self)
+{
+#ifdef LEGACY_OPENSSL
+    unsigned long lifetimeHint = 0;
+#ifndef OPENSSL_NO_TLSEXT
+    lifetimeHint = (unsigned long) self->sslSession->tlsext_tick_lifetime_hint;
+#endif
+    return Py_BuildValue("k", lifetimeHint);
+#else
+    return Py_BuildValue("k", SSL_SESSION_get_ticket_lifetime_hint(self->sslSession));
+#endif
+}
+
+
+static PyObject* nassl_SSL_SESSION_is_resumable(nassl_SSL_SESSION_Object *self)
+{
+#ifdef LEGACY_OPENSSL
+    // SSL_SESSION_is_resumable() was added in OpenSSL 1.1.1
+    SSL_SESSION *sslSession = self->sslSession;
+    int isResumable = !sslSession->not_resumable && sslSession->session_id_length > 0;
+#ifndef OPENSSL_NO_TLSEXT
+    isResumable = isResumable || (!sslSession->not_resumable && sslSession->tlsext_ticklen > 0);
+#endif
+    return PyBool_FromLong(isResumable);
+#else
+    return PyBool_FromLong(SSL_SESSION_is_resumable(self->sslSession));
+#endif
+}
+
+
 #ifndef LEGACY_OPENSSL
 static PyObject* nassl_SSL_SESSION_set_max_early_data(nassl_SSL_SESSION_Object *self, PyObject *args)
 {
@@ -65,6 +177,24 @@ static PyMethodDef nassl_SSL_SESSION_Object_methods[] =
     {"as_text", (PyCFunction)nassl_SSL_SESSION_as_text, METH_NOARGS,
      "OpenSSL's SSL_SESSION_print()."
     },
+    {"to_der", (PyCFunction)nassl_SSL_SESSION_to_der, METH_NOARGS,
+     "OpenSSL's i2d_SSL_SESSION(). Returns the session encoded as DER bytes."
+    },
+    {"from_der", (PyCFunction)nassl_SSL_SESSION_from_der, METH_VARARGS | METH_CLASS,
+     "OpenSSL's d2i_SSL_SESSION(). Argument is the DER bytes returned by to_der(); returns an _nassl.SSL_SESSION object."
+    },
+    {"get_time", (PyCFunction)nassl_SSL_SESSION_get_time, METH_NOARGS,
+     "OpenSSL's SSL_SESSION_get_time()."
+    },
+    {"get_timeout", (PyCFunction)nassl_SSL_SESSION_get_timeout, METH_NOARGS,
+     "OpenSSL's SSL_SESSION_get_timeout()."
+    },
+    {"get_ticket_lifetime_hint", (PyCFunction)nassl_SSL_SESSION_get_ticket_lifetime_hint, METH_NOARGS,
+     "OpenSSL's SSL_SESSION_get_ticket_lifetime_hint()."
+    },
+    {"is_resumable", (PyCFunction)nassl_SSL_SESSION_is_resumable, METH_NOARGS,
+     "OpenSSL's SSL_SESSION_is_resumable()."
+    },
 #ifndef LEGACY_OPENSSL
     {"set_max_early_data", (PyCFunction)nassl_SSL_SESSION_set_max_early_data, METH_VARARGS,
      "OpenSSL's SSL_SESSION_set_max_early_data()."
@@ -0,0 +1,230 @@
+#define PY_SSIZE_T_CLEAN
+#include <Python.h>
+
+// Fix symbol clashing on Windows
+// https://bugs.launchpad.net/pyopenssl/+bug/570101
+#ifdef _WIN32
+#include "winsock.h"
+#endif
+
+#include <openssl/ssl.h>
+#include <openssl/x509.h>
+#include <openssl/pem.h>
+#include <openssl/err.h>
+
+#include "nassl_errors.h"
+#include "nassl_X509_STORE.h"
+#include "python_utils.h"
+
+
+void X509_STORE_up_ref_compat(X509_STORE *x509Store)
+{
+#ifdef LEGACY_OPENSSL
+    CRYPTO_add(&x509Store->references, 1, CRYPTO_LOCK_X509_STORE);
+#else
+    X509_STORE_up_ref(x509Store);
+#endif
+}
+
+
+// nassl.X509_STORE.new()
+static PyObject* nassl_X509_STORE_new(PyTypeObject *type, PyObject *args, PyObject *kwds)
+{
+    nassl_X509_STORE_Object *self;
+
+    if (!PyArg_ParseTuple(args, ""))
+    {
+        return NULL;
+    }
+
+    self = (nassl_X509_STORE_Object *)type->tp_alloc(type, 0);
+    if (self == NULL)
+    {
+        return NULL;
+    }
+
+    self->x509Store = X509_STORE_new();
+    if (self->x509Store == NULL)
+    {
+        Py_DECREF(self);
+        return raise_OpenSSL_error();
+    }
+    return (PyObject *)self;
+}
+
+
+static void nassl_X509_STORE_dealloc(nassl_X509_STORE_Object *self)
+{
+    if (self->x509Store != NULL)
+    {
+        X509_STORE_free(self->x509Store);
+        self->x509Store = NULL;
+    }
+    Py_TYPE(self)->tp_free((PyObject*)self);
+}
+
+
+static PyObject* nassl_X509_STORE_load_locations(nassl_X509_STORE_Object *self, PyObject *args)
+{
+    char *caFilePath = NULL;
+    int returnValue;
+    if (PyArg_ParseFilePath(args, &caFilePath) == NULL)
+    {
+        return NULL;
+    }
+
+    // Parsing a large trust store takes a while; let other threads run
+    ERR_clear_error();
+    Py_BEGIN_ALLOW_THREADS
+    returnValue = X509_STORE_load_locations(self->x509Store, caFilePath, NULL);
+    Py_END_ALLOW_THREADS
+
+    if (!returnValue)
+    {
+        return raise_OpenSSL_error();
+    }
+
+    Py_RETURN_NONE;
+}
+
+
+static PyObject* nassl_X509_STORE_add_pem_certificates(nassl_X509_STORE_Object *self, PyObject *args)
+{
+    char *pemData = NULL;
+    Py_ssize_t pemDataSize = 0;
+    BIO *memBio = NULL;
+    STACK_OF(X509_INFO) *infoStack = NULL;
+    int i = 0, certsCount = 0, addFailed = 0;
+
+#if PY_MAJOR_VERSION >= 3
+    if (!PyArg_ParseTuple(args, "y#", &pemData, &pemDataSize))
+#else
+    if (!PyArg_ParseTuple(args, "s#", &pemData, &pemDataSize))
+#endif
+    {
+        return NULL;
+    }
+
+    if (pemDataSize > INT_MAX)
+    {
+        PyErr_SetString(PyExc_OverflowError, "PEM data is too large");
+        return NULL;
+    }
+
+    memBio = BIO_new_mem_buf(pemData, (int) pemDataSize);
+    if (memBio == NULL)
+    {
+        return raise_OpenSSL_error();
+    }
+
+    // Same logic as X509_load_cert_crl_file(), which only works with files
+    ERR_clear_error();
+    Py_BEGIN_ALLOW_THREADS
+    infoStack = PEM_X509_INFO_read_bio(memBio, NULL, NULL, NULL);
+    if (infoStack != NULL)
+    {
+        for (i=0; i<sk_X509_INFO_num(infoStack); i++)
+        {
+            X509_INFO *info = sk_X509_INFO_value(infoStack, i);
+            if (info->x509 == NULL)
+            {
+                continue;
+            }
+            if (!X509_STORE_add_cert(self->x509Store, info->x509))
+            {
+                // Duplicate certificates are not an error
+                if (ERR_GET_REASON(ERR_peek_last_error()) != X509_R_CERT_ALREADY_IN_HASH_TABLE)
+                {
+                    addFailed = 1;
+                    break;
+                }
+                ERR_clear_error();
+            }
+            certsCount++;
+        }
+        sk_X509_INFO_pop_free(infoStack, X509_INFO_free);
+    }
+    Py_END_ALLOW_THREADS
+    BIO_free(memBio);
+
+    if ((infoStack == NULL) || addFailed)
+    {
+        return raise_OpenSSL_error();
+    }
+    if (certsCount == 0)
+    {
+        PyErr_SetString(PyExc_ValueError, "Could not find any PEM certificate in the supplied data");
+        return NULL;
+    }
+
+    return Py_BuildValue("I", certsCount);
+}
+
+
+static PyMethodDef nassl_X509_STORE_Object_methods[] =
+{
+    {"load_locations", (PyCFunction)nassl_X509_STORE_load_locations, METH_VARARGS,
+     "OpenSSL's X509_STORE_load_locations() with a NULL CAPath."
+    },
+    {"add_pem_certificates", (PyCFunction)nassl_X509_STORE_add_pem_certificates, METH_VARARGS,
+     "OpenSSL's PEM_X509_INFO_read_bio() and X509_STORE_add_cert(), for each certificate in the supplied PEM bytes. "
+     "Returns the number of certificates that were found."
+    },
+    {NULL}  // Sentinel
+};
+
+
+PyTypeObject nassl_X509_STORE_Type =
+{
+    PyVarObject_HEAD_INIT(NULL, 0)
+    "_nassl.X509_STORE",             /*tp_name*/
+    sizeof(nassl_X509_STORE_Object),             /*tp_basicsize*/
+    0,                         /*tp_itemsize*/
+    (destructor)nassl_X509_STORE_dealloc, /*tp_dealloc*/
+    0,                         /*tp_print*/
+    0,                         /*tp_getattr*/
+    0,                         /*tp_setattr*/
+    0,                         /*tp_compare*/
+    0,                         /*tp_repr*/
+    0,                         /*tp_as_number*/
+    0,                         /*tp_as_sequence*/
+    0,                         /*tp_as_mapping*/
+    0,                         /*tp_hash */
+    0,                         /*tp_call*/
+    0,                         /*tp_str*/
+    0,                         /*tp_getattro*/
+    0,                         /*tp_setattro*/
+    0,                         /*tp_as_buffer*/
+    Py_TPFLAGS_DEFAULT | Py_TPFLAGS_BASETYPE, /*tp_flags*/
+    "X509_STORE objects",           /* tp_doc */
+    0,                     /* tp_traverse */
+    0,                     /* tp_clear */
+    0,                     /* tp_richcompare */
+    0,                     /* tp_weaklistoffset */
+    0,                     /* tp_iter */
+    0,                     /* tp_iternext */
+    nassl_X509_STORE_Object_methods,             /* tp_methods */
+    0,             /* tp_members */
+    0,                         /* tp_getset */
+    0,                         /* tp_base */
+    0,                         /* tp_dict */
+    0,                         /* tp_descr_get */
+    0,                         /* tp_descr_set */
+    0,                         /* tp_dictoffset */
+    0,      /* tp_init */
+    0,                         /* tp_alloc */
+    nassl_X509_STORE_new,                 /* tp_new */
+};
+
+
+void module_add_X509_STORE(PyObject* m)
+{
+	nassl_X509_STORE_Type.tp_new = nassl_X509_STORE_new;
+	if (PyType_Ready(&nassl_X509_STORE_Type) < 0)
+	{
+    	return;
+	}
+
+    Py_INCREF(&nassl_X509_STORE_Type);
+    PyModule_AddObject(m, "X509_STORE", (PyObject *)&nassl_X509_STORE_Type);
+}
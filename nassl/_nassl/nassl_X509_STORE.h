@@ -0,0 +1,15 @@
+#pragma once
+
+// nassl.X509_STORE Python class
+typedef struct {
+    PyObject_HEAD
+    X509_STORE *x509Store; // OpenSSL X509_STORE C struct
+} nassl_X509_STORE_Object;
+
+// Type needs to be accessible to nassl_SSL_CTX.c and nassl_OCSP_RESPONSE.c
+extern PyTypeObject nassl_X509_STORE_Type;
+
+// Increment the reference count of the X509_STORE before handing it to a function that takes ownership of it
+void X509_STORE_up_ref_compat(X509_STORE *x509Store);
+
+void module_add_X509_STORE(PyObject* m);
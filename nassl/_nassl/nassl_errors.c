@@ -142,6 +142,26 @@ PyObject* raise_OpenSSL_ssl_error(SSL *ssl, int returnValue)
 }
 
 
+int get_OpenSSL_ssl_status(SSL *ssl, int returnValue)
+{
+    int sslError = SSL_get_error(ssl, returnValue);
+    switch(sslError)
+    {
+        case SSL_ERROR_NONE:
+        case SSL_ERROR_ZERO_RETURN:
+        case SSL_ERROR_WANT_WRITE:
+        case SSL_ERROR_WANT_READ:
+        case SSL_ERROR_WANT_X509_LOOKUP:
+            // Not actual errors; the caller has to do something (send or receive data, etc.) and retry
+            return sslError;
+
+        default:
+            raise_OpenSSL_ssl_error(ssl, returnValue);
+            return -1;
+    }
+}
+
+
 int module_add_errors(PyObject* m)
 {
 // We want both the modern and legacy nassl to use the same exceptions
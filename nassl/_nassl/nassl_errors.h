@@ -7,4 +7,9 @@ extern PyObject *nassl_OpenSSLError_Exception; // Needed by nassl_X509.c
 
 PyObject* raise_OpenSSL_error(void);
 PyObject* raise_OpenSSL_ssl_error(SSL *ssl, int returnValue);
+
+// Return the SSL_get_error() code if it does not correspond to an actual error (SSL_ERROR_NONE, SSL_ERROR_WANT_READ,
+// etc.); otherwise raise the corresponding exception and return -1
+int get_OpenSSL_ssl_status(SSL *ssl, int returnValue);
+
 int module_add_errors(PyObject* m);
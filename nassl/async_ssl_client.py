@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+"""SSL clients for asyncio; requires Python 3.5+, and is only installed with these versions as it uses the async/await
+syntax.
+"""
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import asyncio
+import socket
+
+from nassl import _nassl  # type: ignore
+
+from nassl.trust_store import TrustStore
+from nassl.ssl_client import SansIoSslClient, OpenSslVersionEnum, OpenSslVerifyEnum, OpenSslFileTypeEnum, \
+    OpenSslStatusEnum
+from typing import Any
+from typing import Optional
+from typing import Text
+from typing import Tuple
+from typing import Union
+
+try:
+    from nassl.legacy_ssl_client import LegacySansIoSslClient
+except ImportError:
+    # The legacy OpenSSL module is not available; only AsyncSslClient can be used
+    LegacySansIoSslClient = None
+
+
+class AsyncSslClient(SansIoSslClient):
+    """High level API implementing an SSL client on top of a non-blocking socket and an asyncio event loop.
+
+    do_handshake(), read(), write() and shutdown() are coroutines; instead of blocking the thread, they wait for the peer
+    using the event loop's sock_recv() and sock_sendall().
+
+    Hostname validation is NOT performed by the SslClient and MUST be implemented at the end of the SSL handshake on the
+    server's certificate, available via get_peer_certificate().
+    """
+
+    _DEFAULT_BUFFER_SIZE = 4096
+
+    def __init__(
+            self,
+            underlying_socket=None,                         # type: Optional[socket.socket]
+            ssl_version=OpenSslVersionEnum.SSLV23,          # type: OpenSslVersionEnum
+            ssl_verify=OpenSslVerifyEnum.PEER,              # type: OpenSslVerifyEnum
+            ssl_verify_locations=None,                      # type: Union[None, Text, TrustStore]
+            client_certchain_file=None,                     # type: Optional[Text]
+            client_key_file=None,                           # type: Optional[Text]
+            client_key_type=OpenSslFileTypeEnum.PEM,        # type: OpenSslFileTypeEnum
+            client_key_password='',                         # type: Text
+            ignore_client_authentication_requests=False,    # type: bool
+            signature_algorithms=None,                      # type: Optional[Text]
+            ssl_ctx=None,                                   # type: Optional[_nassl.SSL_CTX]
+            loop=None                                       # type: Optional[asyncio.AbstractEventLoop]
+    ):
+        # type: (...) -> None
+        self._sock = None  # type: Optional[socket.socket]
+        if underlying_socket is not None:
+            self.set_underlying_socket(underlying_socket)
+        self._loop = loop
+        super(AsyncSslClient, self).__init__(ssl_version, ssl_verify, ssl_verify_locations, client_certchain_file,
+                                             client_key_file, client_key_type, client_key_password,
+                                             ignore_client_authentication_requests, signature_algorithms, ssl_ctx)
+
+    def set_underlying_socket(self, sock):
+        # type: (socket.socket) -> None
+        if self._sock:
+            raise RuntimeError('A socket was already set')
+        # The event loop's socket methods require a non-blocking socket
+        sock.setblocking(False)
+        self._sock = sock
+
+    def get_underlying_socket(self):
+        # type: () -> Optional[socket.socket]
+        return self._sock
+
+    def _get_loop(self):
+        # type: () -> asyncio.AbstractEventLoop
+        if self._loop is None:
+            self._loop = asyncio.get_event_loop()
+        return self._loop
+
+    async def _receive_from_peer(self, error_msg):
+        # type: (Text) -> bytes
+        encrypted_data = await self._get_loop().sock_recv(self._sock, self._DEFAULT_BUFFER_SIZE)
+        if len(encrypted_data) == 0:
+            raise IOError(error_msg)
+        return encrypted_data
+
+    async def _flush_ssl_engine(self):
+        # type: () -> int
+        if self._sock is None:
+            raise IOError('Internal socket set to None; cannot perform handshake.')
+
+        encrypted_data = self.pending_outgoing()
+        if encrypted_data:
+            await self._get_loop().sock_sendall(self._sock, encrypted_data)
+        return len(encrypted_data)
+
+    async def do_handshake(self):
+        # type: () -> None
+        if self._sock is None:
+            raise IOError('Internal socket set to None; cannot perform handshake.')
+
+        incoming_data = b''
+        while True:
+            status, outgoing_data = self.pump_handshake(incoming_data)
+            if outgoing_data:
+                # Send available handshake data to the peer
+                await self._get_loop().sock_sendall(self._sock, outgoing_data)
+
+            if status == OpenSslStatusEnum.NONE:
+                return
+            elif status == OpenSslStatusEnum.WANT_WRITE:
+                incoming_data = b''
+                continue
+
+            # Recover the peer's encrypted response
+            incoming_data = await self._receive_from_peer('Nassl SSL handshake failed: peer did not send data back.')
+
+    async def do_probe(self):
+        # type: () -> Tuple[OpenSslVersionEnum, Optional[Text]]
+        """See SslClient.do_probe().
+        """
+        if self._sock is None:
+            raise IOError('Internal socket set to None; cannot perform handshake.')
+
+        while not self.do_probe_step():
+            await self._flush_ssl_engine()
+            self.feed_incoming(
+                await self._receive_from_peer('Nassl SSL handshake failed: peer did not send data back.')
+            )
+
+        return self.get_ssl_version(), self.get_current_cipher_name()
+
+    async def read(self, size, handshake_must_be_completed=True):
+        # type: (int, bool) -> bytes
+        if self._sock is None:
+            raise IOError('Internal socket set to None; cannot perform handshake.')
+        if handshake_must_be_completed and not self._is_handshake_completed:
+            raise IOError('SSL Handshake was not completed; cannot receive data.')
+
+        incoming_data = b''
+        while True:
+            status, decrypted_data, outgoing_data = self.pump_read(incoming_data, size)
+            if outgoing_data:
+                await self._get_loop().sock_sendall(self._sock, outgoing_data)
+
+            if status == OpenSslStatusEnum.NONE:
+                return decrypted_data
+            elif status == OpenSslStatusEnum.WANT_WRITE:
+                incoming_data = b''
+                continue
+
+            # The SSL engine needs more data before it can decrypt the whole message; see SslClient.read() regarding
+            # ZERO_RETURN
+            incoming_data = await self._receive_from_peer('Could not read() - peer closed the connection.')
+
+    async def recv_into(self, buffer, nbytes=0, handshake_must_be_completed=True):
+        # type: (Any, int, bool) -> int
+        """See SslClient.recv_into().
+        """
+        if self._sock is None:
+            raise IOError('Internal socket set to None; cannot perform handshake.')
+        if handshake_must_be_completed and not self._is_handshake_completed:
+            raise IOError('SSL Handshake was not completed; cannot receive data.')
+
+        while True:
+            status, read_size = self.try_read_into(buffer, nbytes)
+            await self._flush_ssl_engine()
+
+            if status == OpenSslStatusEnum.NONE:
+                return read_size
+            elif status == OpenSslStatusEnum.WANT_WRITE:
+                continue
+
+            self.feed_incoming(await self._receive_from_peer('Could not read() - peer closed the connection.'))
+
+    async def write(self, data):
+        # type: (bytes) -> int
+        """Returns the number of (encrypted) bytes sent; see SslClient.write().
+        """
+        if self._sock is None:
+            raise IOError('Internal socket set to None; cannot perform handshake.')
+        if not self._is_handshake_completed:
+            raise IOError('SSL Handshake was not completed; cannot send data.')
+
+        final_length = 0
+        for data_chunk in self._iter_write_chunks(data):
+            while True:
+                # Pass the cleartext data to the SSL engine
+                status, _ = self.try_write(data_chunk)
+
+                # Send the corresponding encrypted data
+                final_length += await self._flush_ssl_engine()
+                if status == OpenSslStatusEnum.NONE:
+                    break
+                elif status != OpenSslStatusEnum.WANT_WRITE:
+                    raise IOError('Could not write() - SSL engine returned {}.'.format(status.name))
+
+        return final_length
+
+    async def write_early_data(self, data):
+        # type: (bytes) -> int
+        """Returns the number of (encrypted) bytes sent.
+        """
+        super(AsyncSslClient, self).write_early_data(data)
+        return await self._flush_ssl_engine()
+
+    async def shutdown(self):
+        # type: () -> None
+        self._is_handshake_completed = False
+        try:
+            await self._flush_ssl_engine()
+        except IOError:
+            # Ensure shutting down the connection never raises an exception
+            pass
+
+        super(AsyncSslClient, self).shutdown()
+
+
+if LegacySansIoSslClient is not None:
+
+    class AsyncLegacySslClient(LegacySansIoSslClient, AsyncSslClient):
+        """An insecure SSL client for asyncio, with additional debug methods that no one should ever use (insecure
+        renegotiation, etc.).
+
+        The SSL 2.0 handshake workaround for IIS 7 available in LegacySslClient is not supported.
+        """
@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""Enumerate the cipher suites accepted by a server using as few handshakes as possible.
+"""
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+from nassl.handshake_attempt import attempt_handshake
+from nassl.ssl_client import OpenSslVerifyEnum, OpenSslVersionEnum, SslClient
+from nassl.ssl_context_cache import SslContextCache
+from typing import List
+from typing import Optional
+from typing import Text
+from typing import Type
+
+
+# Cipher suites supported by the modern OpenSSL for TLS 1.3, which are configured separately from the other ones
+TLS13_CIPHER_SUITES = [
+    'TLS_AES_256_GCM_SHA384',
+    'TLS_CHACHA20_POLY1305_SHA256',
+    'TLS_AES_128_GCM_SHA256',
+    'TLS_AES_128_CCM_SHA256',
+    'TLS_AES_128_CCM_8_SHA256',
+]
+
+
+class CipherEnumerationResult(object):
+    """The cipher suites accepted by a server for one SSL/TLS version.
+    """
+
+    def __init__(
+            self,
+            ssl_version,                    # type: OpenSslVersionEnum
+            accepted_cipher_names,          # type: List[Text]
+            server_has_cipher_preference,   # type: Optional[bool]
+            handshakes_nb                   # type: int
+    ):
+        # type: (...) -> None
+        self.ssl_version = ssl_version
+        # In the order the server selected them; this is the server's preference order if it enforces one
+        self.accepted_cipher_names = accepted_cipher_names
+        # None if fewer than two cipher suites were accepted, or if the server selected a cipher suite that matches
+        # neither its own nor the client's preference
+        self.server_has_cipher_preference = server_has_cipher_preference
+        self.handshakes_nb = handshakes_nb
+
+
+class CipherEnumerator(object):
+    """Find the cipher suites accepted by a server by offering all the candidate cipher suites at once, removing the one
+    the server selected, and repeating until the server rejects the handshake:
+
+        enumerator = CipherEnumerator('www.example.com', 443, server_name_indication='www.example.com')
+        result = enumerator.enumerate(OpenSslVersionEnum.TLSV1_2)
+        print(result.accepted_cipher_names)
+
+    This takes one handshake per accepted cipher suite plus one, instead of one handshake per candidate. As the server
+    always selects its most preferred cipher suite among the ones offered when it enforces its own preference, the
+    selection order also gives the server's preference order, which a single additional handshake offering the accepted
+    cipher suites in reverse order confirms.
+
+    Offering all the cipher suites at once results in a large ClientHello, which a few old servers do not answer.
+    """
+
+    def __init__(
+            self,
+            host,                           # type: Text
+            port,                           # type: int
+            client_cls=SslClient,           # type: Type[SslClient]
+            server_name_indication=None,    # type: Optional[Text]
+            timeout=5.0,                    # type: float
+            ssl_context_cache=None          # type: Optional[SslContextCache]
+    ):
+        # type: (...) -> None
+        """client_cls is SslClient or LegacySslClient; the latter supports SSL 2.0 and SSL 3.0 but not TLS 1.3. timeout
+        applies to each connection and each handshake.
+        """
+        self._host = host
+        self._port = port
+        self._client_cls = client_cls
+        self._server_name_indication = server_name_indication
+        self._timeout = timeout
+        self._ssl_context_cache = ssl_context_cache if ssl_context_cache else SslContextCache()
+
+    def get_candidate_cipher_names(self, ssl_version):
+        # type: (OpenSslVersionEnum) -> List[Text]
+        """Return all the cipher suites supported by client_cls for the given SSL/TLS version.
+        """
+        if ssl_version == OpenSslVersionEnum.TLSV1_3:
+            return list(TLS13_CIPHER_SUITES)
+
+        ssl_client = self._create_ssl_client(ssl_version)
+        ssl_client.set_cipher_list('ALL:COMPLEMENTOFALL')
+        return [cipher_name for cipher_name in ssl_client.get_cipher_list()
+                if cipher_name not in TLS13_CIPHER_SUITES]
+
+    def enumerate(self, ssl_version, cipher_names=None):
+        # type: (OpenSslVersionEnum, Optional[List[Text]]) -> CipherEnumerationResult
+        """Find which of cipher_names, by default all the cipher suites supported by client_cls, the server accepts;
+        the cipher suites not supported by client_cls are ignored.
+
+        Connection errors and timeouts are raised; any other handshake failure means that the server rejected all the
+        cipher suites offered.
+        """
+        remaining_cipher_names = self.get_candidate_cipher_names(ssl_version)
+        if cipher_names:
+            remaining_cipher_names = [cipher_name for cipher_name in cipher_names
+                                      if cipher_name in remaining_cipher_names]
+        accepted_cipher_names = []  # type: List[Text]
+        handshakes_nb = 0
+        while remaining_cipher_names:
+            selected_cipher_name = self._get_selected_cipher_name(ssl_version, remaining_cipher_names)
+            handshakes_nb += 1
+            if selected_cipher_name is None or selected_cipher_name not in remaining_cipher_names:
+                break
+            accepted_cipher_names.append(selected_cipher_name)
+            remaining_cipher_names.remove(selected_cipher_name)
+
+        server_has_cipher_preference = None
+        if len(accepted_cipher_names) >= 2:
+            # A server enforcing its own preference selects the same cipher suite as during the first handshake
+            selected_cipher_name = self._get_selected_cipher_name(ssl_version, accepted_cipher_names[::-1])
+            handshakes_nb += 1
+            if selected_cipher_name == accepted_cipher_names[0]:
+                server_has_cipher_preference = True
+            elif selected_cipher_name == accepted_cipher_names[-1]:
+                server_has_cipher_preference = False
+
+        return CipherEnumerationResult(ssl_version, accepted_cipher_names, server_has_cipher_preference, handshakes_nb)
+
+    def _create_ssl_client(self, ssl_version):
+        # type: (OpenSslVersionEnum) -> SslClient
+        ssl_ctx = self._ssl_context_cache.get_ssl_ctx(self._client_cls, ssl_version, OpenSslVerifyEnum.NONE)
+        return self._client_cls(ssl_version=ssl_version, ssl_verify=OpenSslVerifyEnum.NONE, ssl_ctx=ssl_ctx)
+
+    def _get_selected_cipher_name(self, ssl_version, cipher_names):
+        # type: (OpenSslVersionEnum, List[Text]) -> Optional[Text]
+        """Perform a handshake offering cipher_names in this order and return the cipher suite selected by the server,
+        or None if the handshake was rejected.
+        """
+        ssl_client = self._create_ssl_client(ssl_version)
+        if ssl_version == OpenSslVersionEnum.TLSV1_3:
+            ssl_client.set_cipher_list(ciphersuites=':'.join(cipher_names))
+        else:
+            ssl_client.set_cipher_list(':'.join(cipher_names))
+        if self._server_name_indication:
+            ssl_client.set_tlsext_host_name(self._server_name_indication)
+
+        if not attempt_handshake(ssl_client, self._host, self._port, self._timeout):
+            return None
+        return ssl_client.get_current_cipher_name()
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import time
+from collections import OrderedDict
+
+from typing import Dict
+from typing import Optional
+from typing import Text
+
+
+monotonic = getattr(time, 'monotonic', time.time)
+
+
+class IoCounters(object):
+    """The network I/O performed during one phase of a connection.
+    """
+
+    def __init__(self):
+        # type: () -> None
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.send_calls_nb = 0
+        self.recv_calls_nb = 0
+
+
+class ConnectionTimings(object):
+    """Timestamps of the milestones of a connection, returned by time.monotonic() (time.time() on Python 2), and the
+    network I/O performed while waiting for each of them.
+
+    A milestone is None until it is reached; certificate_received is never reached when resuming a session. The I/O
+    performed after a milestone was reached is counted towards the next one in MILESTONES.
+
+    The milestones are:
+    * socket_attached: the underlying socket was set, or timings were enabled if the socket was already set.
+    * client_hello_sent: the ClientHello was sent.
+    * server_hello_received: the data containing the ServerHello was received.
+    * certificate_received: the data containing the server's certificate was received.
+    * handshake_completed: the server's last message was processed and the client's last message was sent.
+    * first_application_data_received: the data containing the first application data was received.
+
+    Comparing the milestones allows separating the network latency from the time the server and the client spent
+    processing the handshake.
+    """
+
+    MILESTONES = (
+        'socket_attached',
+        'client_hello_sent',
+        'server_hello_received',
+        'certificate_received',
+        'handshake_completed',
+        'first_application_data_received',
+    )
+
+    def __init__(self):
+        # type: () -> None
+        self.socket_attached = None  # type: Optional[float]
+        self.client_hello_sent = None  # type: Optional[float]
+        self.server_hello_received = None  # type: Optional[float]
+        self.certificate_received = None  # type: Optional[float]
+        self.handshake_completed = None  # type: Optional[float]
+        self.first_application_data_received = None  # type: Optional[float]
+        self.io_counters = OrderedDict((milestone, IoCounters()) for milestone in self.MILESTONES)
+
+    def record(self, milestone, timestamp=None):
+        # type: (Text, Optional[float]) -> None
+        """Record the timestamp of a milestone, unless it was already reached.
+        """
+        if getattr(self, milestone) is None:
+            setattr(self, milestone, monotonic() if timestamp is None else timestamp)
+
+    def get_current_io_counters(self):
+        # type: () -> IoCounters
+        next_milestone_index = 0
+        for index, milestone in enumerate(self.MILESTONES):
+            if getattr(self, milestone) is not None:
+                next_milestone_index = index + 1
+        return self.io_counters[self.MILESTONES[min(next_milestone_index, len(self.MILESTONES) - 1)]]
+
+    def get_durations(self):
+        # type: () -> Dict[Text, float]
+        """Return the number of seconds it took to reach each milestone from the previous milestone that was reached.
+        """
+        durations = OrderedDict()  # type: Dict[Text, float]
+        previous_timestamp = None
+        for milestone in self.MILESTONES:
+            timestamp = getattr(self, milestone)
+            if timestamp is None:
+                continue
+            if previous_timestamp is not None:
+                durations[milestone] = timestamp - previous_timestamp
+            previous_timestamp = timestamp
+        return durations
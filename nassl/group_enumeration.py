@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+"""Enumerate the groups accepted by a server for the ephemeral key exchange using as few handshakes as possible.
+"""
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+from nassl.handshake_attempt import attempt_handshake
+from nassl.legacy_ssl_client import LegacySslClient
+from nassl.ssl_client import OpenSslVerifyEnum, OpenSslVersionEnum, SslClient
+from nassl.ssl_context_cache import SslContextCache
+from typing import List
+from typing import Optional
+from typing import Text
+from typing import Tuple
+from typing import Type
+
+
+# Groups as returned by get_negotiated_group(); the ones not supported by the client's OpenSSL are skipped
+GROUPS = [
+    'X25519',
+    'X448',
+    'prime256v1',
+    'secp384r1',
+    'secp521r1',
+    'secp256k1',
+    'secp224r1',
+    'brainpoolP256r1',
+    'brainpoolP384r1',
+    'brainpoolP512r1',
+    'ffdhe2048',
+    'ffdhe3072',
+    'ffdhe4096',
+    'ffdhe6144',
+    'ffdhe8192',
+]
+
+
+class GroupEnumerationResult(object):
+    """The groups accepted by a server for one SSL/TLS version.
+    """
+
+    def __init__(
+            self,
+            ssl_version,                    # type: OpenSslVersionEnum
+            accepted_groups,                # type: List[Text]
+            hello_retry_request_groups,     # type: List[Text]
+            has_custom_dh_parameters,       # type: bool
+            handshakes_nb                   # type: int
+    ):
+        # type: (...) -> None
+        self.ssl_version = ssl_version
+        # In the order the server selected them; this includes the well-known finite field groups that the server uses
+        # for DHE cipher suites regardless of the client, such as 'modp_2048' (RFC 3526) with recent OpenSSL versions
+        self.accepted_groups = accepted_groups
+        # With TLS 1.3, the accepted groups that the server selected using a HelloRetryRequest because the client had not
+        # sent a key share for them; the server preferred them over the group of the client's key share
+        self.hello_retry_request_groups = hello_retry_request_groups
+        # Whether the server accepted DHE cipher suites using finite field parameters that are not a well-known group
+        self.has_custom_dh_parameters = has_custom_dh_parameters
+        self.handshakes_nb = handshakes_nb
+
+
+class GroupEnumerator(object):
+    """Find the groups accepted by a server by offering all the candidate groups at once, removing the one the server
+    selected, and repeating until the server rejects the handshake:
+
+        enumerator = GroupEnumerator('www.example.com', 443, server_name_indication='www.example.com')
+        result = enumerator.enumerate(OpenSslVersionEnum.TLSV1_3)
+        print(result.accepted_groups)
+
+    This takes one handshake per accepted group plus one. The negotiated group is read from the server's ephemeral key
+    using get_negotiated_group(), which also works for the finite field groups and X25519.
+
+    With TLS 1.2 and earlier, the elliptic curves are enumerated using ECDHE cipher suites first. Once they are
+    exhausted, DHE cipher suites are offered with the ffdhe groups the client's OpenSSL supports, if any; as most TLS
+    1.2 servers choose their finite field parameters regardless of the client, this takes one additional handshake,
+    which also tells whether the server uses a well-known group or custom parameters. LegacySslClient cannot identify
+    finite field groups, so the DHE handshakes are skipped with it.
+    """
+
+    def __init__(
+            self,
+            host,                           # type: Text
+            port,                           # type: int
+            client_cls=SslClient,           # type: Type[SslClient]
+            server_name_indication=None,    # type: Optional[Text]
+            timeout=5.0,                    # type: float
+            ssl_context_cache=None          # type: Optional[SslContextCache]
+    ):
+        # type: (...) -> None
+        """client_cls is SslClient or LegacySslClient; the latter only supports elliptic curves. timeout applies to each
+        connection and each handshake.
+        """
+        self._host = host
+        self._port = port
+        self._client_cls = client_cls
+        self._server_name_indication = server_name_indication
+        self._timeout = timeout
+        self._ssl_context_cache = ssl_context_cache if ssl_context_cache else SslContextCache()
+
+    def get_candidate_groups(self, ssl_version):
+        # type: (OpenSslVersionEnum) -> List[Text]
+        """Return the groups of GROUPS supported by client_cls.
+        """
+        ssl_client = self._create_ssl_client(ssl_version)
+        candidate_groups = []
+        for group in GROUPS:
+            try:
+                ssl_client.set_groups(group)
+            except ValueError:
+                continue
+            candidate_groups.append(group)
+        return candidate_groups
+
+    def enumerate(self, ssl_version, groups=None):
+        # type: (OpenSslVersionEnum, Optional[List[Text]]) -> GroupEnumerationResult
+        """Find which of groups, by default all of GROUPS, the server accepts; the groups not supported by client_cls
+        are ignored.
+
+        Connection errors and timeouts are raised; any other handshake failure means that the server rejected all the
+        groups offered.
+        """
+        candidate_groups = self.get_candidate_groups(ssl_version)
+        requested_groups = groups if groups else GROUPS
+        remaining_groups = [group for group in requested_groups if group in candidate_groups]
+        accepted_groups = []  # type: List[Text]
+        hello_retry_request_groups = []  # type: List[Text]
+        has_custom_dh_parameters = False
+        handshakes_nb = 0
+
+        if ssl_version == OpenSslVersionEnum.TLSV1_3:
+            # All the groups are negotiated using the key shares
+            remaining_ec_groups = remaining_groups
+            remaining_ffdhe_groups = []  # type: List[Text]
+        else:
+            remaining_ec_groups = [group for group in remaining_groups if not group.startswith('ffdhe')]
+            remaining_ffdhe_groups = [group for group in remaining_groups if group.startswith('ffdhe')]
+
+        while remaining_ec_groups:
+            is_accepted, selected_group, is_hello_retry_request = self._get_selected_group(
+                ssl_version, remaining_ec_groups, None if ssl_version == OpenSslVersionEnum.TLSV1_3 else 'ECDHE'
+            )
+            handshakes_nb += 1
+            if not is_accepted or selected_group not in remaining_ec_groups:
+                break
+            accepted_groups.append(selected_group)
+            remaining_ec_groups.remove(selected_group)
+            if is_hello_retry_request:
+                hello_retry_request_groups.append(selected_group)
+
+        if ssl_version != OpenSslVersionEnum.TLSV1_3 and any(group.startswith('ffdhe') for group in requested_groups) \
+                and not issubclass(self._client_cls, LegacySslClient):
+            while True:
+                is_accepted, selected_group, _ = self._get_selected_group(
+                    ssl_version, remaining_ffdhe_groups if remaining_ffdhe_groups else None, 'DHE'
+                )
+                handshakes_nb += 1
+                if not is_accepted:
+                    break
+                if selected_group in remaining_ffdhe_groups:
+                    accepted_groups.append(selected_group)
+                    remaining_ffdhe_groups.remove(selected_group)
+                    continue
+
+                # The server chose its finite field parameters regardless of the groups offered
+                if selected_group is None:
+                    has_custom_dh_parameters = True
+                elif selected_group not in accepted_groups:
+                    accepted_groups.append(selected_group)
+                break
+
+        return GroupEnumerationResult(ssl_version, accepted_groups, hello_retry_request_groups,
+                                      has_custom_dh_parameters, handshakes_nb)
+
+    def _create_ssl_client(self, ssl_version):
+        # type: (OpenSslVersionEnum) -> SslClient
+        ssl_ctx = self._ssl_context_cache.get_ssl_ctx(self._client_cls, ssl_version, OpenSslVerifyEnum.NONE)
+        return self._client_cls(ssl_version=ssl_version, ssl_verify=OpenSslVerifyEnum.NONE, ssl_ctx=ssl_ctx)
+
+    def _get_selected_group(self, ssl_version, groups, cipher_list):
+        # type: (OpenSslVersionEnum, Optional[List[Text]], Optional[Text]) -> Tuple[bool, Optional[Text], bool]
+        """Perform a handshake offering groups, or the client's default groups if groups is None, and the cipher suites
+        of cipher_list if it is not None.
+
+        Returns whether the server accepted the handshake, the group it selected (see get_negotiated_group()), and
+        whether it sent a HelloRetryRequest.
+        """
+        ssl_client = self._create_ssl_client(ssl_version)
+        if groups is not None:
+            ssl_client.set_groups(':'.join(groups))
+        if cipher_list is not None:
+            # Make sure the server performs the expected kind of key exchange
+            ssl_client.set_cipher_list(cipher_list)
+        if self._server_name_indication:
+            ssl_client.set_tlsext_host_name(self._server_name_indication)
+        ssl_client.enable_message_trace()
+
+        if not attempt_handshake(ssl_client, self._host, self._port, self._timeout):
+            return False, None, False
+        return True, ssl_client.get_negotiated_group(), ssl_client.get_hello_retry_requests_count() > 0
@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+"""Perform the handshakes used to find out what a server accepts.
+"""
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import socket
+
+from nassl._nassl import OpenSSLError  # type: ignore
+from nassl.ssl_client import ClientCertificateRequested, SslClient
+from typing import Text
+
+
+def attempt_handshake(ssl_client, host, port, timeout):
+    # type: (SslClient, Text, int, float) -> bool
+    """Connect ssl_client to the server, perform a handshake and close the connection; timeout applies to the connection
+    and to the handshake.
+
+    Returns whether the server accepted the handshake, which is also the case if the server requested a client
+    certificate, as the ServerHello and the server's key exchange were processed by then. Connection errors and timeouts
+    are raised; any other handshake failure means that the server rejected the handshake.
+    """
+    ssl_client.connect(host, port, timeout)
+    try:
+        ssl_client.do_handshake(timeout)
+    except ClientCertificateRequested:
+        pass
+    except socket.timeout:
+        raise
+    except (OpenSSLError, IOError):
+        return False
+    finally:
+        ssl_client.get_underlying_socket().close()
+    return True
@@ -0,0 +1,272 @@
+# -*- coding: utf-8 -*-
+"""Perform many SSL handshakes concurrently from a single thread; requires Python 3.4+.
+"""
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import errno
+import heapq
+import itertools
+import os
+import selectors
+import socket
+import time
+
+from nassl import _nassl  # type: ignore
+from nassl.ssl_client import SansIoSslClient, OpenSslVersionEnum, OpenSslStatusEnum, SslDeadlineExceeded
+from nassl.ssl_context_cache import SslContextCache
+from typing import Any
+from typing import Dict
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Text
+from typing import Tuple
+from typing import Type
+
+
+class HandshakeJob(object):
+    """A handshake to perform with a server.
+
+    ssl_ctx_options are the arguments to pass to SslContextCache.get_ssl_ctx() in order to configure the client; jobs
+    with the same options share a single SSL_CTX. If the address contains a host name, it will be resolved
+    synchronously, which blocks all the other handshakes; IP addresses should be used instead whenever possible.
+    """
+
+    def __init__(
+            self,
+            address,                        # type: Tuple[Text, int]
+            client_cls=SansIoSslClient,     # type: Type[SansIoSslClient]
+            ssl_ctx_options=None,           # type: Optional[Dict[Text, Any]]
+            server_name_indication=None     # type: Optional[Text]
+    ):
+        # type: (...) -> None
+        self.address = address
+        self.client_cls = client_cls
+        self.ssl_ctx_options = ssl_ctx_options if ssl_ctx_options else {}
+        self.server_name_indication = server_name_indication
+
+
+class HandshakeResult(object):
+    """The outcome of a HandshakeJob.
+
+    If the handshake succeeded, ssl_client is the sans-IO client that performed it and can be used to retrieve the
+    server's certificate chain, the cipher suite, etc. Otherwise, error is the exception that made it fail (IOError,
+    OpenSSLError, ClientCertificateRequested or SslDeadlineExceeded).
+    """
+
+    def __init__(
+            self,
+            job,            # type: HandshakeJob
+            ssl_client,     # type: Optional[SansIoSslClient]
+            error,          # type: Optional[Exception]
+            duration        # type: float
+    ):
+        # type: (...) -> None
+        self.job = job
+        self.ssl_client = ssl_client
+        self.error = error
+        self.duration = duration
+
+    @property
+    def is_successful(self):
+        # type: () -> bool
+        return self.error is None
+
+
+class _HandshakeConnection(object):
+
+    def __init__(self, job, ssl_client, sock, start_time, deadline):
+        # type: (HandshakeJob, SansIoSslClient, socket.socket, float, float) -> None
+        self.job = job
+        self.ssl_client = ssl_client
+        self.sock = sock
+        self.start_time = start_time
+        self.deadline = deadline
+        self.is_connected = False
+        self.is_closed = False
+        self.outgoing_data = bytearray()
+
+
+class HandshakeEngine(object):
+    """Drive the SSL handshakes of many connections from a single thread, using non-blocking sockets and the most
+    efficient selector available on the platform (epoll, kqueue, etc.).
+
+        engine = HandshakeEngine(max_connections=1000)
+        ssl_ctx_options = {'ssl_verify': OpenSslVerifyEnum.NONE}
+        for result in engine.run(HandshakeJob((ip_address, 443), ssl_ctx_options=ssl_ctx_options)
+                                 for ip_address in ip_addresses):
+            if result.is_successful:
+                print(result.ssl_client.get_peer_certificate())
+
+    The sockets are closed as soon as the handshake completes.
+    """
+
+    _DEFAULT_BUFFER_SIZE = 16384
+
+    def __init__(self, max_connections=1000, timeout=5.0, ssl_context_cache=None):
+        # type: (int, float, Optional[SslContextCache]) -> None
+        """max_connections is the maximum number of handshakes in flight and timeout the number of seconds allowed for
+        connecting to the server and completing the handshake.
+        """
+        self._max_connections = max_connections
+        self._timeout = timeout
+        self._ssl_context_cache = ssl_context_cache if ssl_context_cache else SslContextCache()
+        # All the data received from the peers goes through the same buffer
+        self._recv_buffer = bytearray(self._DEFAULT_BUFFER_SIZE)
+
+    def run(self, jobs):
+        # type: (Iterable[HandshakeJob]) -> Iterator[HandshakeResult]
+        """Perform the handshakes and yield their results as each of them completes.
+
+        The jobs are consumed lazily, so that the iterable can be a generator.
+        """
+        jobs_iter = iter(jobs)
+        selector = selectors.DefaultSelector()
+        # Heap of (deadline, counter, connection); entries of closed connections are discarded when reaching the top
+        deadlines = []  # type: List[Tuple[float, int, _HandshakeConnection]]
+        counter = itertools.count()
+        connections_nb = 0
+        are_jobs_exhausted = False
+        try:
+            while True:
+                # Start new handshakes
+                while not are_jobs_exhausted and connections_nb < self._max_connections:
+                    job = next(jobs_iter, None)
+                    if job is None:
+                        are_jobs_exhausted = True
+                        break
+
+                    start_time = time.monotonic()
+                    try:
+                        connection = self._connect(job, start_time)
+                    except (EnvironmentError, _nassl.OpenSSLError) as e:
+                        yield HandshakeResult(job, None, e, time.monotonic() - start_time)
+                        continue
+
+                    selector.register(connection.sock, selectors.EVENT_WRITE, connection)
+                    heapq.heappush(deadlines, (connection.deadline, next(counter), connection))
+                    connections_nb += 1
+
+                if connections_nb == 0:
+                    return
+
+                while deadlines[0][2].is_closed:
+                    heapq.heappop(deadlines)
+                select_timeout = max(0.0, deadlines[0][0] - time.monotonic())
+
+                # Process the connections that are ready
+                for key, events in selector.select(select_timeout):
+                    connection = key.data
+                    try:
+                        is_completed = self._process_events(connection, events)
+                    except (EnvironmentError, _nassl.OpenSSLError) as e:
+                        self._close(selector, connection)
+                        connections_nb -= 1
+                        yield HandshakeResult(connection.job, None, e, time.monotonic() - connection.start_time)
+                        continue
+
+                    if is_completed:
+                        self._close(selector, connection)
+                        connections_nb -= 1
+                        yield HandshakeResult(connection.job, connection.ssl_client, None,
+                                              time.monotonic() - connection.start_time)
+                    else:
+                        events = selectors.EVENT_READ
+                        if connection.outgoing_data or not connection.is_connected:
+                            events |= selectors.EVENT_WRITE
+                        selector.modify(connection.sock, events, connection)
+
+                # Expire the connections that timed out
+                now = time.monotonic()
+                while deadlines and deadlines[0][0] <= now:
+                    _, _, connection = heapq.heappop(deadlines)
+                    if connection.is_closed:
+                        continue
+                    self._close(selector, connection)
+                    connections_nb -= 1
+                    yield HandshakeResult(connection.job, None, SslDeadlineExceeded('Handshake timed out'),
+                                          now - connection.start_time)
+        finally:
+            for key in list(selector.get_map().values()):
+                self._close(selector, key.data)
+            selector.close()
+
+    def _connect(self, job, start_time):
+        # type: (HandshakeJob, float) -> _HandshakeConnection
+        ssl_ctx = self._ssl_context_cache.get_ssl_ctx(job.client_cls, **job.ssl_ctx_options)
+        ssl_version = job.ssl_ctx_options.get('ssl_version', OpenSslVersionEnum.SSLV23)
+        ssl_client = job.client_cls(ssl_version=ssl_version, ssl_ctx=ssl_ctx)
+        if job.server_name_indication:
+            ssl_client.set_tlsext_host_name(job.server_name_indication)
+
+        host, port = job.address
+        family, sock_type, proto, _, sock_address = socket.getaddrinfo(host, port, 0, socket.SOCK_STREAM)[0]
+        sock = socket.socket(family, sock_type, proto)
+        sock.setblocking(False)
+        error = sock.connect_ex(sock_address)
+        if error not in (0, errno.EINPROGRESS, errno.EWOULDBLOCK):
+            sock.close()
+            raise socket.error(error, os.strerror(error))
+
+        return _HandshakeConnection(job, ssl_client, sock, start_time, start_time + self._timeout)
+
+    def _process_events(self, connection, events):
+        # type: (_HandshakeConnection, int) -> bool
+        """Returns True once the handshake has been completed and all the data for the server has been sent.
+        """
+        if not connection.is_connected:
+            # The socket becomes writable once the connection has been established or has failed
+            error = connection.sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+            if error:
+                raise socket.error(error, os.strerror(error))
+            connection.is_connected = True
+            self._pump_handshake(connection, b'')
+
+        else:
+            if events & selectors.EVENT_READ:
+                try:
+                    received_size = connection.sock.recv_into(self._recv_buffer)
+                except BlockingIOError:
+                    received_size = None
+
+                if received_size == 0:
+                    raise IOError('Nassl SSL handshake failed: peer did not send data back.')
+                elif received_size:
+                    self._pump_handshake(connection, memoryview(self._recv_buffer)[:received_size])
+
+            if events & selectors.EVENT_WRITE:
+                self._send_outgoing_data(connection)
+
+        return connection.ssl_client.is_handshake_completed() and not connection.outgoing_data
+
+    def _pump_handshake(self, connection, incoming_data):
+        # type: (_HandshakeConnection, bytes) -> None
+        while True:
+            status, outgoing_data = connection.ssl_client.pump_handshake(incoming_data)
+            connection.outgoing_data += outgoing_data
+            if status != OpenSslStatusEnum.WANT_WRITE:
+                break
+            # The BIO pair was full; keep going now that it was flushed
+            incoming_data = b''
+
+        self._send_outgoing_data(connection)
+
+    @staticmethod
+    def _send_outgoing_data(connection):
+        # type: (_HandshakeConnection) -> None
+        if not connection.outgoing_data:
+            return
+        try:
+            sent_size = connection.sock.send(connection.outgoing_data)
+        except BlockingIOError:
+            return
+        del connection.outgoing_data[:sent_size]
+
+    @staticmethod
+    def _close(selector, connection):
+        # type: (selectors.BaseSelector, _HandshakeConnection) -> None
+        connection.is_closed = True
+        selector.unregister(connection.sock)
+        connection.sock.close()
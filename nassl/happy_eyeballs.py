@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+"""Connection establishment racing the server's IPv6 and IPv4 addresses, as described in RFC 8305 (Happy Eyeballs v2).
+"""
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import errno
+import os
+import select
+import socket
+import time
+
+try:
+    import selectors
+except ImportError:
+    # Python 2
+    selectors = None  # type: ignore
+
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Text
+from typing import Tuple
+
+
+# Recommended value for the "Connection Attempt Delay" in RFC 8305
+DEFAULT_CONNECTION_ATTEMPT_DELAY = 0.25
+
+_monotonic = getattr(time, 'monotonic', time.time)
+
+
+def _interleave_address_families(addr_infos):
+    # type: (List[Tuple[Any, ...]]) -> List[Tuple[Any, ...]]
+    """Alternate between address families, starting with the family of the first address returned by getaddrinfo().
+    """
+    addr_infos_by_family = {}  # type: Dict[int, List[Tuple[Any, ...]]]
+    families = []
+    for addr_info in addr_infos:
+        family = addr_info[0]
+        if family not in addr_infos_by_family:
+            addr_infos_by_family[family] = []
+            families.append(family)
+        addr_infos_by_family[family].append(addr_info)
+
+    interleaved_addr_infos = []
+    while any(addr_infos_by_family.values()):
+        for family in families:
+            if addr_infos_by_family[family]:
+                interleaved_addr_infos.append(addr_infos_by_family[family].pop(0))
+    return interleaved_addr_infos
+
+
+def _wait_for_completed_attempts(pending_sockets, timeout):
+    # type: (List[socket.socket], float) -> List[socket.socket]
+    """Return the sockets whose connection attempt completed, successfully or not, within timeout seconds.
+
+    select.select() cannot be used as it fails with file descriptors greater than FD_SETSIZE, which a process running
+    many connections at once easily reaches.
+    """
+    if selectors is not None:
+        selector = selectors.DefaultSelector()
+        try:
+            for sock in pending_sockets:
+                selector.register(sock, selectors.EVENT_WRITE)
+            return [key.fileobj for key, _ in selector.select(timeout)]  # type: ignore
+        finally:
+            selector.close()
+
+    elif hasattr(select, 'poll'):
+        sockets_by_fd = dict((sock.fileno(), sock) for sock in pending_sockets)
+        poller = select.poll()
+        for sock in pending_sockets:
+            # Errors and hang-ups are always reported
+            poller.register(sock, select.POLLOUT)
+        return [sockets_by_fd[fd] for fd, _ in poller.poll(timeout * 1000)]
+
+    _, writable_sockets, errored_sockets = select.select([], pending_sockets, pending_sockets, timeout)
+    return list(set(writable_sockets + errored_sockets))
+
+
+def create_connection(host, port, timeout=5.0, connection_attempt_delay=DEFAULT_CONNECTION_ATTEMPT_DELAY):
+    # type: (Text, int, float, float) -> socket.socket
+    """Connect to the server using all the addresses returned by getaddrinfo(), alternating between IPv6 and IPv4.
+
+    A new connection attempt is started every connection_attempt_delay seconds, or as soon as the previous attempt
+    failed, until one of them succeeds; the other attempts are then cancelled. A broken address family therefore only
+    delays the connection instead of making it time out. timeout applies to the whole connection establishment and is
+    then set on the returned blocking socket.
+
+    Raises socket.timeout if no connection could be established in time, or the error of the last attempt that failed.
+    """
+    addr_infos = _interleave_address_families(socket.getaddrinfo(host, port, 0, socket.SOCK_STREAM))
+    if not addr_infos:
+        raise socket.error('getaddrinfo() returned no addresses for {}'.format(host))
+
+    deadline = _monotonic() + timeout
+    next_attempt_time = _monotonic()
+    pending_sockets = []  # type: List[socket.socket]
+    last_error = None  # type: Optional[Exception]
+    connected_sock = None  # type: Optional[socket.socket]
+    try:
+        while connected_sock is None:
+            now = _monotonic()
+            if now >= deadline:
+                raise socket.timeout('Timed out connecting to {}:{}'.format(host, port))
+
+            # Start the next connection attempt
+            if addr_infos and (not pending_sockets or now >= next_attempt_time):
+                family, sock_type, proto, _, sock_address = addr_infos.pop(0)
+                sock = socket.socket(family, sock_type, proto)
+                sock.setblocking(False)
+                error = sock.connect_ex(sock_address)
+                if error == 0:
+                    connected_sock = sock
+                    break
+                elif error in (errno.EINPROGRESS, errno.EWOULDBLOCK):
+                    pending_sockets.append(sock)
+                    next_attempt_time = now + connection_attempt_delay
+                else:
+                    # Immediately move on to the next address
+                    sock.close()
+                    last_error = socket.error(error, os.strerror(error))
+                    continue
+
+            if not pending_sockets:
+                # All the attempts failed
+                raise last_error
+
+            # Wait for one of the attempts to complete, or for the time to start the next one
+            wait_until = min(deadline, next_attempt_time) if addr_infos else deadline
+            for sock in _wait_for_completed_attempts(pending_sockets, max(0.0, wait_until - _monotonic())):
+                error = sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+                if error == 0:
+                    connected_sock = sock
+                    break
+                else:
+                    pending_sockets.remove(sock)
+                    sock.close()
+                    last_error = socket.error(error, os.strerror(error))
+                    # Start the next attempt right away
+                    next_attempt_time = _monotonic()
+    finally:
+        # Cancel the other attempts
+        for sock in pending_sockets:
+            if sock is not connected_sock:
+                sock.close()
+
+    connected_sock.setblocking(True)
+    connected_sock.settimeout(timeout)
+    # The handshake consists of small messages that should not be delayed by Nagle's algorithm
+    connected_sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    return connected_sock
@@ -8,12 +8,13 @@ from typing import Any
 from nassl import _nassl
 from typing import Dict
 from typing import Text
+from nassl.trust_store import TrustStore
 
 
 class OcspResponseNotTrustedError(IOError):
 
     def __init__(self, trust_store_path):
-        # type: (Text) -> None
+        # type: (Optional[Text]) -> None
         self.trust_store_path = trust_store_path
 
 
@@ -47,26 +48,41 @@ class OcspResponse(object):
         return ocsp_first_resp.decode('utf-8')
 
     def verify(self, verify_locations):
-        # type: (Text) -> None
+        # type: (Union[Text, TrustStore]) -> None
         """Verify that the OCSP response is trusted.
 
         Args:
-            verify_locations: The file path to a trust store containing pem-formatted certificates, to be used for
-            validating the OCSP response.
+            verify_locations: The file path to a trust store containing pem-formatted certificates, or a TrustStore, to
+            be used for validating the OCSP response. A TrustStore avoids parsing the certificates at every call.
 
         Raises OcspResponseNotTrustedError if the validation failed ie. the OCSP response is not trusted.
         """
-        # Ensure the file exists
-        with open(verify_locations):
-            pass
+        if isinstance(verify_locations, TrustStore):
+            trust_store_path = verify_locations.path
+            verify_locations_arg = verify_locations.get_x509_store(self._get_nassl_module())  # type: Any
+        else:
+            # Ensure the file exists
+            with open(verify_locations):
+                pass
+            trust_store_path = verify_locations
+            verify_locations_arg = verify_locations
 
         try:
-            self._ocsp_response.basic_verify(verify_locations)
+            self._ocsp_response.basic_verify(verify_locations_arg)
         except _nassl.OpenSSLError as e:
             if 'certificate verify error' in str(e):
-                raise OcspResponseNotTrustedError(verify_locations)
+                raise OcspResponseNotTrustedError(trust_store_path)
             raise
 
+    def _get_nassl_module(self):
+        # type: () -> Any
+        """Return the nassl module (_nassl or _nassl_legacy) the OCSP response comes from.
+        """
+        if isinstance(self._ocsp_response, _nassl.OCSP_RESPONSE):
+            return _nassl
+        from nassl import _nassl_legacy  # type: ignore
+        return _nassl_legacy
+
     def as_dict(self):
         # type: () -> Dict[Text, Any]
         return self._ocsp_response_dict
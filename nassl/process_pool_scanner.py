@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+"""Spread SSL handshakes over several processes sharing pre-configured SSL_CTX objects; requires Python 3.4+ and a
+platform supporting fork().
+"""
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import gc
+import multiprocessing
+import queue
+
+# Load both OpenSSL modules before forking so that the worker processes do not have to initialize them
+from nassl import _nassl  # type: ignore  # noqa: F401
+from nassl import legacy_ssl_client  # noqa: F401
+from nassl.handshake_engine import HandshakeEngine, HandshakeJob, HandshakeResult
+from nassl.ssl_client import OpenSslVersionEnum
+from nassl.ssl_context_cache import SslContextCache
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Text
+from typing import Tuple
+
+
+class HandshakeSummary(object):
+    """The picklable outcome of a handshake, as returned by default by the worker processes.
+    """
+
+    def __init__(
+            self,
+            ssl_version,                    # type: Optional[OpenSslVersionEnum]
+            cipher_name,                    # type: Optional[Text]
+            certificate_chain,              # type: List[Text]
+            verify_result,                  # type: Optional[Tuple[int, Text]]
+            error                           # type: Optional[Text]
+    ):
+        # type: (...) -> None
+        self.ssl_version = ssl_version
+        self.cipher_name = cipher_name
+        self.certificate_chain = certificate_chain
+        self.verify_result = verify_result
+        self.error = error
+
+    @classmethod
+    def from_handshake_result(cls, result):
+        # type: (HandshakeResult) -> HandshakeSummary
+        if not result.is_successful:
+            return cls(None, None, [], None, '{}: {}'.format(result.error.__class__.__name__, result.error))
+
+        ssl_client = result.ssl_client
+        return cls(
+            ssl_version=ssl_client.get_ssl_version(),
+            cipher_name=ssl_client.get_current_cipher_name(),
+            certificate_chain=[certificate.as_pem() for certificate in ssl_client.get_peer_cert_chain()],
+            verify_result=ssl_client.get_certificate_chain_verify_result(),
+            error=None,
+        )
+
+
+class ProcessPoolScanner(object):
+    """Perform handshakes using one HandshakeEngine per worker process, in order to use all the available cores.
+
+    Before forking the worker processes, both OpenSSL modules get loaded and the SSL_CTX objects needed by the jobs get
+    configured, including the parsing of their trust stores. The workers then share these structures with the parent
+    process instead of each of them initializing their own copy:
+
+        scanner = ProcessPoolScanner()
+        for job, summary in scanner.run(jobs):
+            print(job.address, summary.cipher_name)
+
+    The results are streamed back to the parent process as the handshakes complete.
+    """
+
+    def __init__(
+            self,
+            processes_nb=None,                  # type: Optional[int]
+            max_connections_per_process=1000,   # type: int
+            timeout=5.0,                        # type: float
+            ssl_context_cache=None              # type: Optional[SslContextCache]
+    ):
+        # type: (...) -> None
+        """processes_nb defaults to the number of cores. max_connections_per_process and timeout are passed to the
+        HandshakeEngine of each worker process.
+        """
+        self._processes_nb = processes_nb if processes_nb else multiprocessing.cpu_count()
+        self._max_connections_per_process = max_connections_per_process
+        self._timeout = timeout
+        self._ssl_context_cache = ssl_context_cache if ssl_context_cache else SslContextCache()
+
+    # How often to check whether the worker processes are still alive while waiting for results, in seconds
+    _WORKERS_CHECK_INTERVAL = 0.5
+
+    def run(self, jobs, result_processor=HandshakeSummary.from_handshake_result):
+        # type: (List[HandshakeJob], Callable[[HandshakeResult], Any]) -> Iterator[Tuple[HandshakeJob, Any]]
+        """Perform the handshakes and yield each job with its result, as the handshakes complete.
+
+        result_processor is called in the worker processes in order to extract what is needed from each HandshakeResult,
+        as the sans-IO clients cannot be sent back to the parent process; what it returns must be picklable.
+
+        RuntimeError is raised once the results of the other worker processes were yielded if a worker process failed,
+        including if it got killed.
+        """
+        jobs = list(jobs)
+        if not jobs:
+            return
+
+        # Configure all the SSL_CTX objects before forking
+        for job in jobs:
+            self._ssl_context_cache.get_ssl_ctx(job.client_cls, **job.ssl_ctx_options)
+
+        # Objects created so far will not be tracked by the garbage collector anymore, which would otherwise write to
+        # the memory pages shared with the worker processes
+        if hasattr(gc, 'freeze'):
+            gc.freeze()
+
+        mp_context = multiprocessing.get_context('fork')
+        results_queue = mp_context.Queue()
+        processes_nb = min(self._processes_nb, len(jobs))
+        processes = [
+            mp_context.Process(target=self._run_worker, args=(jobs, index, processes_nb, result_processor, results_queue))
+            for index in range(processes_nb)
+        ]
+        for process in processes:
+            process.start()
+
+        try:
+            finished_workers = set()
+            while len(finished_workers) < processes_nb:
+                try:
+                    queue_item = results_queue.get(timeout=self._WORKERS_CHECK_INTERVAL)
+                except queue.Empty:
+                    # A worker that got killed never reports that it is done
+                    for worker_index, process in enumerate(processes):
+                        if process.exitcode not in (None, 0):
+                            finished_workers.add(worker_index)
+                    continue
+
+                if isinstance(queue_item, int):
+                    finished_workers.add(queue_item)
+                    continue
+                job_index, processed_result = queue_item
+                yield jobs[job_index], processed_result
+
+            for process in processes:
+                process.join()
+                if process.exitcode != 0:
+                    raise RuntimeError('Scanner process exited with code {}'.format(process.exitcode))
+        finally:
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+            if hasattr(gc, 'unfreeze'):
+                gc.unfreeze()
+
+    def _run_worker(self, jobs, worker_index, workers_nb, result_processor, results_queue):
+        # type: (List[HandshakeJob], int, int, Callable[[HandshakeResult], Any], multiprocessing.Queue) -> None
+        try:
+            # The same job object may appear several times in the list
+            job_indexes = {}  # type: Dict[int, List[int]]
+            worker_jobs = []
+            for job_index in range(worker_index, len(jobs), workers_nb):
+                job_indexes.setdefault(id(jobs[job_index]), []).append(job_index)
+                worker_jobs.append(jobs[job_index])
+
+            engine = HandshakeEngine(self._max_connections_per_process, self._timeout, self._ssl_context_cache)
+            for result in engine.run(worker_jobs):
+                results_queue.put((job_indexes[id(result.job)].pop(), result_processor(result)))
+        finally:
+            # Let the parent process know that this worker is done
+            results_queue.put(worker_index)
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+"""Find which SSL/TLS versions a server supports, using the OpenSSL module that supports each version.
+"""
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import threading
+from collections import OrderedDict
+
+from nassl.handshake_attempt import attempt_handshake
+from nassl.legacy_ssl_client import LegacySslClient
+from nassl.ssl_client import OpenSslVerifyEnum, OpenSslVersionEnum, SslClient
+from nassl.ssl_context_cache import SslContextCache
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Text
+from typing import Type
+
+
+class ProtocolVersionProber(object):
+    """Probe the SSL/TLS versions supported by a server, with at most max_connections handshakes in flight at once:
+
+        prober = ProtocolVersionProber('www.example.com', 443, server_name_indication='www.example.com')
+        for ssl_version, is_supported in prober.probe().items():
+            print(ssl_version.name, is_supported)
+
+    SSL 2.0 and SSL 3.0 are probed using the legacy OpenSSL, and TLS versions using the modern OpenSSL. A first
+    handshake lets the server pick the highest TLS version it supports, which answers the probes for that version and
+    all the higher ones; only the lower versions then need their own handshake.
+    """
+
+    PROTOCOL_VERSIONS = [
+        OpenSslVersionEnum.SSLV2,
+        OpenSslVersionEnum.SSLV3,
+        OpenSslVersionEnum.TLSV1,
+        OpenSslVersionEnum.TLSV1_1,
+        OpenSslVersionEnum.TLSV1_2,
+        OpenSslVersionEnum.TLSV1_3,
+    ]
+
+    _CLIENT_CLS_FOR_SSL_VERSION = {
+        OpenSslVersionEnum.SSLV2: LegacySslClient,
+        OpenSslVersionEnum.SSLV3: LegacySslClient,
+        OpenSslVersionEnum.TLSV1: SslClient,
+        OpenSslVersionEnum.TLSV1_1: SslClient,
+        OpenSslVersionEnum.TLSV1_2: SslClient,
+        OpenSslVersionEnum.TLSV1_3: SslClient,
+    }  # type: Dict[OpenSslVersionEnum, Type[SslClient]]
+
+    def __init__(
+            self,
+            host,                           # type: Text
+            port,                           # type: int
+            server_name_indication=None,    # type: Optional[Text]
+            timeout=5.0,                    # type: float
+            max_connections=3,              # type: int
+            ssl_context_cache=None          # type: Optional[SslContextCache]
+    ):
+        # type: (...) -> None
+        """timeout applies to each connection and each handshake.
+        """
+        self._host = host
+        self._port = port
+        self._server_name_indication = server_name_indication
+        self._timeout = timeout
+        self._connections_semaphore = threading.BoundedSemaphore(max_connections)
+        self._ssl_context_cache = ssl_context_cache if ssl_context_cache else SslContextCache()
+
+    def probe(self, ssl_versions=None):
+        # type: (Optional[List[OpenSslVersionEnum]]) -> Dict[OpenSslVersionEnum, bool]
+        """Return whether each of ssl_versions, by default all of PROTOCOL_VERSIONS, is supported by the server, from the
+        lowest to the highest version.
+
+        Connection errors and timeouts are raised; any other handshake failure means that the version is not supported.
+        """
+        ssl_versions = [ssl_version for ssl_version in self.PROTOCOL_VERSIONS
+                        if ssl_versions is None or ssl_version in ssl_versions]
+        results = OrderedDict((ssl_version, None) for ssl_version in ssl_versions)  # type: Dict[OpenSslVersionEnum, Any]
+        errors = []  # type: List[Exception]
+
+        def run_in_thread(target, *args):
+            # type: (Callable, *Any) -> threading.Thread
+            def run():
+                # type: () -> None
+                try:
+                    with self._connections_semaphore:
+                        target(*args)
+                except Exception as e:
+                    errors.append(e)
+
+            thread = threading.Thread(target=run)
+            thread.daemon = True
+            thread.start()
+            return thread
+
+        def probe_ssl_version(ssl_version):
+            # type: (OpenSslVersionEnum) -> None
+            results[ssl_version] = self._get_negotiated_ssl_version(ssl_version) == ssl_version
+
+        def find_highest_tls_version():
+            # type: () -> None
+            highest_ssl_version = self._get_negotiated_ssl_version(OpenSslVersionEnum.SSLV23)
+            if highest_ssl_version in (None, OpenSslVersionEnum.UNKNOWN):
+                return
+            for ssl_version in results:
+                if ssl_version >= highest_ssl_version:
+                    results[ssl_version] = ssl_version == highest_ssl_version
+
+        # The SSL versions cannot be negotiated by the modern OpenSSL, so they are probed right away
+        threads = [run_in_thread(probe_ssl_version, ssl_version) for ssl_version in ssl_versions
+                   if self._CLIENT_CLS_FOR_SSL_VERSION[ssl_version] is not SslClient]
+        tls_versions = [ssl_version for ssl_version in ssl_versions
+                        if self._CLIENT_CLS_FOR_SSL_VERSION[ssl_version] is SslClient]
+        if len(tls_versions) > 1:
+            run_in_thread(find_highest_tls_version).join()
+        threads.extend(run_in_thread(probe_ssl_version, ssl_version) for ssl_version in tls_versions
+                       if results[ssl_version] is None)
+        for thread in threads:
+            thread.join()
+
+        if errors:
+            raise errors[0]
+        return results
+
+    def _get_negotiated_ssl_version(self, ssl_version):
+        # type: (OpenSslVersionEnum) -> Optional[OpenSslVersionEnum]
+        """Perform a handshake using ssl_version and return the version negotiated with the server, or None if the
+        handshake was rejected.
+        """
+        client_cls = self._CLIENT_CLS_FOR_SSL_VERSION.get(ssl_version, SslClient)
+        ssl_ctx = self._ssl_context_cache.get_ssl_ctx(client_cls, ssl_version, OpenSslVerifyEnum.NONE)
+        ssl_client = client_cls(ssl_version=ssl_version, ssl_verify=OpenSslVerifyEnum.NONE, ssl_ctx=ssl_ctx)
+        if self._server_name_indication and ssl_version != OpenSslVersionEnum.SSLV2:
+            ssl_client.set_tlsext_host_name(self._server_name_indication)
+
+        if not attempt_handshake(ssl_client, self._host, self._port, self._timeout):
+            return None
+        return ssl_client.get_ssl_version()
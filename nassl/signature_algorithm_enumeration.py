@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""Enumerate the signature algorithms accepted by a server using as few handshakes as possible.
+"""
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+from collections import OrderedDict
+
+from nassl.handshake_attempt import attempt_handshake
+from nassl.ssl_client import OpenSslVerifyEnum, OpenSslVersionEnum, SslClient
+from nassl.ssl_context_cache import SslContextCache
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Text
+from typing import Tuple
+
+
+# Signature algorithms in the format expected by set1_sigalgs_list(), with the signature type and digest returned by
+# get_peer_signature_type() and get_peer_signature_digest() when the server uses them. The rsa_pss_pss_* algorithms are
+# left out as they cannot be told apart from the RSA-PSS ones, and are only usable with the rare RSA-PSS certificates.
+SIGNATURE_ALGORITHMS = OrderedDict([
+    ('ed25519', ('ED25519', None)),
+    ('ed448', ('ED448', None)),
+    ('ECDSA+SHA512', ('id-ecPublicKey', 'SHA512')),
+    ('ECDSA+SHA384', ('id-ecPublicKey', 'SHA384')),
+    ('ECDSA+SHA256', ('id-ecPublicKey', 'SHA256')),
+    ('ECDSA+SHA224', ('id-ecPublicKey', 'SHA224')),
+    ('ECDSA+SHA1', ('id-ecPublicKey', 'SHA1')),
+    ('RSA-PSS+SHA512', ('RSASSA-PSS', 'SHA512')),
+    ('RSA-PSS+SHA384', ('RSASSA-PSS', 'SHA384')),
+    ('RSA-PSS+SHA256', ('RSASSA-PSS', 'SHA256')),
+    ('RSA+SHA512', ('rsaEncryption', 'SHA512')),
+    ('RSA+SHA384', ('rsaEncryption', 'SHA384')),
+    ('RSA+SHA256', ('rsaEncryption', 'SHA256')),
+    ('RSA+SHA224', ('rsaEncryption', 'SHA224')),
+    ('RSA+SHA1', ('rsaEncryption', 'SHA1')),
+])  # type: Dict[Text, Tuple[Text, Optional[Text]]]
+
+
+class SignatureAlgorithmEnumerationResult(object):
+    """The signature algorithms accepted by a server for one TLS version.
+    """
+
+    def __init__(self, ssl_version, accepted_signature_algorithms, handshakes_nb):
+        # type: (OpenSslVersionEnum, List[Text], int) -> None
+        self.ssl_version = ssl_version
+        # In the order the server selected them
+        self.accepted_signature_algorithms = accepted_signature_algorithms
+        self.handshakes_nb = handshakes_nb
+
+    def get_accepted_signature_algorithms_by_type(self):
+        # type: () -> Dict[Text, List[Text]]
+        """Return the accepted signature algorithms grouped by the signature type, which depends on the type of the
+        server's certificate.
+        """
+        signature_algorithms_by_type = OrderedDict()  # type: Dict[Text, List[Text]]
+        for signature_algorithm in self.accepted_signature_algorithms:
+            signature_type = SIGNATURE_ALGORITHMS[signature_algorithm][0]
+            signature_algorithms_by_type.setdefault(signature_type, []).append(signature_algorithm)
+        return signature_algorithms_by_type
+
+
+class SignatureAlgorithmEnumerator(object):
+    """Find the signature algorithms accepted by a server by offering all the candidate signature algorithms at once,
+    removing the one the server used, and repeating until the server rejects the handshake:
+
+        enumerator = SignatureAlgorithmEnumerator('www.example.com', 443, server_name_indication='www.example.com')
+        result = enumerator.enumerate(OpenSslVersionEnum.TLSV1_3)
+        print(result.get_accepted_signature_algorithms_by_type())
+
+    This takes one handshake per accepted signature algorithm plus one, instead of one handshake per candidate. A server
+    with several certificates switches to another certificate once the signature algorithms for the first one are
+    exhausted, so the signature algorithms for each of its certificates are found in the same run.
+
+    The SSL_CTX configured for each list of signature algorithms is taken from an SslContextCache, so that it gets reused
+    when enumerating the signature algorithms of other servers. Only the modern OpenSSL can report the signature type
+    used by the server.
+    """
+
+    def __init__(
+            self,
+            host,                           # type: Text
+            port,                           # type: int
+            server_name_indication=None,    # type: Optional[Text]
+            timeout=5.0,                    # type: float
+            ssl_context_cache=None          # type: Optional[SslContextCache]
+    ):
+        # type: (...) -> None
+        """timeout applies to each connection and each handshake.
+        """
+        self._host = host
+        self._port = port
+        self._server_name_indication = server_name_indication
+        self._timeout = timeout
+        self._ssl_context_cache = ssl_context_cache if ssl_context_cache else SslContextCache()
+
+    def enumerate(self, ssl_version, signature_algorithms=None):
+        # type: (OpenSslVersionEnum, Optional[List[Text]]) -> SignatureAlgorithmEnumerationResult
+        """Find which of signature_algorithms, by default all of SIGNATURE_ALGORITHMS, the server accepts with TLS 1.2
+        or TLS 1.3.
+
+        Connection errors and timeouts are raised; any other handshake failure means that the server rejected all the
+        signature algorithms offered.
+        """
+        if ssl_version not in (OpenSslVersionEnum.TLSV1_2, OpenSslVersionEnum.TLSV1_3):
+            raise ValueError('Signature algorithms can only be negotiated with TLS 1.2 and TLS 1.3')
+
+        remaining_signature_algorithms = list(signature_algorithms if signature_algorithms else SIGNATURE_ALGORITHMS)
+        for signature_algorithm in remaining_signature_algorithms:
+            if signature_algorithm not in SIGNATURE_ALGORITHMS:
+                raise ValueError('Unsupported signature algorithm {}'.format(signature_algorithm))
+
+        accepted_signature_algorithms = []  # type: List[Text]
+        handshakes_nb = 0
+        while remaining_signature_algorithms:
+            selected_signature_algorithm = self._get_selected_signature_algorithm(
+                ssl_version, remaining_signature_algorithms
+            )
+            handshakes_nb += 1
+            if selected_signature_algorithm is None:
+                break
+            accepted_signature_algorithms.append(selected_signature_algorithm)
+            remaining_signature_algorithms.remove(selected_signature_algorithm)
+
+        return SignatureAlgorithmEnumerationResult(ssl_version, accepted_signature_algorithms, handshakes_nb)
+
+    def _get_selected_signature_algorithm(self, ssl_version, signature_algorithms):
+        # type: (OpenSslVersionEnum, List[Text]) -> Optional[Text]
+        """Perform a handshake offering signature_algorithms and return the one used by the server, or None if the
+        handshake was rejected.
+        """
+        ssl_ctx = self._ssl_context_cache.get_ssl_ctx(
+            SslClient, ssl_version, OpenSslVerifyEnum.NONE, signature_algorithms=':'.join(signature_algorithms)
+        )
+        ssl_client = SslClient(ssl_version=ssl_version, ssl_verify=OpenSslVerifyEnum.NONE, ssl_ctx=ssl_ctx)
+        if self._server_name_indication:
+            ssl_client.set_tlsext_host_name(self._server_name_indication)
+
+        if not attempt_handshake(ssl_client, self._host, self._port, self._timeout):
+            return None
+        peer_signature = (ssl_client.get_peer_signature_type(), ssl_client.get_peer_signature_digest())
+        for signature_algorithm in signature_algorithms:
+            if SIGNATURE_ALGORITHMS[signature_algorithm] == peer_signature:
+                return signature_algorithm
+        # The server used a signature algorithm that was not offered
+        return None
@@ -5,20 +5,47 @@ from __future__ import unicode_literals
 import os
 import socket
 
+try:
+    import copyreg
+except ImportError:
+    import copy_reg as copyreg  # type: ignore
+
 from nassl import _nassl  # type: ignore
 from nassl._nassl import WantReadError, OpenSSLError, WantX509LookupError, X509, SslError  # type: ignore
 
 from enum import IntEnum
+from typing import Any
+from typing import Dict
+from typing import Iterator
 from typing import List
 from typing import Optional
 from typing import Text
 from typing import Tuple
+from typing import Union
+from nassl import happy_eyeballs
+from nassl.connection_timings import ConnectionTimings, monotonic
 from nassl.ocsp_response import OcspResponse
+from nassl.ssl_session_cache import SslSessionCache
+from nassl.trust_store import TrustStore
 
 import re
 SECRETS_PATTERN = re.compile(r'Session-ID: (?P<sessid>[0-9A-Z]+).+Master-Key: (?P<masterkey>[0-9A-Z]+)')
 
 
+def _unpickle_ssl_session(session_der):
+    # type: (bytes) -> _nassl.SSL_SESSION
+    return _nassl.SSL_SESSION.from_der(session_der)
+
+
+def _pickle_ssl_session(ssl_session):
+    # type: (_nassl.SSL_SESSION) -> Tuple[Any, Tuple[bytes]]
+    return _unpickle_ssl_session, (ssl_session.to_der(),)
+
+
+# Sessions are pickled as DER so that they can be resumed by another process
+copyreg.pickle(_nassl.SSL_SESSION, _pickle_ssl_session)
+
+
 class OpenSslVerifyEnum(IntEnum):
     """SSL validation options which map to the SSL_VERIFY_XXX OpenSSL constants.
     """
@@ -56,6 +83,17 @@ class OpenSslEarlyDataStatusEnum(IntEnum):
     ACCEPTED = 2
 
 
+class OpenSslStatusEnum(IntEnum):
+    """SSL_get_error() codes returned instead of an exception when an SSL operation needs the caller to do something
+    (such as receiving more data from the peer) before it can complete.
+    """
+    NONE = 0
+    WANT_READ = 2
+    WANT_WRITE = 3
+    WANT_X509_LOOKUP = 4
+    ZERO_RETURN = 6
+
+
 class ClientCertificateRequested(IOError):
     ERROR_MSG_CAS = 'Server requested a client certificate issued by one of the following CAs: {0}.'
     ERROR_MSG = 'Server requested a client certificate.'
@@ -73,69 +111,166 @@ class ClientCertificateRequested(IOError):
         return exc_msg
 
 
-class SslClient(object):
-    """High level API implementing an SSL client.
+class SslDeadlineExceeded(socket.timeout):
+    """Raised when an operation did not complete within its overall timeout; unlike the socket's own timeout, which
+    applies to each recv() call, it cannot be extended by a peer sending its data one byte at a time.
+    """
 
-    Hostname validation is NOT performed by the SslClient and MUST be implemented at the end of the SSL handshake on the
-    server's certificate, available via get_peer_certificate().
+
+class TlsMessage(object):
+    """A TLS message sent or received during a connection, as recorded by SansIoSslClient.enable_message_trace().
     """
 
-    _DEFAULT_BUFFER_SIZE = 4096
+    CONTENT_TYPE_CHANGE_CIPHER_SPEC = 20
+    CONTENT_TYPE_ALERT = 21
+    CONTENT_TYPE_HANDSHAKE = 22
+    CONTENT_TYPE_APPLICATION_DATA = 23
+
+    HANDSHAKE_TYPE_CLIENT_HELLO = 1
+    HANDSHAKE_TYPE_SERVER_HELLO = 2
+    # Actually sent as a ServerHello; reported using its code point in the TLS 1.3 drafts
+    HANDSHAKE_TYPE_HELLO_RETRY_REQUEST = 6
+    HANDSHAKE_TYPE_CERTIFICATE = 11
+
+    def __init__(self, is_sent, content_type, handshake_type, length, timestamp):
+        # type: (bool, int, Optional[int], int, float) -> None
+        self.is_sent = is_sent
+        self.content_type = content_type
+        # None for messages other than handshake messages
+        self.handshake_type = handshake_type
+        self.length = length
+        # Comparable with connection_timings.monotonic() on Python 3
+        self.timestamp = timestamp
+
+    @property
+    def is_hello_retry_request(self):
+        # type: () -> bool
+        return self.handshake_type == self.HANDSHAKE_TYPE_HELLO_RETRY_REQUEST
+
+    def __repr__(self):
+        return '<TlsMessage is_sent={} content_type={} handshake_type={} length={}>'.format(
+            self.is_sent, self.content_type, self.handshake_type, self.length
+        )
+
 
+class SansIoSslClient(object):
+    """High level API implementing an SSL client that does not perform any network I/O.
+
+    Encrypted data received from the peer is passed to the client using feed_incoming(), and encrypted data to be sent to
+    the peer is retrieved using pending_outgoing(); the caller is responsible for transmitting it. This allows driving
+    connections from an event loop or any custom transport.
+
+    Hostname validation is NOT performed by the SslClient and MUST be implemented at the end of the SSL handshake on the
+    server's certificate, available via get_peer_certificate().
+    """
 
     # The default client uses the modern OpenSSL
     _NASSL_MODULE = _nassl
 
     def __init__(
             self,
-            underlying_socket=None,                         # type: Optional[socket.socket]
             ssl_version=OpenSslVersionEnum.SSLV23,          # type: OpenSslVersionEnum
             ssl_verify=OpenSslVerifyEnum.PEER,              # type: OpenSslVerifyEnum
-            ssl_verify_locations=None,                      # type: Optional[Text]
+            ssl_verify_locations=None,                      # type: Union[None, Text, TrustStore]
             client_certchain_file=None,                     # type: Optional[Text]
             client_key_file=None,                           # type: Optional[Text]
             client_key_type=OpenSslFileTypeEnum.PEM,        # type: OpenSslFileTypeEnum
             client_key_password='',                         # type: Text
             ignore_client_authentication_requests=False,    # type: bool
-            signature_algorithms=None                       # type: Optional[Text]
+            signature_algorithms=None,                      # type: Optional[Text]
+            ssl_ctx=None                                    # type: Optional[_nassl.SSL_CTX]
     ):
         # type: (...) -> None
-        self._init_base_objects(ssl_version, underlying_socket)
+        """ssl_verify_locations is either the path to a trust store file or a TrustStore, which avoids parsing the
+        certificates for every SSL_CTX.
 
-        # Warning: Anything that modifies the SSL_CTX must be done before creating the SSL object
-        # Otherwise changes to the SSL_CTX do not get propagated to future SSL objects
-        self._init_server_authentication(ssl_verify, ssl_verify_locations)
-        self._init_client_authentication(client_certchain_file, client_key_file, client_key_type,
-                                         client_key_password, ignore_client_authentication_requests)
-        if signature_algorithms:
-            self._set_tlsext_signature_algorithms(signature_algorithms)
+        If ssl_ctx is supplied, it must have been created by create_ssl_ctx() (or an SslContextCache) using the same
+        ssl_version; the SSL_CTX-level arguments (verification, client authentication and signature algorithms) are
+        then taken from ssl_ctx and cannot be supplied.
+        """
+        if ssl_ctx is None:
+            ssl_ctx = self.create_ssl_ctx(ssl_version, ssl_verify, ssl_verify_locations, client_certchain_file,
+                                          client_key_file, client_key_type, client_key_password,
+                                          ignore_client_authentication_requests, signature_algorithms)
+            # Sessions are only shared between clients with the same server and client authentication settings
+            self._ssl_ctx_config = (ssl_verify, ssl_verify_locations, client_certchain_file, client_key_file,
+                                    client_key_type, client_key_password, ignore_client_authentication_requests,
+                                    signature_algorithms)  # type: Any
+        else:
+            if not isinstance(ssl_ctx, self._NASSL_MODULE.SSL_CTX):
+                raise TypeError('ssl_ctx was not created by {}'.format(self._NASSL_MODULE.__name__))
+            if ssl_verify_locations or client_certchain_file or client_key_file \
+                    or ignore_client_authentication_requests or signature_algorithms:
+                raise ValueError('SSL_CTX settings cannot be supplied together with ssl_ctx')
+            self._ssl_ctx_config = ssl_ctx
+
+        self._init_base_objects(ssl_version, ssl_ctx)
         # Now create the SSL object
         self._init_ssl_objects()
 
-    def _init_base_objects(self, ssl_version, underlying_socket):
-        # type: (OpenSslVersionEnum, Optional[socket.socket]) -> None
-        """Setup the socket and SSL_CTX objects.
+    @classmethod
+    def create_ssl_ctx(
+            cls,
+            ssl_version=OpenSslVersionEnum.SSLV23,          # type: OpenSslVersionEnum
+            ssl_verify=OpenSslVerifyEnum.PEER,              # type: OpenSslVerifyEnum
+            ssl_verify_locations=None,                      # type: Union[None, Text, TrustStore]
+            client_certchain_file=None,                     # type: Optional[Text]
+            client_key_file=None,                           # type: Optional[Text]
+            client_key_type=OpenSslFileTypeEnum.PEM,        # type: OpenSslFileTypeEnum
+            client_key_password='',                         # type: Text
+            ignore_client_authentication_requests=False,    # type: bool
+            signature_algorithms=None                       # type: Optional[Text]
+    ):
+        # type: (...) -> _nassl.SSL_CTX
+        """Create and configure an SSL_CTX, which can then be shared by multiple clients via their ssl_ctx argument.
+
+        The returned SSL_CTX must not be modified once a client has been created with it.
         """
+        ssl_ctx = cls._NASSL_MODULE.SSL_CTX(ssl_version.value)
+
+        # Warning: Anything that modifies the SSL_CTX must be done before creating the SSL object
+        # Otherwise changes to the SSL_CTX do not get propagated to future SSL objects
+        cls._init_server_authentication(ssl_ctx, ssl_verify, ssl_verify_locations)
+        cls._init_client_authentication(ssl_ctx, client_certchain_file, client_key_file, client_key_type,
+                                        client_key_password, ignore_client_authentication_requests)
+        if signature_algorithms:
+            cls._set_tlsext_signature_algorithms(ssl_ctx, signature_algorithms)
+        return ssl_ctx
+
+    def _init_base_objects(self, ssl_version, ssl_ctx):
+        # type: (OpenSslVersionEnum, _nassl.SSL_CTX) -> None
         self._is_handshake_completed = False
         self._ssl_version = ssl_version
-        self._ssl_ctx = self._NASSL_MODULE.SSL_CTX(ssl_version.value)
+        self._ssl_ctx = ssl_ctx
+        self._server_name_indication = None  # type: Optional[Text]
+        self._cipher_list = None  # type: Optional[Text]
+        self._ciphersuites = None  # type: Optional[Text]
 
-        # A Python socket handles transmission of the data
-        self._sock = underlying_socket
+        # Encrypted data received from the peer that did not fit in the BIO pair yet
+        self._incoming_backlog = bytearray()
+
+        # In probe mode, the data received from the peer is passed to the SSL engine one TLS record at a time
+        self._is_probing = False
+        self._probe_record_bytes_left = 0
 
-    def _init_server_authentication(self, ssl_verify, ssl_verify_locations):
-        # type: (OpenSslVerifyEnum, Optional[Text]) -> None
+    @classmethod
+    def _init_server_authentication(cls, ssl_ctx, ssl_verify, ssl_verify_locations):
+        # type: (_nassl.SSL_CTX, OpenSslVerifyEnum, Union[None, Text, TrustStore]) -> None
         """Setup the certificate validation logic for authenticating the server.
         """
-        self._ssl_ctx.set_verify(ssl_verify.value)
-        if ssl_verify_locations:
+        ssl_ctx.set_verify(ssl_verify.value)
+        if isinstance(ssl_verify_locations, TrustStore):
+            ssl_ctx.set_cert_store(ssl_verify_locations.get_x509_store(cls._NASSL_MODULE))
+        elif ssl_verify_locations:
             # Ensure the file exists
             with open(ssl_verify_locations):
                 pass
-            self._ssl_ctx.load_verify_locations(ssl_verify_locations)
+            ssl_ctx.load_verify_locations(ssl_verify_locations)
 
+    @classmethod
     def _init_client_authentication(
-            self,
+            cls,
+            ssl_ctx,                                # type: _nassl.SSL_CTX
             client_certchain_file,                  # type: Optional[Text]
             client_key_file,                        # type: Optional[Text]
             client_key_type,                        # type: OpenSslFileTypeEnum
@@ -146,18 +281,20 @@ class SslClient(object):
         """Setup client authentication using the supplied certificate and key.
         """
         if client_certchain_file is not None and client_key_file is not None:
-            self._use_private_key(client_certchain_file, client_key_file, client_key_type, client_key_password)
+            cls._use_private_key(ssl_ctx, client_certchain_file, client_key_file, client_key_type,
+                                 client_key_password)
 
         if ignore_client_authentication_requests:
             if client_certchain_file:
                 raise ValueError('Cannot enable both client_certchain_file and ignore_client_authentication_requests')
 
-            self._ssl_ctx.set_client_cert_cb_NULL()
+            ssl_ctx.set_client_cert_cb_NULL()
 
     def _init_ssl_objects(self):
         # type: (...) -> None
         self._ssl = self._NASSL_MODULE.SSL(self._ssl_ctx)
         self._ssl.set_connect_state()
+        self._is_message_trace_enabled = False
 
         self._internal_bio = self._NASSL_MODULE.BIO()
         self._network_bio = self._NASSL_MODULE.BIO()
@@ -167,150 +304,325 @@ class SslClient(object):
         self._ssl.set_bio(self._internal_bio)
         self._ssl.set_network_bio_to_free_when_dealloc(self._network_bio)
 
-    def set_underlying_socket(self, sock):
-        # type: (socket.socket) -> None
-        if self._sock:
-            raise RuntimeError('A socket was already set')
-        self._sock = sock
+    def feed_incoming(self, data):
+        # type: (bytes) -> None
+        """Pass encrypted data received from the peer to the SSL engine.
+        """
+        if self._is_probing:
+            # do_probe_step() will pass the data to the SSL engine
+            self._incoming_backlog.extend(data)
+            return
 
-    def get_underlying_socket(self):
-        # type: () -> Optional[socket.socket]
-        return self._sock
+        if self._incoming_backlog:
+            self._incoming_backlog.extend(data)
+            self._flush_incoming_backlog()
+            return
 
-    def do_handshake(self):
-        # type: () -> None
-        if self._sock is None:
-            # TODO: Auto create a socket ?
-            raise IOError('Internal socket set to None; cannot perform handshake.')
+        written = self._write_to_network_bio(data)
+        if written < len(data):
+            self._incoming_backlog.extend(data[written:])
+
+    def _write_to_network_bio(self, data):
+        # type: (bytes) -> int
+        try:
+            return self._network_bio.write(data)
+        except IOError:
+            # The BIO pair is full; the SSL engine has to consume some data first
+            return 0
+
+    def _flush_incoming_backlog(self):
+        # type: () -> bool
+        """Pass as much of the data that did not fit in the BIO pair as possible to the SSL engine.
+
+        Returns whether any data was passed.
+        """
+        is_flushed = False
+        while self._incoming_backlog:
+            written = self._write_to_network_bio(bytes(self._incoming_backlog))
+            if not written:
+                break
+            del self._incoming_backlog[:written]
+            is_flushed = True
+        return is_flushed
+
+    def _should_retry_with_backlog(self, status):
+        # type: (OpenSslStatusEnum) -> bool
+        """Return whether an SSL operation that returned status has to be retried because more of the data received
+        from the peer was just passed to the SSL engine; the engine consumes the BIO pair entirely before asking for
+        more data, which may already be in the backlog when the peer sent more than the BIO pair can hold.
+        """
+        return status == OpenSslStatusEnum.WANT_READ and self._flush_incoming_backlog()
+
+    def pending_outgoing(self):
+        # type: () -> bytes
+        """Retrieve the encrypted data generated by the SSL engine, which has to be sent to the peer.
+        """
+        outgoing_data = []
+        length_to_read = self._network_bio.pending()
+        while length_to_read:
+            outgoing_data.append(self._network_bio.read(length_to_read))
+            length_to_read = self._network_bio.pending()
+        return b''.join(outgoing_data)
+
+    def do_handshake_step(self):
+        # type: () -> bool
+        """Advance the SSL handshake as much as possible using the data fed so far.
 
+        Returns True once the handshake is completed. Returns False if more data from the peer is needed; the data
+        returned by pending_outgoing() must then be sent to the peer and its response passed to feed_incoming().
+        """
+        self._flush_incoming_backlog()
+        status = self.try_do_handshake()
+        while self._should_retry_with_backlog(status):
+            status = self.try_do_handshake()
+        if status == OpenSslStatusEnum.WANT_X509_LOOKUP:
+            # Server asked for a client certificate and we didn't provide one
+            raise ClientCertificateRequested(self.get_client_CA_list())
+        elif status != OpenSslStatusEnum.NONE:
+            # OpenSSL is expecting more data from the peer
+            return False
+
+        # Handshake was successful
+        self._is_handshake_completed = True
+        self.log_ssl_keys()
+        return True
+
+    def try_do_handshake(self):
+        # type: () -> OpenSslStatusEnum
+        """Advance the SSL handshake using the data fed so far, without raising an exception when the handshake cannot
+        be completed yet.
+
+        Returns NONE if the handshake is completed, WANT_READ if more data from the peer is needed, WANT_X509_LOOKUP if
+        the server requested a client certificate, etc. Exceptions are only raised for actual errors.
+        """
+        return OpenSslStatusEnum(self._ssl.try_do_handshake())
+
+    def pump_handshake(self, incoming_data=b''):
+        # type: (bytes) -> Tuple[OpenSslStatusEnum, bytes]
+        """Pass encrypted data received from the peer to the SSL engine, advance the handshake and retrieve the
+        encrypted data to be sent to the peer, using a single call to the C extension.
+
+        Returns the status (NONE once the handshake is completed, WANT_READ if more data from the peer is needed, or
+        WANT_WRITE if the outgoing data must be sent before pumping again) and the data to send to the peer. Data that
+        did not fit in the SSL engine is passed once the engine has consumed the BIO pair.
+        """
+        incoming_data = self._prepend_incoming_backlog(incoming_data)
+        status, outgoing_data, consumed = self._ssl.do_handshake_pump(incoming_data)
+        while status == OpenSslStatusEnum.WANT_READ and 0 < consumed < len(incoming_data):
+            incoming_data = incoming_data[consumed:]
+            status, more_outgoing_data, consumed = self._ssl.do_handshake_pump(incoming_data)
+            outgoing_data += more_outgoing_data
+        if consumed < len(incoming_data):
+            self._incoming_backlog.extend(incoming_data[consumed:])
+
+        if status == OpenSslStatusEnum.WANT_X509_LOOKUP:
+            # Server asked for a client certificate and we didn't provide one
+            raise ClientCertificateRequested(self.get_client_CA_list())
+
+        if status == OpenSslStatusEnum.NONE:
+            # Handshake was successful
+            self._is_handshake_completed = True
+            self.log_ssl_keys()
+        return OpenSslStatusEnum(status), outgoing_data
+
+    def pump_read(self, incoming_data, size):
+        # type: (bytes, int) -> Tuple[OpenSslStatusEnum, bytes, bytes]
+        """Pass encrypted data received from the peer to the SSL engine, decrypt up to size bytes and retrieve the
+        encrypted data to be sent to the peer, using a single call to the C extension.
+
+        Returns the status (NONE if data was decrypted, WANT_READ if more data from the peer is needed, etc.), the
+        decrypted data and the data to send to the peer.
+        """
+        incoming_data = self._prepend_incoming_backlog(incoming_data)
+        status, decrypted_data, outgoing_data, consumed = self._ssl.read_pump(incoming_data, size)
+        while status == OpenSslStatusEnum.WANT_READ and 0 < consumed < len(incoming_data):
+            incoming_data = incoming_data[consumed:]
+            status, decrypted_data, more_outgoing_data, consumed = self._ssl.read_pump(incoming_data, size)
+            outgoing_data += more_outgoing_data
+        if consumed < len(incoming_data):
+            self._incoming_backlog.extend(incoming_data[consumed:])
+        return OpenSslStatusEnum(status), decrypted_data, outgoing_data
+
+    def _prepend_incoming_backlog(self, incoming_data):
+        # type: (bytes) -> bytes
+        if not self._incoming_backlog:
+            return incoming_data
+        self._incoming_backlog.extend(incoming_data)
+        incoming_data = bytes(self._incoming_backlog)
+        del self._incoming_backlog[:]
+        return incoming_data
+
+    # Content types of SSL 3.0+ records: change_cipher_spec, alert, handshake, application_data
+    _TLS_RECORD_CONTENT_TYPES = (20, 21, 22, 23)
+    _TLS_RECORD_HEADER_SIZE = 5
+
+    def do_probe_step(self):
+        # type: () -> bool
+        """Advance the SSL handshake until the server's ServerHello has been processed, which is enough to know the
+        protocol version and cipher suite that the server accepted. The rest of the handshake (certificate validation,
+        key exchange, Finished) is skipped; the connection cannot be used for sending data afterwards.
+
+        Returns True once the ServerHello has been processed and get_ssl_version() and get_current_cipher_name() return
+        the values selected by the server. Returns False if more data from the peer is needed; the data returned by
+        pending_outgoing() must then be sent to the peer and its response passed to feed_incoming().
+
+        Probing is not meant to be combined with session resumption.
+        """
+        self._is_probing = True
         while True:
-            try:
-                self._ssl.do_handshake()
+            status = self.try_do_handshake()
+            if status == OpenSslStatusEnum.NONE:
+                # All the server's handshake messages were in the same records as the ServerHello
                 self._is_handshake_completed = True
-                self.log_ssl_keys()
-                # Handshake was successful
-                return
+                return True
+            elif status == OpenSslStatusEnum.WANT_X509_LOOKUP:
+                raise ClientCertificateRequested(self.get_client_CA_list())
 
-            except WantReadError:
+            if self.get_current_cipher_name() is not None:
+                # The ServerHello was processed
+                return True
+            if not self._flush_next_incoming_record():
                 # OpenSSL is expecting more data from the peer
-                # Send available handshake data to the peer
-                self._flush_ssl_engine()
-
-                # Recover the peer's encrypted response
-                handshake_data_in = self._sock.recv(self._DEFAULT_BUFFER_SIZE)
-                if len(handshake_data_in) == 0:
-                    raise IOError('Nassl SSL handshake failed: peer did not send data back.')
-                # Pass the data to the SSL engine
-                self._network_bio.write(handshake_data_in)
-
-            except WantX509LookupError:
-                # Server asked for a client certificate and we didn't provide one
-                raise ClientCertificateRequested(self.get_client_CA_list())
+                return False
+
+    def _flush_next_incoming_record(self):
+        # type: () -> bool
+        """Pass the data received from the peer to the SSL engine without going beyond the end of the current TLS
+        record, so that OpenSSL stops once it has processed the record containing the ServerHello.
+
+        Returns False if nothing could be passed to the SSL engine.
+        """
+        if not self._probe_record_bytes_left:
+            if not self._incoming_backlog:
+                return False
+
+            if self._incoming_backlog[0] not in self._TLS_RECORD_CONTENT_TYPES:
+                # Not an SSL 3.0+ record (SSL 2.0 for example); do a regular handshake instead
+                self._is_probing = False
+                self._flush_incoming_backlog()
+                return True
+
+            if len(self._incoming_backlog) < self._TLS_RECORD_HEADER_SIZE:
+                return False
+            record_length = (self._incoming_backlog[3] << 8) + self._incoming_backlog[4]
+            self._probe_record_bytes_left = self._TLS_RECORD_HEADER_SIZE + record_length
+
+        written = self._write_to_network_bio(bytes(self._incoming_backlog[:self._probe_record_bytes_left]))
+        del self._incoming_backlog[:written]
+        self._probe_record_bytes_left -= written
+        return written > 0
 
     def is_handshake_completed(self):
         # type: () -> bool
         return self._is_handshake_completed
 
-    # When sending early data, client can call read even if the handshake hasn't been
-    # finished yet
-    def read(self, size, handshake_must_be_completed = True):
-        # type: (int, bool) -> bytes
-        if self._sock is None:
-            raise IOError('Internal socket set to None; cannot perform handshake.')
-        if handshake_must_be_completed and not self._is_handshake_completed:
-            raise IOError('SSL Handshake was not completed; cannot receive data.')
+    def read(self, size):
+        # type: (int) -> bytes
+        """Decrypt data received from the peer.
 
+        Raises WantReadError if more data from the peer is needed in order to decrypt the next record.
+        """
+        self._flush_incoming_backlog()
         while True:
             try:
-                # Try to read the decrypted data
-                decrypted_data = self._ssl.read(size)
-                return decrypted_data
-            except (WantReadError, SslError) as e:
-                # A 'Connection shut down by peer' SslError is raised
-                # when the previous call to _ssl.read() consumed all of
-                # available data and left the buffer empty. As we
-                # handle reading from the network socket ourself this
-                # error does not actually mean that the peer shut down
-                # the connection, if we try reading again from the
-                # socket we might find there is new data waiting for
-                # us. Any other SslError is unexpected however.
-                # TODO: create a new dedicated exception type upstream
-                # for this case.
-                if (type(e) is SslError and str(e) != 'Connection was shut down by peer'):
+                return self._ssl.read(size)
+            except WantReadError:
+                if not self._should_retry_with_backlog(OpenSslStatusEnum.WANT_READ):
                     raise
 
-                # The SSL engine needs more data
-                # before it can decrypt the whole message
+    def try_read(self, size):
+        # type: (int) -> Tuple[OpenSslStatusEnum, bytes]
+        """Decrypt data received from the peer, without raising an exception when no data can be decrypted yet.
 
-                # Receive available encrypted data from the peer
-                encrypted_data = self._sock.recv(4096)
+        Returns NONE and the decrypted data, or WANT_READ if more data from the peer is needed in order to decrypt the
+        next record, ZERO_RETURN if the peer sent a close_notify alert, etc. Exceptions are only raised for actual errors.
+        """
+        self._flush_incoming_backlog()
+        status, decrypted_data = self._ssl.try_read(size)
+        while self._should_retry_with_backlog(status):
+            status, decrypted_data = self._ssl.try_read(size)
+        return OpenSslStatusEnum(status), decrypted_data
+
+    def read_into(self, buffer, nbytes=0):
+        # type: (Any, int) -> int
+        """Decrypt data received from the peer directly into a writable buffer (bytearray, memoryview, etc.) without
+        allocating a new bytes object.
+
+        Reads up to nbytes bytes, or the length of the buffer if nbytes is 0, and returns the number of bytes read.
+        Raises WantReadError if more data from the peer is needed in order to decrypt the next record.
+        """
+        self._flush_incoming_backlog()
+        while True:
+            try:
+                return self._ssl.read_into(buffer, nbytes)
+            except WantReadError:
+                if not self._should_retry_with_backlog(OpenSslStatusEnum.WANT_READ):
+                    raise
 
-                if len(encrypted_data) <= 0:
-                    raise IOError('Could not read() - peer closed the connection.')
-                else:
-                    # Pass it to the SSL engine
-                    self._network_bio.write(encrypted_data)
+    def try_read_into(self, buffer, nbytes=0):
+        # type: (Any, int) -> Tuple[OpenSslStatusEnum, int]
+        """Same as read_into() but returns the status and the number of bytes read, as try_read() does.
+        """
+        self._flush_incoming_backlog()
+        status, read_size = self._ssl.try_read_into(buffer, nbytes)
+        while self._should_retry_with_backlog(status):
+            status, read_size = self._ssl.try_read_into(buffer, nbytes)
+        return OpenSslStatusEnum(status), read_size
 
     def write(self, data):
         # type: (bytes) -> int
-        """Returns the number of (encrypted) bytes sent.
-        """
-        if self._sock is None:
-            raise IOError('Internal socket set to None; cannot perform handshake.')
-        if not self._is_handshake_completed:
-            raise IOError('SSL Handshake was not completed; cannot send data.')
+        """Encrypt data to be sent to the peer; the encrypted data is then available via pending_outgoing().
 
-        # Pass the cleartext data to the SSL engine
-        self._ssl.write(data)
+        Returns the number of (decrypted) bytes that were processed.
+        """
+        return self._ssl.write(data)
 
-        # Recover the corresponding encrypted data
-        final_length = self._flush_ssl_engine()
+    def try_write(self, data):
+        # type: (bytes) -> Tuple[OpenSslStatusEnum, int]
+        """Encrypt data to be sent to the peer, without raising an exception when the data cannot be processed yet.
 
-        return final_length
+        Returns NONE and the number of (decrypted) bytes that were processed, or WANT_WRITE if the encrypted data
+        returned by pending_outgoing() must be sent first, etc. Exceptions are only raised for actual errors.
+        """
+        status, written = self._ssl.try_write(data)
+        return OpenSslStatusEnum(status), written
+
+    # Maximum size of the plaintext in a TLS record; writing one record at a time ensures the encrypted data always fits
+    # in the BIO pair
+    _MAX_WRITE_CHUNK_SIZE = 16384
+
+    @classmethod
+    def _iter_write_chunks(cls, data):
+        # type: (bytes) -> Iterator[memoryview]
+        if isinstance(data, Text):
+            # Text strings are UTF-8 encoded, as done by SSL.write()
+            data = data.encode('utf-8')
+        data_view = memoryview(data)
+        if data_view.ndim != 1 or data_view.itemsize != 1:
+            data_view = data_view.cast('B')
+        for offset in range(0, len(data_view), cls._MAX_WRITE_CHUNK_SIZE):
+            yield data_view[offset:offset + cls._MAX_WRITE_CHUNK_SIZE]
 
     def write_early_data(self, data):
         # type: (bytes) -> int
-        """Returns the number of (encrypted) bytes sent.
+        """Encrypt early data to be sent to the peer; the encrypted data is then available via pending_outgoing().
+
+        Returns the number of (decrypted) bytes that were processed.
         """
         if self._is_handshake_completed:
             raise IOError('SSL Handshake was completed; cannot send early data.')
 
-        # Pass the cleartext data to the SSL engine
-        self._ssl.write_early_data(data)
-
-        # Recover the corresponding encrypted data
-        final_length = self._flush_ssl_engine()
-        return final_length
+        return self._ssl.write_early_data(data)
 
     def get_early_data_status(self):
         # type: () -> OpenSslEarlyDataStatusEnum
         return OpenSslEarlyDataStatusEnum[self._ssl.get_early_data_status()]
 
-    def _flush_ssl_engine(self):
-        # type: () -> int
-        if self._sock is None:
-            raise IOError('Internal socket set to None; cannot perform handshake.')
-
-        length_to_read = self._network_bio.pending()
-        final_length = length_to_read
-        while length_to_read:
-            encrypted_data = self._network_bio.read(length_to_read)
-            # Send the encrypted data to the peer
-            self._sock.send(encrypted_data)
-            length_to_read = self._network_bio.pending()
-            final_length += length_to_read
-
-        return final_length
-
     def shutdown(self):
         # type: () -> None
+        """Generate a close_notify alert; it is then available via pending_outgoing().
+        """
         self._is_handshake_completed = False
-        try:
-            self._flush_ssl_engine()
-        except IOError:
-            # Ensure shutting down the connection never raises an exception
-            pass
-
         try:
             self._ssl.shutdown()
         except OpenSSLError as e:
@@ -323,18 +635,43 @@ class SslClient(object):
         """Set the hostname within the Server Name Indication extension in the client SSL Hello.
         """
         self._ssl.set_tlsext_host_name(name_indication)
+        self._server_name_indication = name_indication
 
-    def _set_tlsext_signature_algorithms(self, sig_algs):
-        # type: (Text) -> int
+    @staticmethod
+    def _set_tlsext_signature_algorithms(ssl_ctx, sig_algs):
+        # type: (_nassl.SSL_CTX, Text) -> None
         """Set the desired signature algorithm within the Signature Algorithm extension in the client SSL Hello.
            sig_algs should consist of colon separated pairs of 'digest algorithm+public key algorithm', e.g.:
            RSA+SHA256:RSA+SHA1
-           Return 1 for success and 0 for failure.
+           Raise ValueError on failure.
            See: https://www.openssl.org/docs/man1.1.1/man3/SSL_set1_sigalgs.html
         """
-        if not self._ssl_ctx.set1_sigalgs_list(sig_algs):
+        if not ssl_ctx.set1_sigalgs_list(sig_algs):
             raise ValueError('Invalid or unsupported signature algorithm')
 
+    def get_dh_parameters(self):
+        # type: () -> Dict[Text, Any]
+        """Return the server's Diffie-Hellman parameters: the group_size in bits, and the prime, generator and
+        public_key as big-endian bytes.
+
+        Raise TypeError if Diffie-Hellman was not used for the key exchange.
+        """
+        return self._ssl.get_dh_param()
+
+    def get_ecdh_parameters(self):
+        # type: () -> Dict[Text, Any]
+        """Return the server's elliptic curve Diffie-Hellman parameters: the group_size in bits, the curve_nid,
+        curve_name and nist_curve_name (None for explicit curves), the field_type and point_conversion_form, and the
+        prime (or polynomial for binary fields), a, b, generator, order, cofactor, seed (or None) and public_key as
+        bytes.
+
+        For X25519 and X448, only the group_size, curve_nid, curve_name and the raw public_key are returned; the other
+        fields are None.
+
+        Raise TypeError if elliptic curve Diffie-Hellman was not used for the key exchange.
+        """
+        return self._ssl.get_ecdh_param()
+
     def get_peer_signature_digest(self):
         # type: () -> Text
         """Returns the short name of the signature digest used by the peer to sign TLS messages.
@@ -366,13 +703,36 @@ class SslClient(object):
         # type: (Text) -> None
         if cipher_list:
             self._ssl.set_cipher_list(cipher_list)
+            self._cipher_list = cipher_list
         if ciphersuites:
             self._ssl.set_ciphersuites(ciphersuites)
+            self._ciphersuites = ciphersuites
 
     def get_cipher_list(self):
         # type: () -> List[Text]
         return self._ssl.get_cipher_list()
 
+    def set_groups(self, groups):
+        # type: (Text) -> None
+        """Set the groups offered for the ephemeral key exchange, as a colon-separated list such as 'X25519:P-256'. The
+        legacy OpenSSL only supports elliptic curves.
+
+        Raise ValueError if a group is unknown or unsupported.
+        """
+        if not self._ssl.set1_groups_list(groups):
+            raise ValueError('Invalid or unsupported group')
+
+    def get_negotiated_group(self):
+        # type: () -> Optional[Text]
+        """Return the short name of the group used for the ephemeral key exchange, such as 'X25519', 'prime256v1' or
+        'ffdhe2048'.
+
+        Finite field parameters are identified by OpenSSL's DH_get_nid(): OpenSSL 1.1.1 only knows the RFC 7919 ffdhe
+        groups, while OpenSSL 3 also returns names such as 'modp_2048' for the RFC 3526 groups. None is returned if there
+        was no ephemeral key exchange, or if the finite field parameters are not a group known to OpenSSL.
+        """
+        return self._ssl.get_negotiated_group()
+
     def get_cipher_description(self, cipher_name):
         """
         Returns None, or a string like 'ECDHE-RSA-AES128-GCM-SHA256 TLSv1.2 Kx=ECDH     Au=RSA  Enc=AESGCM(128) Mac=AEAD'.
@@ -398,8 +758,9 @@ class SslClient(object):
         else:
             return None
 
-    def _use_private_key(self, client_certchain_file, client_key_file, client_key_type, client_key_password):
-        # type: (Text, Text, OpenSslFileTypeEnum, Text) -> None
+    @staticmethod
+    def _use_private_key(ssl_ctx, client_certchain_file, client_key_file, client_key_type, client_key_password):
+        # type: (_nassl.SSL_CTX, Text, Text, OpenSslFileTypeEnum, Text) -> None
         """The certificate chain file must be in PEM format. Private method because it should be set via the
         constructor.
         """
@@ -409,17 +770,17 @@ class SslClient(object):
         with open(client_key_file):
             pass
 
-        self._ssl_ctx.use_certificate_chain_file(client_certchain_file)
-        self._ssl_ctx.set_private_key_password(client_key_password)
+        ssl_ctx.use_certificate_chain_file(client_certchain_file)
+        ssl_ctx.set_private_key_password(client_key_password)
         try:
-            self._ssl_ctx.use_PrivateKey_file(client_key_file, client_key_type.value)
+            ssl_ctx.use_PrivateKey_file(client_key_file, client_key_type.value)
         except OpenSSLError as e:
             if 'bad password read' in str(e) or 'bad decrypt' in str(e):
                 raise ValueError('Invalid Private Key')
             else:
                 raise
 
-        self._ssl_ctx.check_private_key()
+        ssl_ctx.check_private_key()
 
     def get_certificate_chain_verify_result(self):
         # type: () -> Tuple[int, Text]
@@ -451,7 +812,7 @@ class SslClient(object):
 
     def get_session(self):
         # type: () -> _nassl.SSL_SESSION
-        """Get the SSL connection's Session object.
+        """Get the SSL connection's Session object, which can be exported using its to_der() method or pickled.
         """
         return self._ssl.get_session()
 
@@ -461,6 +822,34 @@ class SslClient(object):
         """
         self._ssl.set_session(ssl_session)
 
+    def is_session_reused(self):
+        # type: () -> bool
+        """Return whether the handshake resumed the session set using set_session() or an SslSessionCache.
+        """
+        return self._ssl.session_reused()
+
+    def enable_message_trace(self, capacity=64):
+        # type: (int) -> None
+        """Record the last capacity TLS messages sent or received, which are then returned by get_message_trace().
+
+        The messages are recorded by OpenSSL's message callback into a fixed-size buffer, without involving Python; the
+        connection does not pay for it unless this method was called.
+        """
+        self._ssl.enable_message_trace(capacity)
+        self._is_message_trace_enabled = True
+
+    def get_message_trace(self):
+        # type: () -> List[TlsMessage]
+        """Return the TLS messages recorded since enable_message_trace() was called, from the oldest to the newest.
+        """
+        return [TlsMessage(*message) for message in self._ssl.get_message_trace()]
+
+    def get_hello_retry_requests_count(self):
+        # type: () -> int
+        """Return how many TLS 1.3 HelloRetryRequest messages were received; requires enable_message_trace().
+        """
+        return sum(1 for message in self.get_message_trace() if message.is_hello_retry_request)
+
     _SSL_OP_NO_TICKET = 0x00004000  # No TLS Session tickets
 
     def disable_stateless_session_resumption(self):
@@ -501,3 +890,418 @@ class SslClient(object):
         # Dumb but works on both OpenSSL 1.0.2 and 1.1,1.
         matched = SECRETS_PATTERN.search(self.get_session().as_text().replace('\n', ''))
         return (matched.group("sessid"), matched.group("masterkey"))
+
+
+class SslClient(SansIoSslClient):
+    """High level API implementing an SSL client on top of a blocking socket.
+
+    Hostname validation is NOT performed by the SslClient and MUST be implemented at the end of the SSL handshake on the
+    server's certificate, available via get_peer_certificate().
+    """
+
+    _DEFAULT_BUFFER_SIZE = 4096
+
+    def __init__(
+            self,
+            underlying_socket=None,                         # type: Optional[socket.socket]
+            ssl_version=OpenSslVersionEnum.SSLV23,          # type: OpenSslVersionEnum
+            ssl_verify=OpenSslVerifyEnum.PEER,              # type: OpenSslVerifyEnum
+            ssl_verify_locations=None,                      # type: Union[None, Text, TrustStore]
+            client_certchain_file=None,                     # type: Optional[Text]
+            client_key_file=None,                           # type: Optional[Text]
+            client_key_type=OpenSslFileTypeEnum.PEM,        # type: OpenSslFileTypeEnum
+            client_key_password='',                         # type: Text
+            ignore_client_authentication_requests=False,    # type: bool
+            signature_algorithms=None,                      # type: Optional[Text]
+            ssl_ctx=None                                    # type: Optional[_nassl.SSL_CTX]
+    ):
+        # type: (...) -> None
+        # A Python socket handles transmission of the data
+        self._sock = underlying_socket
+        self._timings = None  # type: Optional[ConnectionTimings]
+        self._last_recv_timestamp = None  # type: Optional[float]
+        self._server_address = None  # type: Optional[Tuple[Text, int]]
+        self._session_cache = None  # type: Optional[SslSessionCache]
+        self._session_cache_key = None  # type: Optional[Tuple[Any, ...]]
+        self._is_session_cached = False
+        super(SslClient, self).__init__(ssl_version, ssl_verify, ssl_verify_locations, client_certchain_file,
+                                        client_key_file, client_key_type, client_key_password,
+                                        ignore_client_authentication_requests, signature_algorithms, ssl_ctx)
+        # Encrypted data is received into a reusable buffer as large as the BIO pair, so that a whole certificate flight
+        # can be received and passed to the SSL engine in one go
+        self._recv_buffer = bytearray(self._network_bio.get_write_guarantee() or self._DEFAULT_BUFFER_SIZE)
+
+    def set_underlying_socket(self, sock):
+        # type: (socket.socket) -> None
+        if self._sock:
+            raise RuntimeError('A socket was already set')
+        self._sock = sock
+        if self._timings is not None:
+            self._timings.record('socket_attached')
+
+    def get_underlying_socket(self):
+        # type: () -> Optional[socket.socket]
+        return self._sock
+
+    def enable_timings(self):
+        # type: () -> ConnectionTimings
+        """Start recording the timestamps of the connection's milestones and the network I/O performed to reach them;
+        has to be called before the handshake.
+
+        The ServerHello and the server's certificate are detected using the message trace, which gets enabled if
+        enable_message_trace() was not called.
+        """
+        if not self._is_message_trace_enabled:
+            self.enable_message_trace()
+        self._timings = ConnectionTimings()
+        if self._sock is not None:
+            self._timings.record('socket_attached')
+        return self._timings
+
+    def get_timings(self):
+        # type: () -> Optional[ConnectionTimings]
+        return self._timings
+
+    def enable_session_cache(self, session_cache):
+        # type: (SslSessionCache) -> None
+        """Resume the session cached in session_cache for the same server and configuration, and cache the session
+        established by this connection; has to be called before the handshake.
+
+        The server is identified by the host and port passed to connect(), or by the address of the underlying socket,
+        and by the server name indication; the configuration by the SSL version, the cipher suites and the SSL_CTX
+        settings. With TLS 1.3, the session tickets are sent by the server after the handshake and only get cached once
+        read() or recv_into() has processed them.
+        """
+        self._session_cache = session_cache
+
+    def _resume_cached_session(self):
+        # type: () -> None
+        server_address = self._server_address if self._server_address else self._sock.getpeername()[:2]
+        self._session_cache_key = (self._NASSL_MODULE.__name__, self._ssl_ctx_config, self._ssl_version,
+                                   server_address, self._server_name_indication, self._cipher_list,
+                                   self._ciphersuites)
+        ssl_session = self._session_cache.get_session(self._session_cache_key)
+        if ssl_session is not None:
+            self.set_session(ssl_session)
+
+    def _cache_session(self):
+        # type: () -> None
+        ssl_session = self.get_session()
+        if ssl_session is not None and ssl_session.is_resumable():
+            self._session_cache.set_session(self._session_cache_key, ssl_session)
+            self._is_session_cached = True
+
+    def _record_handshake_progress(self):
+        # type: () -> None
+        if self._timings.certificate_received is None:
+            for message in self.get_message_trace():
+                if message.is_sent:
+                    continue
+                # A HelloRetryRequest is not the ServerHello that the client is waiting for
+                if message.handshake_type == TlsMessage.HANDSHAKE_TYPE_SERVER_HELLO:
+                    self._timings.record('server_hello_received', self._last_recv_timestamp)
+                elif message.handshake_type == TlsMessage.HANDSHAKE_TYPE_CERTIFICATE:
+                    self._timings.record('certificate_received', self._last_recv_timestamp)
+        if self._is_handshake_completed:
+            self._timings.record('handshake_completed')
+
+    def _record_application_data(self):
+        # type: () -> None
+        if self._timings.first_application_data_received is None:
+            self._timings.record('first_application_data_received', self._last_recv_timestamp)
+
+    def _send_to_peer(self, data, deadline=None):
+        # type: (bytes, Optional[float]) -> None
+        try:
+            self._sock.sendall(data)
+        except socket.timeout:
+            if deadline is not None and monotonic() >= deadline:
+                raise SslDeadlineExceeded('Timed out sending data to the peer.')
+            raise
+        if self._timings is not None:
+            io_counters = self._timings.get_current_io_counters()
+            io_counters.bytes_sent += len(data)
+            io_counters.send_calls_nb += 1
+            self._timings.record('client_hello_sent')
+
+    def connect(self, host, port, timeout=5.0):
+        # type: (Text, int, float) -> None
+        """Create the underlying socket by connecting to the server, racing its IPv6 and IPv4 addresses; see
+        happy_eyeballs.create_connection().
+
+        The server name indication is not set automatically.
+        """
+        self.set_underlying_socket(happy_eyeballs.create_connection(host, port, timeout))
+        self._server_address = (host, port)
+
+    def do_handshake(self, timeout=None):
+        # type: (Optional[float]) -> None
+        """timeout is the maximum number of seconds the whole handshake may take; SslDeadlineExceeded is raised if it
+        gets exceeded.
+        """
+        if self._sock is None:
+            raise IOError('Internal socket set to None; cannot perform handshake.')
+
+        if self._session_cache is not None and self._session_cache_key is None:
+            self._resume_cached_session()
+
+        deadline = self._get_deadline(timeout)
+        sock_timeout = self._sock.gettimeout()
+        incoming_data = b''
+        try:
+            while True:
+                self._set_deadline_timeout(deadline, sock_timeout)
+                status, outgoing_data = self.pump_handshake(incoming_data)
+                if outgoing_data:
+                    # Send available handshake data to the peer
+                    self._send_to_peer(outgoing_data, deadline)
+                if self._timings is not None:
+                    self._record_handshake_progress()
+
+                if status == OpenSslStatusEnum.NONE:
+                    if self._session_cache is not None:
+                        self._cache_session()
+                    return
+                elif status == OpenSslStatusEnum.WANT_WRITE:
+                    # The BIO pair was full; keep going now that it was flushed
+                    incoming_data = b''
+                    continue
+
+                # OpenSSL is expecting more data from the peer; recover the peer's encrypted response
+                incoming_data = self._receive_from_peer(
+                    'Nassl SSL handshake failed: peer did not send data back.', deadline
+                )
+        finally:
+            self._restore_timeout(deadline, sock_timeout)
+
+    @staticmethod
+    def _get_deadline(timeout):
+        # type: (Optional[float]) -> Optional[float]
+        return None if timeout is None else monotonic() + timeout
+
+    def _set_deadline_timeout(self, deadline, sock_timeout):
+        # type: (Optional[float], Optional[float]) -> None
+        """Set the socket's timeout so that sending or receiving data does not wait past the deadline; sock_timeout is
+        the socket's own timeout, which is restored by _restore_timeout().
+        """
+        if deadline is None:
+            return
+        remaining_time = deadline - monotonic()
+        if remaining_time <= 0:
+            raise SslDeadlineExceeded('Timed out waiting for the peer.')
+        self._sock.settimeout(remaining_time if sock_timeout is None else min(sock_timeout, remaining_time))
+
+    def _restore_timeout(self, deadline, sock_timeout):
+        # type: (Optional[float], Optional[float]) -> None
+        if deadline is not None:
+            self._sock.settimeout(sock_timeout)
+
+    def _receive_from_peer(self, error_msg, deadline=None):
+        # type: (Text, Optional[float]) -> memoryview
+        """Receive encrypted data from the peer into the client's reusable buffer.
+
+        Data that does not fit in the network BIO is kept in the incoming backlog, so the receive size is not capped to
+        what the BIO can currently accept, which would cost one more call into the C extension per receive. The returned
+        memoryview is only valid until the next call.
+
+        The socket's timeout must already have been set according to the deadline; see _set_deadline_timeout().
+        """
+        try:
+            received_size = self._sock.recv_into(self._recv_buffer, len(self._recv_buffer))
+        except socket.timeout:
+            if deadline is not None and monotonic() >= deadline:
+                raise SslDeadlineExceeded('Timed out waiting for data from the peer.')
+            raise
+
+        if received_size == 0:
+            raise IOError(error_msg)
+
+        if self._timings is not None:
+            self._last_recv_timestamp = monotonic()
+            io_counters = self._timings.get_current_io_counters()
+            io_counters.bytes_received += received_size
+            io_counters.recv_calls_nb += 1
+        return memoryview(self._recv_buffer)[:received_size]
+
+    def do_probe(self, timeout=None):
+        # type: (Optional[float]) -> Tuple[OpenSslVersionEnum, Optional[Text]]
+        """Start an SSL handshake and stop as soon as the server's ServerHello has been processed; see do_probe_step().
+
+        Returns the protocol version and the name of the cipher suite selected by the server. The connection cannot be
+        used afterwards and the underlying socket should be closed. See do_handshake() regarding timeout.
+        """
+        if self._sock is None:
+            raise IOError('Internal socket set to None; cannot perform handshake.')
+
+        deadline = self._get_deadline(timeout)
+        sock_timeout = self._sock.gettimeout()
+        try:
+            while not self.do_probe_step():
+                self._set_deadline_timeout(deadline, sock_timeout)
+                if self._timings is not None:
+                    self._record_handshake_progress()
+                self._flush_ssl_engine(deadline)
+
+                self.feed_incoming(
+                    self._receive_from_peer('Nassl SSL handshake failed: peer did not send data back.', deadline)
+                )
+        finally:
+            self._restore_timeout(deadline, sock_timeout)
+
+        if self._timings is not None:
+            self._record_handshake_progress()
+        return self.get_ssl_version(), self.get_current_cipher_name()
+
+    # When sending early data, client can call read even if the handshake hasn't been
+    # finished yet
+    def read(self, size, handshake_must_be_completed = True, timeout=None):
+        # type: (int, bool, Optional[float]) -> bytes
+        """timeout is the maximum number of seconds to wait for the data; SslDeadlineExceeded is raised if it gets
+        exceeded.
+        """
+        if self._sock is None:
+            raise IOError('Internal socket set to None; cannot perform handshake.')
+        if handshake_must_be_completed and not self._is_handshake_completed:
+            raise IOError('SSL Handshake was not completed; cannot receive data.')
+
+        deadline = self._get_deadline(timeout)
+        sock_timeout = self._sock.gettimeout()
+        incoming_data = b''
+        try:
+            while True:
+                self._set_deadline_timeout(deadline, sock_timeout)
+                status, decrypted_data, outgoing_data = self.pump_read(incoming_data, size)
+                if outgoing_data:
+                    self._send_to_peer(outgoing_data, deadline)
+
+                if status == OpenSslStatusEnum.NONE:
+                    if self._timings is not None:
+                        self._record_application_data()
+                    if self._session_cache is not None and not self._is_session_cached:
+                        # The TLS 1.3 session tickets may have just been received
+                        self._cache_session()
+                    return decrypted_data
+                elif status == OpenSslStatusEnum.WANT_WRITE:
+                    incoming_data = b''
+                    continue
+
+                # The SSL engine needs more data before it can decrypt the whole message
+                # ZERO_RETURN is returned when the previous read consumed all of the available data and left the
+                # buffer empty. As we handle reading from the network socket ourself this does not actually mean that
+                # the peer shut down the connection; if we try reading again from the socket we might find there is
+                # new data waiting for us.
+                incoming_data = self._receive_from_peer('Could not read() - peer closed the connection.', deadline)
+        finally:
+            self._restore_timeout(deadline, sock_timeout)
+
+    def read_exactly(self, size, timeout=None):
+        # type: (int, Optional[float]) -> bytes
+        """Read until size bytes have been received.
+
+        timeout is the maximum number of seconds to wait for all the data; SslDeadlineExceeded is raised if it gets
+        exceeded.
+        """
+        deadline = self._get_deadline(timeout)
+        received_data = bytearray()
+        while len(received_data) < size:
+            remaining_time = None if deadline is None else deadline - monotonic()
+            received_data += self.read(size - len(received_data), timeout=remaining_time)
+        return bytes(received_data)
+
+    def recv_into(self, buffer, nbytes=0, handshake_must_be_completed=True, timeout=None):
+        # type: (Any, int, bool, Optional[float]) -> int
+        """Decrypt data received from the peer directly into a writable buffer (bytearray, memoryview, etc.), which
+        avoids allocating and copying a bytes object for every record when downloading large amounts of data.
+
+        Reads up to nbytes bytes, or the length of the buffer if nbytes is 0, and returns the number of bytes read. See
+        read() regarding timeout.
+        """
+        if self._sock is None:
+            raise IOError('Internal socket set to None; cannot perform handshake.')
+        if handshake_must_be_completed and not self._is_handshake_completed:
+            raise IOError('SSL Handshake was not completed; cannot receive data.')
+
+        deadline = self._get_deadline(timeout)
+        sock_timeout = self._sock.gettimeout()
+        try:
+            while True:
+                self._set_deadline_timeout(deadline, sock_timeout)
+                status, read_size = self.try_read_into(buffer, nbytes)
+                self._flush_ssl_engine(deadline)
+
+                if status == OpenSslStatusEnum.NONE:
+                    if self._timings is not None:
+                        self._record_application_data()
+                    if self._session_cache is not None and not self._is_session_cached:
+                        self._cache_session()
+                    return read_size
+                elif status == OpenSslStatusEnum.WANT_WRITE:
+                    continue
+
+                # The SSL engine needs more data before it can decrypt the whole message; see read() regarding
+                # ZERO_RETURN
+                self.feed_incoming(self._receive_from_peer('Could not read() - peer closed the connection.', deadline))
+        finally:
+            self._restore_timeout(deadline, sock_timeout)
+
+    def write(self, data):
+        # type: (bytes) -> int
+        """Returns the number of (encrypted) bytes sent.
+
+        data can be any object supporting the buffer protocol (bytes, bytearray, memoryview, etc.); large payloads are
+        passed to the SSL engine one record at a time, without being copied.
+        """
+        if self._sock is None:
+            raise IOError('Internal socket set to None; cannot perform handshake.')
+        if not self._is_handshake_completed:
+            raise IOError('SSL Handshake was not completed; cannot send data.')
+
+        final_length = 0
+        for data_chunk in self._iter_write_chunks(data):
+            while True:
+                # Pass the cleartext data to the SSL engine
+                status, _ = self.try_write(data_chunk)
+
+                # Recover the corresponding encrypted data
+                final_length += self._flush_ssl_engine()
+                if status == OpenSslStatusEnum.NONE:
+                    break
+                elif status != OpenSslStatusEnum.WANT_WRITE:
+                    raise IOError('Could not write() - SSL engine returned {}.'.format(status.name))
+
+        return final_length
+
+    def write_early_data(self, data):
+        # type: (bytes) -> int
+        """Returns the number of (encrypted) bytes sent.
+        """
+        # Pass the cleartext data to the SSL engine
+        super(SslClient, self).write_early_data(data)
+
+        # Recover the corresponding encrypted data
+        final_length = self._flush_ssl_engine()
+        return final_length
+
+    def _flush_ssl_engine(self, deadline=None):
+        # type: (Optional[float]) -> int
+        """Send all the encrypted data generated by the SSL engine to the peer in a single call, which keeps on sending
+        until all the data has been written, and return its length.
+        """
+        if self._sock is None:
+            raise IOError('Internal socket set to None; cannot perform handshake.')
+
+        encrypted_data = self.pending_outgoing()
+        if encrypted_data:
+            self._send_to_peer(encrypted_data, deadline)
+        return len(encrypted_data)
+
+    def shutdown(self):
+        # type: () -> None
+        self._is_handshake_completed = False
+        try:
+            self._flush_ssl_engine()
+        except IOError:
+            # Ensure shutting down the connection never raises an exception
+            pass
+
+        super(SslClient, self).shutdown()
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import threading
+
+from nassl import _nassl  # type: ignore
+from nassl.trust_store import TrustStore
+from nassl.ssl_client import SansIoSslClient, OpenSslVersionEnum, OpenSslVerifyEnum, OpenSslFileTypeEnum
+from typing import Any
+from typing import Dict
+from typing import Optional
+from typing import Text
+from typing import Union
+from typing import Tuple
+from typing import Type
+
+
+class SslContextCache(object):
+    """Thread-safe cache of configured SSL_CTX objects, keyed by the client configuration.
+
+    Configuring an SSL_CTX is expensive, especially when a trust store has to be loaded, as every certificate in the file
+    gets parsed. Clients created with the same configuration can instead share a single SSL_CTX:
+
+        ssl_ctx = cache.get_ssl_ctx(SslClient, ssl_verify_locations='mozilla.pem')
+        ssl_client = SslClient(underlying_socket=sock, ssl_ctx=ssl_ctx)
+
+    The returned SSL_CTX objects are shared and must not be modified.
+    """
+
+    def __init__(self):
+        # type: () -> None
+        self._ssl_ctx_dict = {}  # type: Dict[Tuple[Any, ...], _nassl.SSL_CTX]
+        self._lock = threading.Lock()
+
+    def get_ssl_ctx(
+            self,
+            client_cls=SansIoSslClient,                     # type: Type[SansIoSslClient]
+            ssl_version=OpenSslVersionEnum.SSLV23,          # type: OpenSslVersionEnum
+            ssl_verify=OpenSslVerifyEnum.PEER,              # type: OpenSslVerifyEnum
+            ssl_verify_locations=None,                      # type: Union[None, Text, TrustStore]
+            client_certchain_file=None,                     # type: Optional[Text]
+            client_key_file=None,                           # type: Optional[Text]
+            client_key_type=OpenSslFileTypeEnum.PEM,        # type: OpenSslFileTypeEnum
+            client_key_password='',                         # type: Text
+            ignore_client_authentication_requests=False,    # type: bool
+            signature_algorithms=None                       # type: Optional[Text]
+    ):
+        # type: (...) -> _nassl.SSL_CTX
+        """Return the SSL_CTX for the given configuration, creating it on first use.
+
+        The SSL_CTX can be used with any client class relying on the same OpenSSL module as client_cls.
+        """
+        # Clients relying on the same OpenSSL module can share their SSL_CTX
+        key = (client_cls._NASSL_MODULE.__name__, ssl_version, ssl_verify, ssl_verify_locations, client_certchain_file,
+               client_key_file, client_key_type, client_key_password, ignore_client_authentication_requests,
+               signature_algorithms)
+        with self._lock:
+            ssl_ctx = self._ssl_ctx_dict.get(key)
+            if ssl_ctx is None:
+                ssl_ctx = client_cls.create_ssl_ctx(ssl_version, ssl_verify, ssl_verify_locations,
+                                                    client_certchain_file, client_key_file, client_key_type,
+                                                    client_key_password, ignore_client_authentication_requests,
+                                                    signature_algorithms)
+                self._ssl_ctx_dict[key] = ssl_ctx
+        return ssl_ctx
+
+    def clear(self):
+        # type: () -> None
+        """Drop all the cached SSL_CTX objects, for example after the content of a trust store file was updated.
+        """
+        with self._lock:
+            self._ssl_ctx_dict.clear()
+
+    def __len__(self):
+        # type: () -> int
+        return len(self._ssl_ctx_dict)
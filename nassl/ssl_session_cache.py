@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import threading
+import time
+from collections import OrderedDict
+
+from typing import Any
+from typing import Dict
+from typing import Hashable
+from typing import Optional
+from typing import Tuple
+from typing import Type
+
+
+class SslSessionCache(object):
+    """Thread-safe cache of SSL sessions, so that repeated connections to the same server resume the previous session
+    instead of performing a full handshake:
+
+        session_cache = SslSessionCache()
+        ssl_client = SslClient(ssl_ctx=ssl_ctx)
+        ssl_client.enable_session_cache(session_cache)
+        ssl_client.connect('www.example.com', 443)
+        ssl_client.do_handshake()
+        print(ssl_client.is_session_reused())
+
+    Sessions are stored as DER, so that a cached session stays resumable after the connection it came from is closed
+    without an SSL shutdown, which makes OpenSSL flag the original session as not resumable. The least recently used
+    sessions are evicted once max_size sessions are cached, and sessions are dropped once their lifetime, capped by the
+    server's ticket lifetime hint and max_lifetime, has elapsed.
+    """
+
+    def __init__(self, max_size=1000, max_lifetime=None):
+        # type: (int, Optional[float]) -> None
+        """max_lifetime is the maximum number of seconds a session may be resumed for after it was established; by
+        default, the session's timeout is used.
+        """
+        if max_size < 1:
+            raise ValueError('max_size must be at least 1')
+        self._max_size = max_size
+        self._max_lifetime = max_lifetime
+        # The least recently used session first
+        self._sessions = OrderedDict()  # type: Dict[Hashable, Tuple[Type, bytes, float]]
+        self._lock = threading.Lock()
+
+    def get_session(self, key):
+        # type: (Hashable) -> Any
+        """Return a copy of the SSL_SESSION cached for key, or None if there is none or if it has expired.
+        """
+        with self._lock:
+            entry = self._sessions.pop(key, None)
+            if entry is None:
+                return None
+            session_cls, session_der, expiry_time = entry
+            if expiry_time <= time.time():
+                return None
+            # Mark the session as the most recently used one
+            self._sessions[key] = entry
+        return session_cls.from_der(session_der)
+
+    def set_session(self, key, ssl_session):
+        # type: (Hashable, Any) -> None
+        """Cache ssl_session, an SSL_SESSION from either OpenSSL module, for key; it is ignored if it has already
+        expired.
+        """
+        lifetime = ssl_session.get_timeout()
+        lifetime_hint = ssl_session.get_ticket_lifetime_hint()
+        if lifetime_hint:
+            lifetime = min(lifetime, lifetime_hint)
+        if self._max_lifetime is not None:
+            lifetime = min(lifetime, self._max_lifetime)
+
+        expiry_time = ssl_session.get_time() + lifetime
+        if expiry_time <= time.time():
+            return
+
+        entry = (type(ssl_session), ssl_session.to_der(), expiry_time)
+        with self._lock:
+            self._sessions.pop(key, None)
+            self._sessions[key] = entry
+            while len(self._sessions) > self._max_size:
+                self._sessions.popitem(last=False)
+
+    def remove_session(self, key):
+        # type: (Hashable) -> None
+        with self._lock:
+            self._sessions.pop(key, None)
+
+    def clear(self):
+        # type: () -> None
+        with self._lock:
+            self._sessions.clear()
+
+    def __len__(self):
+        # type: () -> int
+        return len(self._sessions)
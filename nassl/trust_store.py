@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import threading
+
+from nassl import _nassl  # type: ignore
+from typing import Any
+from typing import Dict
+from typing import Optional
+from typing import Text
+
+
+class TrustStore(object):
+    """A set of trusted CA certificates that is parsed once, and can then be shared by any number of SSL_CTX objects
+    and used for verifying OCSP responses.
+
+    A TrustStore can be passed to the clients and to OcspResponse.verify() instead of the path to a trust store file.
+    """
+
+    def __init__(self, pem_certificates=None, path=None):
+        # type: (Optional[bytes], Optional[Text]) -> None
+        """Use from_pem() or from_file() instead.
+        """
+        if (pem_certificates is None) == (path is None):
+            raise ValueError('Supply either pem_certificates or path')
+
+        self.path = path
+        self._pem_certificates = pem_certificates
+
+        # The modern and the legacy OpenSSL each need their own X509_STORE; the legacy one is only created if needed
+        self._x509_store_dict = {}  # type: Dict[Any, Any]
+        self._lock = threading.Lock()
+        self.get_x509_store(_nassl)
+
+    @classmethod
+    def from_pem(cls, pem_certificates):
+        # type: (bytes) -> TrustStore
+        return cls(pem_certificates=pem_certificates)
+
+    @classmethod
+    def from_file(cls, path):
+        # type: (Text) -> TrustStore
+        # Ensure the file exists
+        with open(path):
+            pass
+        return cls(path=path)
+
+    def get_x509_store(self, nassl_module):
+        # type: (Any) -> Any
+        """Return the X509_STORE for the given nassl module (_nassl or _nassl_legacy), parsing the certificates on
+        first use.
+        """
+        with self._lock:
+            x509_store = self._x509_store_dict.get(nassl_module)
+            if x509_store is None:
+                x509_store = nassl_module.X509_STORE()
+                if self.path:
+                    x509_store.load_locations(self.path)
+                else:
+                    x509_store.add_pem_certificates(self._pem_certificates)
+                self._x509_store_dict[nassl_module] = x509_store
+        return x509_store
@@ -97,7 +97,12 @@ NASSL_SETUP = {
     'version': __version__,
     'package_dir': {'nassl': 'nassl'},
     'py_modules': ['nassl.__init__', 'nassl.ssl_client', 'nassl.legacy_ssl_client',
-                   'nassl.ocsp_response'],
+                   'nassl.ocsp_response', 'nassl.ssl_context_cache',
+                   'nassl.trust_store', 'nassl.happy_eyeballs',
+                   'nassl.connection_timings', 'nassl.cipher_enumeration',
+                   'nassl.protocol_version_probe', 'nassl.signature_algorithm_enumeration',
+                   'nassl.group_enumeration', 'nassl.ssl_session_cache',
+                   'nassl.handshake_attempt'],
     'description': 'Experimental OpenSSL wrapper for Python 2.7 / 3.4+ and SSLyze.',
     'extras_require': {':python_version < "3.4"': ['enum34'],
                        ':python_version < "3.5"': ['typing']},
@@ -109,6 +114,14 @@ NASSL_SETUP = {
     'tests_require': ['nose'],
 }
 
+# The asyncio clients use the async/await syntax, which earlier versions of Python cannot even compile
+if sys.version_info >= (3, 5):
+    NASSL_SETUP['py_modules'].append('nassl.async_ssl_client')
+
+# The handshake engine relies on the selectors module and the process pool scanner on multiprocessing contexts
+if sys.version_info >= (3, 4):
+    NASSL_SETUP['py_modules'].extend(['nassl.handshake_engine', 'nassl.process_pool_scanner'])
+
 # There are two native extensions: the "legacy" OpenSSL one and the "modern" OpenSSL one
 BASE_NASSL_EXT_SETUP = {
     'extra_compile_args': [],
@@ -117,7 +130,8 @@ BASE_NASSL_EXT_SETUP = {
                 "nassl/_nassl/nassl_X509.c", "nassl/_nassl/nassl_errors.c", "nassl/_nassl/nassl_BIO.c",
                 "nassl/_nassl/nassl_X509_EXTENSION.c", "nassl/_nassl/nassl_X509_NAME_ENTRY.c",
                 "nassl/_nassl/nassl_SSL_SESSION.c", "nassl/_nassl/openssl_utils.c",
-                "nassl/_nassl/nassl_OCSP_RESPONSE.c", "nassl/_nassl/python_utils.c"],
+                "nassl/_nassl/nassl_OCSP_RESPONSE.c", "nassl/_nassl/python_utils.c",
+                "nassl/_nassl/nassl_X509_STORE.c"],
 }
 
 if CURRENT_PLATFORM in [SupportedPlatformEnum.WINDOWS_32, SupportedPlatformEnum.WINDOWS_64]:
@@ -35,6 +35,11 @@ class Common_SSL_CTX_Tests(unittest.TestCase):
         test_ssl_ctx = self._NASSL_MODULE.SSL_CTX(OpenSslVersionEnum.SSLV23.value)
         self.assertRaises(ValueError, test_ssl_ctx.set_verify, (1235))
 
+    def test_set1_groups_list(self):
+        test_ssl_ctx = self._NASSL_MODULE.SSL_CTX(OpenSslVersionEnum.SSLV23.value)
+        self.assertTrue(test_ssl_ctx.set1_groups_list('P-256:P-384'))
+        self.assertFalse(test_ssl_ctx.set1_groups_list('not-a-group'))
+
     def test_load_verify_locations(self):
         test_ssl_ctx = self._NASSL_MODULE.SSL_CTX(OpenSslVersionEnum.SSLV23.value)
         test_file = tempfile.NamedTemporaryFile(delete=False, mode='wt')
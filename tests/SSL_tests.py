@@ -5,7 +5,7 @@ from __future__ import unicode_literals
 import unittest
 from nassl import _nassl
 from nassl import _nassl_legacy
-from nassl.ssl_client import SslClient, OpenSslVersionEnum, OpenSslVerifyEnum
+from nassl.ssl_client import SslClient, OpenSslVersionEnum, OpenSslVerifyEnum, OpenSslStatusEnum
 
 
 class Common_SSL_Tests(unittest.TestCase):
@@ -55,6 +55,141 @@ class Common_SSL_Tests(unittest.TestCase):
         test_ssl = self._NASSL_MODULE.SSL(self._NASSL_MODULE.SSL_CTX(OpenSslVersionEnum.SSLV23.value))
         self.assertRaisesRegexp(_nassl.OpenSSLError, 'connection type not set', test_ssl.do_handshake)
 
+    def test_do_handshake_pump(self):
+        test_ssl = self._NASSL_MODULE.SSL(self._NASSL_MODULE.SSL_CTX(OpenSslVersionEnum.SSLV23.value))
+        internal_bio = self._NASSL_MODULE.BIO()
+        network_bio = self._NASSL_MODULE.BIO()
+        self._NASSL_MODULE.BIO.make_bio_pair(internal_bio, network_bio)
+        test_ssl.set_bio(internal_bio)
+        test_ssl.set_network_bio_to_free_when_dealloc(network_bio)
+        test_ssl.set_connect_state()
+
+        # The client hello gets returned and OpenSSL waits for the server's response
+        status, outgoing_data, consumed = test_ssl.do_handshake_pump(b'')
+        self.assertEqual(status, OpenSslStatusEnum.WANT_READ)
+        self.assertGreater(len(outgoing_data), 0)
+        self.assertEqual(consumed, 0)
+
+    def test_try_do_handshake_read_write(self):
+        test_ssl = self._NASSL_MODULE.SSL(self._NASSL_MODULE.SSL_CTX(OpenSslVersionEnum.SSLV23.value))
+        internal_bio = self._NASSL_MODULE.BIO()
+        network_bio = self._NASSL_MODULE.BIO()
+        self._NASSL_MODULE.BIO.make_bio_pair(internal_bio, network_bio)
+        test_ssl.set_bio(internal_bio)
+        test_ssl.set_network_bio_to_free_when_dealloc(network_bio)
+        test_ssl.set_connect_state()
+
+        # No exception is raised while OpenSSL waits for the server's response
+        self.assertEqual(test_ssl.try_do_handshake(), OpenSslStatusEnum.WANT_READ)
+        self.assertEqual(test_ssl.try_read(1024), (OpenSslStatusEnum.WANT_READ, b''))
+        self.assertEqual(test_ssl.try_write(b'tests'), (OpenSslStatusEnum.WANT_READ, 0))
+
+    def test_message_trace(self):
+        test_ssl = self._NASSL_MODULE.SSL(self._NASSL_MODULE.SSL_CTX(OpenSslVersionEnum.SSLV23.value))
+        internal_bio = self._NASSL_MODULE.BIO()
+        network_bio = self._NASSL_MODULE.BIO()
+        self._NASSL_MODULE.BIO.make_bio_pair(internal_bio, network_bio)
+        test_ssl.set_bio(internal_bio)
+        test_ssl.set_network_bio_to_free_when_dealloc(network_bio)
+        test_ssl.set_connect_state()
+        test_ssl.enable_message_trace(2)
+        self.assertEqual(test_ssl.try_do_handshake(), OpenSslStatusEnum.WANT_READ)
+
+        # The ClientHello was recorded
+        message_trace = test_ssl.get_message_trace()
+        self.assertEqual(len(message_trace), 1)
+        is_sent, content_type, handshake_type, length, timestamp = message_trace[0]
+        self.assertTrue(is_sent)
+        self.assertEqual(content_type, 22)
+        self.assertEqual(handshake_type, 1)
+        # The message is sent in a single record with a 5-byte header
+        self.assertEqual(length, network_bio.pending() - 5)
+        self.assertGreater(timestamp, 0)
+
+    def test_set1_groups_list(self):
+        test_ssl = self._NASSL_MODULE.SSL(self._NASSL_MODULE.SSL_CTX(OpenSslVersionEnum.SSLV23.value))
+        self.assertTrue(test_ssl.set1_groups_list('P-256:P-384'))
+        self.assertFalse(test_ssl.set1_groups_list('not-a-group'))
+        # No handshake was performed
+        self.assertIsNone(test_ssl.get_negotiated_group())
+
+    def test_message_trace_bad(self):
+        test_ssl = self._NASSL_MODULE.SSL(self._NASSL_MODULE.SSL_CTX(OpenSslVersionEnum.SSLV23.value))
+        # Not enabled
+        self.assertRaises(RuntimeError, test_ssl.get_message_trace)
+        # Invalid capacity
+        self.assertRaises(ValueError, test_ssl.enable_message_trace, 0)
+
+    def test_read_into(self):
+        test_ssl = self._NASSL_MODULE.SSL(self._NASSL_MODULE.SSL_CTX(OpenSslVersionEnum.SSLV23.value))
+        internal_bio = self._NASSL_MODULE.BIO()
+        network_bio = self._NASSL_MODULE.BIO()
+        self._NASSL_MODULE.BIO.make_bio_pair(internal_bio, network_bio)
+        test_ssl.set_bio(internal_bio)
+        test_ssl.set_network_bio_to_free_when_dealloc(network_bio)
+        test_ssl.set_connect_state()
+        self.assertEqual(test_ssl.try_do_handshake(), OpenSslStatusEnum.WANT_READ)
+
+        # The ClientHello can be retrieved directly into a buffer
+        client_hello_size = network_bio.pending()
+        buffer = bytearray(client_hello_size + 100)
+        self.assertEqual(network_bio.read_into(buffer), client_hello_size)
+        self.assertEqual(buffer[0], 22)
+
+        # No application data is available yet
+        self.assertEqual(test_ssl.try_read_into(buffer, 10), (OpenSslStatusEnum.WANT_READ, 0))
+        self.assertRaises(_nassl.WantReadError, test_ssl.read_into, buffer)
+
+    def test_read_into_bad(self):
+        test_ssl = self._NASSL_MODULE.SSL(self._NASSL_MODULE.SSL_CTX(OpenSslVersionEnum.SSLV23.value))
+        # Read-only buffer
+        self.assertRaises(TypeError, test_ssl.read_into, b'123')
+        # nbytes larger than the buffer
+        self.assertRaises(ValueError, test_ssl.read_into, bytearray(10), 20)
+
+    def test_bio_read_returns_available_data(self):
+        internal_bio = self._NASSL_MODULE.BIO()
+        network_bio = self._NASSL_MODULE.BIO()
+        self._NASSL_MODULE.BIO.make_bio_pair(internal_bio, network_bio)
+        internal_bio.write(b'tests')
+        self.assertEqual(network_bio.read(1024), b'tests')
+
+    def test_bio_get_write_guarantee(self):
+        internal_bio = self._NASSL_MODULE.BIO()
+        network_bio = self._NASSL_MODULE.BIO()
+        self._NASSL_MODULE.BIO.make_bio_pair(internal_bio, network_bio)
+        initial_guarantee = network_bio.get_write_guarantee()
+        self.assertGreater(initial_guarantee, 0)
+        network_bio.write(b'tests')
+        self.assertEqual(network_bio.get_write_guarantee(), initial_guarantee - 5)
+
+    def test_write_buffers(self):
+        internal_bio = self._NASSL_MODULE.BIO()
+        network_bio = self._NASSL_MODULE.BIO()
+        self._NASSL_MODULE.BIO.make_bio_pair(internal_bio, network_bio)
+
+        # Any object supporting the buffer protocol can be written
+        self.assertEqual(internal_bio.write(bytearray(b'tests')), 5)
+        self.assertEqual(internal_bio.write(memoryview(b'123tests')[3:]), 5)
+        self.assertEqual(network_bio.read(1024), b'teststests')
+
+        test_ssl = self._NASSL_MODULE.SSL(self._NASSL_MODULE.SSL_CTX(OpenSslVersionEnum.SSLV23.value))
+        test_ssl.set_bio(internal_bio)
+        test_ssl.set_network_bio_to_free_when_dealloc(network_bio)
+        test_ssl.set_connect_state()
+        self.assertEqual(test_ssl.try_write(memoryview(bytearray(b'tests'))[1:]), (OpenSslStatusEnum.WANT_READ, 0))
+        self.assertRaises(_nassl.WantReadError, test_ssl.write, bytearray(b'tests'))
+
+    def test_try_do_handshake_bad(self):
+        # Connection type not set
+        test_ssl = self._NASSL_MODULE.SSL(self._NASSL_MODULE.SSL_CTX(OpenSslVersionEnum.SSLV23.value))
+        self.assertRaisesRegexp(_nassl.OpenSSLError, 'connection type not set', test_ssl.try_do_handshake)
+
+    def test_do_handshake_pump_bad(self):
+        # No network BIO
+        test_ssl = self._NASSL_MODULE.SSL(self._NASSL_MODULE.SSL_CTX(OpenSslVersionEnum.SSLV23.value))
+        self.assertRaises(RuntimeError, test_ssl.do_handshake_pump, b'')
+
     def test_pending(self):
         # No BIO attached to the SSL object
         test_ssl = self._NASSL_MODULE.SSL(self._NASSL_MODULE.SSL_CTX(OpenSslVersionEnum.SSLV23.value))
@@ -129,6 +264,16 @@ class Common_SSL_Tests(unittest.TestCase):
         test_ssl = self._NASSL_MODULE.SSL(self._NASSL_MODULE.SSL_CTX(OpenSslVersionEnum.SSLV23.value))
         self.assertRaises(TypeError, test_ssl.set_session, None)
 
+    def test_session_reused(self):
+        test_ssl = self._NASSL_MODULE.SSL(self._NASSL_MODULE.SSL_CTX(OpenSslVersionEnum.SSLV23.value))
+        self.assertFalse(test_ssl.session_reused())
+
+    def test_session_from_der_bad(self):
+        self.assertRaises(_nassl.OpenSSLError, self._NASSL_MODULE.SSL_SESSION.from_der, b'not a session')
+
+    def test_session_new_bad(self):
+        self.assertRaises(NotImplementedError, self._NASSL_MODULE.SSL_SESSION)
+
     def test_set_options_bad(self):
         test_ssl = self._NASSL_MODULE.SSL(self._NASSL_MODULE.SSL_CTX(OpenSslVersionEnum.SSLV23.value))
         self.assertGreaterEqual(test_ssl.set_options(123), 0)
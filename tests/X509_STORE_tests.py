@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+from __future__ import unicode_literals
+import io
+import os
+import unittest
+from nassl import _nassl, _nassl_legacy
+from nassl.ssl_client import OpenSslVersionEnum
+
+
+class Common_X509_STORE_Tests(unittest.TestCase):
+
+    # To be set in subclasses
+    _NASSL_MODULE = None
+
+    _CERT_PATH = os.path.join(os.path.dirname(__file__), 'openssl_server', 'server-self-signed-cert.pem')
+
+    @classmethod
+    def setUpClass(cls):
+        if cls is Common_X509_STORE_Tests:
+            raise unittest.SkipTest("Skip Common_X509_STORE_Tests tests, it's a base class")
+        super(Common_X509_STORE_Tests, cls).setUpClass()
+
+    def test_new(self):
+        self.assertTrue(self._NASSL_MODULE.X509_STORE())
+
+    def test_load_locations(self):
+        x509_store = self._NASSL_MODULE.X509_STORE()
+        self.assertIsNone(x509_store.load_locations(self._CERT_PATH))
+
+    def test_load_locations_bad(self):
+        x509_store = self._NASSL_MODULE.X509_STORE()
+        self.assertRaises(_nassl.OpenSSLError, x509_store.load_locations, 'tests')
+
+    def test_add_pem_certificates(self):
+        with io.open(self._CERT_PATH, 'rb') as cert_file:
+            pem_cert = cert_file.read()
+        x509_store = self._NASSL_MODULE.X509_STORE()
+        # Duplicate certificates are ignored
+        self.assertEqual(x509_store.add_pem_certificates(pem_cert + pem_cert), 2)
+
+    def test_add_pem_certificates_bad(self):
+        x509_store = self._NASSL_MODULE.X509_STORE()
+        self.assertRaises(ValueError, x509_store.add_pem_certificates, b'not a certificate')
+
+    def test_set_cert_store(self):
+        x509_store = self._NASSL_MODULE.X509_STORE()
+        x509_store.load_locations(self._CERT_PATH)
+        # The same store can be shared by multiple SSL_CTXs
+        ssl_ctx_list = [self._NASSL_MODULE.SSL_CTX(OpenSslVersionEnum.SSLV23.value) for _ in range(2)]
+        for ssl_ctx in ssl_ctx_list:
+            self.assertIsNone(ssl_ctx.set_cert_store(x509_store))
+        del x509_store
+        del ssl_ctx_list
+
+    def test_set_cert_store_bad(self):
+        ssl_ctx = self._NASSL_MODULE.SSL_CTX(OpenSslVersionEnum.SSLV23.value)
+        self.assertRaises(TypeError, ssl_ctx.set_cert_store, self._CERT_PATH)
+
+
+class Modern_X509_STORE_Tests(Common_X509_STORE_Tests):
+    _NASSL_MODULE = _nassl
+
+
+class Legacy_X509_STORE_Tests(Common_X509_STORE_Tests):
+    _NASSL_MODULE = _nassl_legacy
+
+
+def main():
+    unittest.main()
+
+if __name__ == '__main__':
+    main()
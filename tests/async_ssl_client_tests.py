@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import logging
+import socket
+import sys
+import unittest
+
+from nassl.ssl_client import OpenSslVersionEnum, OpenSslVerifyEnum
+from tests.openssl_server import VulnerableOpenSslServer, NotOnLinux64Error
+
+
+@unittest.skipIf(sys.version_info < (3, 5), 'asyncio clients require Python 3.5+')
+class CommonAsyncSslClientOnlineTests(unittest.TestCase):
+
+    # To be defined in subclasses
+    _SSL_CLIENT_CLS_NAME = None
+
+    @classmethod
+    def setUpClass(cls):
+        if cls is CommonAsyncSslClientOnlineTests:
+            raise unittest.SkipTest("Skip tests, it's a base class")
+        super(CommonAsyncSslClientOnlineTests, cls).setUpClass()
+
+    def test(self):
+        import asyncio
+        from nassl import async_ssl_client
+        ssl_client_cls = getattr(async_ssl_client, self._SSL_CLIENT_CLS_NAME)
+
+        # Given a server
+        try:
+            with VulnerableOpenSslServer() as server:
+                loop = asyncio.new_event_loop()
+                sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                sock.settimeout(5)
+                sock.connect((server.hostname, server.port))
+
+                ssl_client = ssl_client_cls(
+                    ssl_version=OpenSslVersionEnum.SSLV23,
+                    underlying_socket=sock,
+                    ssl_verify=OpenSslVerifyEnum.NONE,
+                    loop=loop,
+                )
+
+                # When doing a TLS handshake, it succeeds
+                try:
+                    loop.run_until_complete(ssl_client.do_handshake())
+                    self.assertTrue(ssl_client.is_handshake_completed())
+
+                    # When sending a GET request
+                    self.assertGreater(loop.run_until_complete(ssl_client.write(b'GET / HTTP/1.0\r\n\r\n')), 1)
+                    # It gets a response
+                    self.assertRegexpMatches(loop.run_until_complete(ssl_client.read(1024)), b'HTTP/1.0 200 ok')
+                finally:
+                    loop.run_until_complete(ssl_client.shutdown())
+                    sock.close()
+                    loop.close()
+
+        except NotOnLinux64Error:
+            logging.warning('WARNING: Not on Linux - skipping test')
+            return
+
+
+class ModernAsyncSslClientOnlineTests(CommonAsyncSslClientOnlineTests):
+
+    _SSL_CLIENT_CLS_NAME = 'AsyncSslClient'
+
+
+class LegacyAsyncSslClientOnlineTests(CommonAsyncSslClientOnlineTests):
+
+    _SSL_CLIENT_CLS_NAME = 'AsyncLegacySslClient'
+
+
+def main():
+    unittest.main()
+
+if __name__ == '__main__':
+    main()
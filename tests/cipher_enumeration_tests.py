@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import logging
+import unittest
+
+from nassl.cipher_enumeration import CipherEnumerator
+from nassl.legacy_ssl_client import LegacySslClient
+from nassl.ssl_client import OpenSslVersionEnum, SslClient
+from tests.openssl_server import VulnerableOpenSslServer, NotOnLinux64Error, ClientAuthenticationServerConfigurationEnum
+
+
+class CommonCipherEnumeratorOnlineTests(unittest.TestCase):
+
+    # To be defined in subclasses
+    _SSL_CLIENT_CLS = None
+
+    @classmethod
+    def setUpClass(cls):
+        if cls is CommonCipherEnumeratorOnlineTests:
+            raise unittest.SkipTest("Skip tests, it's a base class")
+        super(CommonCipherEnumeratorOnlineTests, cls).setUpClass()
+
+    def test(self):
+        # Given a server accepting all the cipher suites and following the client's preference
+        try:
+            with VulnerableOpenSslServer() as server:
+                enumerator = CipherEnumerator(server.hostname, server.port, self._SSL_CLIENT_CLS)
+
+                # When enumerating some of the cipher suites it supports
+                cipher_names = ['AES256-SHA', 'AES128-SHA', 'CAMELLIA256-SHA']
+                result = enumerator.enumerate(OpenSslVersionEnum.TLSV1, cipher_names + ['NOT-A-CIPHER'])
+
+                # All of them are found in the client's preference order
+                self.assertEqual(result.accepted_cipher_names, cipher_names)
+                self.assertFalse(result.server_has_cipher_preference)
+                # Using one handshake per accepted cipher suite, plus one to check the server's preference
+                self.assertEqual(result.handshakes_nb, len(cipher_names) + 1)
+
+        except NotOnLinux64Error:
+            logging.warning('WARNING: Not on Linux - skipping test')
+            return
+
+    def test_client_authentication(self):
+        # Given a server requiring client authentication
+        try:
+            with VulnerableOpenSslServer(
+                    client_auth_config=ClientAuthenticationServerConfigurationEnum.REQUIRED
+            ) as server:
+                enumerator = CipherEnumerator(server.hostname, server.port, self._SSL_CLIENT_CLS)
+
+                # When enumerating cipher suites, the server's requests for a client certificate do not prevent from
+                # finding the ones it selected
+                cipher_names = ['AES256-SHA', 'AES128-SHA']
+                result = enumerator.enumerate(OpenSslVersionEnum.TLSV1_2, cipher_names)
+                self.assertEqual(result.accepted_cipher_names, cipher_names)
+
+        except NotOnLinux64Error:
+            logging.warning('WARNING: Not on Linux - skipping test')
+            return
+
+    def test_get_candidate_cipher_names(self):
+        enumerator = CipherEnumerator('localhost', 443, self._SSL_CLIENT_CLS)
+        cipher_names = enumerator.get_candidate_cipher_names(OpenSslVersionEnum.TLSV1_2)
+        self.assertIn('AES128-SHA', cipher_names)
+        self.assertNotIn('TLS_AES_128_GCM_SHA256', cipher_names)
+
+
+class ModernCipherEnumeratorOnlineTests(CommonCipherEnumeratorOnlineTests):
+
+    _SSL_CLIENT_CLS = SslClient
+
+
+class LegacyCipherEnumeratorOnlineTests(CommonCipherEnumeratorOnlineTests):
+
+    _SSL_CLIENT_CLS = LegacySslClient
@@ -0,0 +1,43 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import unittest
+
+from nassl.connection_timings import ConnectionTimings
+
+
+class ConnectionTimingsTests(unittest.TestCase):
+
+    def test_record(self):
+        timings = ConnectionTimings()
+        timings.record('socket_attached', 1.0)
+        # A milestone is only recorded the first time it is reached
+        timings.record('socket_attached', 2.0)
+        self.assertEqual(timings.socket_attached, 1.0)
+
+    def test_io_counters(self):
+        timings = ConnectionTimings()
+        timings.record('socket_attached', 1.0)
+        # The I/O is counted towards the next milestone
+        timings.get_current_io_counters().bytes_sent += 100
+        self.assertEqual(timings.io_counters['client_hello_sent'].bytes_sent, 100)
+
+        # Including when a milestone was skipped
+        timings.record('client_hello_sent', 2.0)
+        timings.record('server_hello_received', 3.0)
+        timings.record('handshake_completed', 4.0)
+        timings.get_current_io_counters().recv_calls_nb += 1
+        self.assertEqual(timings.io_counters['first_application_data_received'].recv_calls_nb, 1)
+
+    def test_get_durations(self):
+        timings = ConnectionTimings()
+        timings.record('socket_attached', 1.0)
+        timings.record('client_hello_sent', 1.5)
+        timings.record('server_hello_received', 3.0)
+        timings.record('handshake_completed', 4.0)
+        self.assertEqual(
+            list(timings.get_durations().items()),
+            [('client_hello_sent', 0.5), ('server_hello_received', 1.5), ('handshake_completed', 1.0)]
+        )
@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import logging
+import os
+import unittest
+
+from nassl.group_enumeration import GroupEnumerator
+from nassl.legacy_ssl_client import LegacySslClient
+from nassl.ssl_client import OpenSslVersionEnum, SslClient
+from tests.openssl_server import VulnerableOpenSslServer, NotOnLinux64Error
+
+
+class CommonGroupEnumeratorOnlineTests(unittest.TestCase):
+
+    # To be defined in subclasses
+    _SSL_CLIENT_CLS = None
+    _EXPECTED_DHE_ACCEPTED_GROUPS = None
+
+    _FFDHE2048_PEM_PATH = os.path.join(os.path.dirname(__file__), 'openssl_server', 'ffdhe2048.pem')
+
+    @classmethod
+    def setUpClass(cls):
+        if cls is CommonGroupEnumeratorOnlineTests:
+            raise unittest.SkipTest("Skip tests, it's a base class")
+        super(CommonGroupEnumeratorOnlineTests, cls).setUpClass()
+
+    def test(self):
+        # Given a server using P-256 for ECDHE
+        try:
+            with VulnerableOpenSslServer() as server:
+                enumerator = GroupEnumerator(server.hostname, server.port, self._SSL_CLIENT_CLS)
+
+                # When enumerating some groups
+                result = enumerator.enumerate(OpenSslVersionEnum.TLSV1_2, ['secp384r1', 'prime256v1', 'secp521r1'])
+
+                # Only P-256 is accepted
+                self.assertEqual(result.accepted_groups, ['prime256v1'])
+                self.assertEqual(result.hello_retry_request_groups, [])
+                # Using one handshake per accepted group, plus the rejected one
+                self.assertEqual(result.handshakes_nb, 2)
+
+        except NotOnLinux64Error:
+            logging.warning('WARNING: Not on Linux - skipping test')
+            return
+
+    def test_dhe(self):
+        # Given a server using P-256 for ECDHE and the ffdhe2048 parameters for DHE
+        try:
+            with VulnerableOpenSslServer(dh_params_file=self._FFDHE2048_PEM_PATH) as server:
+                enumerator = GroupEnumerator(server.hostname, server.port, self._SSL_CLIENT_CLS)
+
+                # When enumerating elliptic curves and finite field groups
+                result = enumerator.enumerate(OpenSslVersionEnum.TLSV1_2, ['ffdhe3072', 'prime256v1', 'ffdhe2048'])
+
+                # The elliptic curves are exhausted before the finite field group used by the server is found
+                self.assertEqual(result.accepted_groups, self._EXPECTED_DHE_ACCEPTED_GROUPS)
+                self.assertFalse(result.has_custom_dh_parameters)
+
+        except NotOnLinux64Error:
+            logging.warning('WARNING: Not on Linux - skipping test')
+            return
+
+    def test_get_candidate_groups(self):
+        enumerator = GroupEnumerator('localhost', 443, self._SSL_CLIENT_CLS)
+        self.assertIn('prime256v1', enumerator.get_candidate_groups(OpenSslVersionEnum.TLSV1_2))
+
+
+class ModernGroupEnumeratorOnlineTests(CommonGroupEnumeratorOnlineTests):
+
+    _SSL_CLIENT_CLS = SslClient
+    _EXPECTED_DHE_ACCEPTED_GROUPS = ['prime256v1', 'ffdhe2048']
+
+
+class LegacyGroupEnumeratorOnlineTests(CommonGroupEnumeratorOnlineTests):
+
+    _SSL_CLIENT_CLS = LegacySslClient
+    # The legacy OpenSSL cannot identify finite field groups
+    _EXPECTED_DHE_ACCEPTED_GROUPS = ['prime256v1']
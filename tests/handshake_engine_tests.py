@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import logging
+import socket
+import sys
+import unittest
+
+from nassl.ssl_client import OpenSslVerifyEnum, SansIoSslClient
+from nassl.legacy_ssl_client import LegacySansIoSslClient
+from tests.openssl_server import VulnerableOpenSslServer, NotOnLinux64Error
+
+
+@unittest.skipIf(sys.version_info < (3, 4), 'the handshake engine requires Python 3.4+')
+class CommonHandshakeEngineOnlineTests(unittest.TestCase):
+
+    # To be defined in subclasses
+    _SSL_CLIENT_CLS = None
+
+    @classmethod
+    def setUpClass(cls):
+        if cls is CommonHandshakeEngineOnlineTests:
+            raise unittest.SkipTest("Skip tests, it's a base class")
+        super(CommonHandshakeEngineOnlineTests, cls).setUpClass()
+
+    def test(self):
+        from nassl.handshake_engine import HandshakeEngine, HandshakeJob
+
+        # Given a server
+        try:
+            with VulnerableOpenSslServer() as server:
+                # And a closed port on the same host
+                closed_sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                closed_sock.bind((server.hostname, 0))
+                closed_port = closed_sock.getsockname()[1]
+                closed_sock.close()
+
+                ssl_ctx_options = {'ssl_verify': OpenSslVerifyEnum.NONE}
+                jobs = [HandshakeJob((server.hostname, server.port), self._SSL_CLIENT_CLS, ssl_ctx_options)
+                        for _ in range(5)]
+                jobs.append(HandshakeJob((server.hostname, closed_port), self._SSL_CLIENT_CLS, ssl_ctx_options))
+
+                # When running the handshakes concurrently
+                results = list(HandshakeEngine(max_connections=3).run(jobs))
+
+                # All the jobs returned a result
+                self.assertEqual(len(results), 6)
+
+                # The handshakes with the server succeeded
+                successful_results = [result for result in results if result.is_successful]
+                self.assertEqual(len(successful_results), 5)
+                for result in successful_results:
+                    self.assertTrue(result.ssl_client.is_handshake_completed())
+                    self.assertIsNotNone(result.ssl_client.get_peer_certificate())
+
+                # And the connection to the closed port failed
+                failed_results = [result for result in results if not result.is_successful]
+                self.assertEqual(failed_results[0].job.address[1], closed_port)
+                self.assertIsInstance(failed_results[0].error, EnvironmentError)
+
+        except NotOnLinux64Error:
+            logging.warning('WARNING: Not on Linux - skipping test')
+            return
+
+
+class ModernHandshakeEngineOnlineTests(CommonHandshakeEngineOnlineTests):
+
+    _SSL_CLIENT_CLS = SansIoSslClient
+
+
+class LegacyHandshakeEngineOnlineTests(CommonHandshakeEngineOnlineTests):
+
+    _SSL_CLIENT_CLS = LegacySansIoSslClient
@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import os
+import socket
+import sys
+import unittest
+
+from nassl import happy_eyeballs
+
+
+class HappyEyeballsTests(unittest.TestCase):
+
+    def test_interleave_address_families(self):
+        addr_infos = [
+            (socket.AF_INET6, 1), (socket.AF_INET6, 2), (socket.AF_INET, 3), (socket.AF_INET, 4), (socket.AF_INET, 5)
+        ]
+        self.assertEqual(
+            [addr_info[1] for addr_info in happy_eyeballs._interleave_address_families(addr_infos)],
+            [1, 3, 2, 4, 5]
+        )
+
+    def test_create_connection(self):
+        # Given a server listening on localhost
+        server_sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        server_sock.bind(('127.0.0.1', 0))
+        server_sock.listen(1)
+        try:
+            # When connecting to it, it succeeds
+            sock = happy_eyeballs.create_connection('127.0.0.1', server_sock.getsockname()[1], timeout=5)
+            try:
+                self.assertEqual(sock.getpeername(), server_sock.getsockname())
+                # And the returned socket is a blocking socket with the timeout set
+                self.assertEqual(sock.gettimeout(), 5)
+            finally:
+                sock.close()
+        finally:
+            server_sock.close()
+
+    def test_create_connection_refused(self):
+        # Given a closed port
+        closed_sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        closed_sock.bind(('127.0.0.1', 0))
+        closed_port = closed_sock.getsockname()[1]
+        closed_sock.close()
+
+        # When connecting to it, the error is returned right away
+        self.assertRaises(socket.error, happy_eyeballs.create_connection, '127.0.0.1', closed_port, 5)
+
+    @unittest.skipIf(sys.platform == 'win32', 'file descriptors are not limited by FD_SETSIZE on Windows')
+    def test_create_connection_high_file_descriptor(self):
+        import resource
+        if resource.getrlimit(resource.RLIMIT_NOFILE)[0] < 1100:
+            raise unittest.SkipTest('the limit of open files is too low')
+
+        # Given a server listening on localhost, and a process with more than FD_SETSIZE open files
+        server_sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        server_sock.bind(('127.0.0.1', 0))
+        server_sock.listen(1)
+        duplicated_fds = [os.dup(server_sock.fileno()) for _ in range(1030)]
+        try:
+            # When connecting to the server, it succeeds although the socket's file descriptor is above FD_SETSIZE
+            sock = happy_eyeballs.create_connection('127.0.0.1', server_sock.getsockname()[1], timeout=5)
+            try:
+                self.assertGreater(sock.fileno(), 1024)
+                self.assertEqual(sock.getpeername(), server_sock.getsockname())
+            finally:
+                sock.close()
+        finally:
+            for fd in duplicated_fds:
+                os.close(fd)
+            server_sock.close()
@@ -3,6 +3,7 @@ from __future__ import absolute_import
 from __future__ import unicode_literals
 
 import os
+import re
 import shlex
 
 import subprocess
@@ -12,8 +13,15 @@ from sys import platform
 
 import logging
 import time
+from typing import Optional
 from typing import Text
 
+try:
+    from shutil import which
+except ImportError:
+    # Python 2
+    from distutils.spawn import find_executable as which
+
 # This module is taken from SSLyze
 
 
@@ -30,6 +38,11 @@ class NotOnLinux64Error(EnvironmentError):
     """
 
 
+class SystemOpenSslNotAvailableError(EnvironmentError):
+    """The system's openssl binary is missing or older than OpenSSL 1.1.1.
+    """
+
+
 class VulnerableOpenSslServer(object):
     """An OpenSSL server running the 1.0.1e version of OpenSSL, vilnerable to CCS Injection and Heartbleed.
     """
@@ -61,8 +74,13 @@ class VulnerableOpenSslServer(object):
         # type: () -> Text
         return cls._CLIENT_KEY_PATH
 
-    def __init__(self, client_auth_config=ClientAuthenticationServerConfigurationEnum.DISABLED):
-        # type: (ClientAuthenticationServerConfigurationEnum) -> None
+    def __init__(self, client_auth_config=ClientAuthenticationServerConfigurationEnum.DISABLED, client_ca_file=None,
+                 dh_params_file=None):
+        # type: (ClientAuthenticationServerConfigurationEnum, Optional[Text], Optional[Text]) -> None
+        """client_ca_file is the file of the CAs listed in the server's CertificateRequest; using a large trust store
+        makes the server's handshake flight larger than the client's BIO pair. dh_params_file is the file of the finite
+        field parameters used for DHE cipher suites, instead of the server's default 512-bit parameters.
+        """
         if platform not in ['linux', 'linux2']:
             raise NotOnLinux64Error()
 
@@ -100,6 +118,11 @@ class VulnerableOpenSslServer(object):
                 client_ca=self._CLIENT_CA_PATH,
             )
 
+        if client_ca_file:
+            self._command_line += ' -CAfile {}'.format(client_ca_file)
+        if dh_params_file:
+            self._command_line += ' -dhparam {}'.format(dh_params_file)
+
     def __enter__(self):
         logging.warning('Running s_server: "{}"'.format(self._command_line))
         args = shlex.split(self._command_line)
@@ -133,3 +156,27 @@ class VulnerableOpenSslServer(object):
         # Free the port that was used; not thread safe but should be fine
         self._AVAILABLE_LOCAL_PORTS.add(self.port)
         return False
+
+
+class SystemOpenSslServer(VulnerableOpenSslServer):
+    """An OpenSSL server running the system's openssl binary, for the features that the embedded OpenSSL 1.0.0e lacks,
+    such as X25519.
+    """
+
+    def __init__(self, groups=None):
+        # type: (Optional[Text]) -> None
+        """groups is the colon-separated list of groups the server accepts for the key exchange.
+        """
+        openssl_path = which('openssl')
+        if openssl_path is None:
+            raise SystemOpenSslNotAvailableError()
+
+        version_output = subprocess.check_output([openssl_path, 'version']).decode('ascii', 'replace')
+        version_match = re.match(r'OpenSSL (\d+)\.(\d+)\.(\d+)', version_output)
+        if not version_match or tuple(int(number) for number in version_match.groups()) < (1, 1, 1):
+            raise SystemOpenSslNotAvailableError()
+
+        self._OPENSSL_PATH = openssl_path
+        super(SystemOpenSslServer, self).__init__()
+        if groups:
+            self._command_line += ' -groups {}'.format(groups)
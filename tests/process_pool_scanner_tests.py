@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import logging
+import os
+import signal
+import sys
+import unittest
+
+from nassl.ssl_client import OpenSslVerifyEnum, SansIoSslClient
+from nassl.legacy_ssl_client import LegacySansIoSslClient
+from tests.openssl_server import VulnerableOpenSslServer, NotOnLinux64Error
+
+
+@unittest.skipIf(sys.version_info < (3, 4), 'the process pool scanner requires Python 3.4+')
+@unittest.skipIf(sys.platform == 'win32', 'the process pool scanner requires fork()')
+class CommonProcessPoolScannerOnlineTests(unittest.TestCase):
+
+    # To be defined in subclasses
+    _SSL_CLIENT_CLS = None
+
+    @classmethod
+    def setUpClass(cls):
+        if cls is CommonProcessPoolScannerOnlineTests:
+            raise unittest.SkipTest("Skip tests, it's a base class")
+        super(CommonProcessPoolScannerOnlineTests, cls).setUpClass()
+
+    def test(self):
+        from nassl.handshake_engine import HandshakeJob
+        from nassl.process_pool_scanner import ProcessPoolScanner
+
+        # Given a server
+        try:
+            with VulnerableOpenSslServer() as server:
+                ssl_ctx_options = {'ssl_verify': OpenSslVerifyEnum.NONE}
+                jobs = [HandshakeJob((server.hostname, server.port), self._SSL_CLIENT_CLS, ssl_ctx_options)
+                        for _ in range(4)]
+
+                # When spreading the handshakes over several processes
+                results = list(ProcessPoolScanner(processes_nb=2).run(jobs))
+
+                # Each job gets its result back from the worker processes
+                self.assertEqual(sorted(id(job) for job, _ in results), sorted(id(job) for job in jobs))
+                for _, summary in results:
+                    self.assertIsNone(summary.error)
+                    self.assertTrue(summary.cipher_name)
+                    self.assertEqual(len(summary.certificate_chain), 1)
+
+        except NotOnLinux64Error:
+            logging.warning('WARNING: Not on Linux - skipping test')
+            return
+
+    def test_killed_worker(self):
+        from nassl.handshake_engine import HandshakeJob
+        from nassl.process_pool_scanner import HandshakeSummary, ProcessPoolScanner
+
+        # Given a server
+        try:
+            with VulnerableOpenSslServer() as server:
+                ssl_ctx_options = {'ssl_verify': OpenSslVerifyEnum.NONE}
+                jobs = [HandshakeJob((server.hostname, server.port), self._SSL_CLIENT_CLS, ssl_ctx_options)
+                        for _ in range(4)]
+
+                # When one of the worker processes gets killed while performing its handshakes
+                def result_processor(result):
+                    if result.job is jobs[0]:
+                        os.kill(os.getpid(), signal.SIGKILL)
+                    return HandshakeSummary.from_handshake_result(result)
+
+                results = []
+                with self.assertRaises(RuntimeError):
+                    for job, summary in ProcessPoolScanner(processes_nb=2).run(jobs, result_processor):
+                        results.append(job)
+
+                # The scan does not hang, and the results of the other worker process are still returned
+                self.assertIn(jobs[1], results)
+                self.assertIn(jobs[3], results)
+                self.assertNotIn(jobs[0], results)
+
+        except NotOnLinux64Error:
+            logging.warning('WARNING: Not on Linux - skipping test')
+            return
+
+
+class ModernProcessPoolScannerOnlineTests(CommonProcessPoolScannerOnlineTests):
+
+    _SSL_CLIENT_CLS = SansIoSslClient
+
+
+class LegacyProcessPoolScannerOnlineTests(CommonProcessPoolScannerOnlineTests):
+
+    _SSL_CLIENT_CLS = LegacySansIoSslClient
@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import logging
+import unittest
+
+from nassl.protocol_version_probe import ProtocolVersionProber
+from nassl.ssl_client import OpenSslVersionEnum
+from tests.openssl_server import VulnerableOpenSslServer, NotOnLinux64Error, ClientAuthenticationServerConfigurationEnum
+
+
+class ProtocolVersionProberOnlineTests(unittest.TestCase):
+
+    def test(self):
+        # Given a server supporting SSL 2.0 up to TLS 1.2
+        try:
+            with VulnerableOpenSslServer() as server:
+                # When probing all the versions
+                results = ProtocolVersionProber(server.hostname, server.port).probe()
+
+                # Each version is probed using the OpenSSL module supporting it
+                self.assertEqual(list(results.items()), [
+                    (OpenSslVersionEnum.SSLV2, True),
+                    (OpenSslVersionEnum.SSLV3, True),
+                    (OpenSslVersionEnum.TLSV1, True),
+                    (OpenSslVersionEnum.TLSV1_1, True),
+                    (OpenSslVersionEnum.TLSV1_2, True),
+                    (OpenSslVersionEnum.TLSV1_3, False),
+                ])
+
+        except NotOnLinux64Error:
+            logging.warning('WARNING: Not on Linux - skipping test')
+            return
+
+    def test_client_authentication(self):
+        # Given a server requiring client authentication
+        try:
+            with VulnerableOpenSslServer(
+                    client_auth_config=ClientAuthenticationServerConfigurationEnum.REQUIRED
+            ) as server:
+                # When probing a version it supports, the server's request for a client certificate does not prevent
+                # from finding it
+                results = ProtocolVersionProber(server.hostname, server.port).probe([OpenSslVersionEnum.TLSV1_2])
+                self.assertEqual(list(results.items()), [(OpenSslVersionEnum.TLSV1_2, True)])
+
+        except NotOnLinux64Error:
+            logging.warning('WARNING: Not on Linux - skipping test')
+            return
+
+    def test_tls_versions(self):
+        # Given a server supporting TLS 1.2 at most
+        try:
+            with VulnerableOpenSslServer() as server:
+                # When only probing TLS versions, the highest version supported by the server is found
+                results = ProtocolVersionProber(server.hostname, server.port, max_connections=1).probe(
+                    [OpenSslVersionEnum.TLSV1_3, OpenSslVersionEnum.TLSV1_2]
+                )
+                self.assertEqual(list(results.items()), [
+                    (OpenSslVersionEnum.TLSV1_2, True),
+                    (OpenSslVersionEnum.TLSV1_3, False),
+                ])
+
+        except NotOnLinux64Error:
+            logging.warning('WARNING: Not on Linux - skipping test')
+            return
@@ -0,0 +1,46 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import logging
+import unittest
+
+from nassl.signature_algorithm_enumeration import SignatureAlgorithmEnumerator
+from nassl.ssl_client import OpenSslVersionEnum
+from tests.openssl_server import VulnerableOpenSslServer, NotOnLinux64Error
+
+
+class SignatureAlgorithmEnumeratorTests(unittest.TestCase):
+
+    def test_bad(self):
+        enumerator = SignatureAlgorithmEnumerator('localhost', 443)
+        # Signature algorithms cannot be negotiated
+        self.assertRaises(ValueError, enumerator.enumerate, OpenSslVersionEnum.TLSV1)
+        # Unknown signature algorithm
+        self.assertRaises(ValueError, enumerator.enumerate, OpenSslVersionEnum.TLSV1_2, ['RSA+MD5'])
+
+
+class SignatureAlgorithmEnumeratorOnlineTests(unittest.TestCase):
+
+    def test(self):
+        # Given a server with an RSA certificate
+        try:
+            with VulnerableOpenSslServer() as server:
+                enumerator = SignatureAlgorithmEnumerator(server.hostname, server.port)
+
+                # When enumerating some signature algorithms
+                result = enumerator.enumerate(
+                    OpenSslVersionEnum.TLSV1_2, ['RSA+SHA256', 'ECDSA+SHA256', 'RSA+SHA384']
+                )
+
+                # Only the RSA ones are accepted
+                self.assertEqual(result.get_accepted_signature_algorithms_by_type(), {
+                    'rsaEncryption': ['RSA+SHA256', 'RSA+SHA384']
+                })
+                # Using one handshake per accepted signature algorithm, plus the rejected one
+                self.assertEqual(result.handshakes_nb, 3)
+
+        except NotOnLinux64Error:
+            logging.warning('WARNING: Not on Linux - skipping test')
+            return
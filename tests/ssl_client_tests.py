@@ -4,13 +4,19 @@ from __future__ import absolute_import
 from __future__ import unicode_literals
 
 import logging
+import os
+import pickle
 import unittest
 import socket
+import threading
+import time
 
-from nassl._nassl import OpenSSLError
-from nassl.legacy_ssl_client import LegacySslClient
-from nassl.ssl_client import ClientCertificateRequested, OpenSslVersionEnum, OpenSslVerifyEnum, SslClient
-from tests.openssl_server import VulnerableOpenSslServer, NotOnLinux64Error, ClientAuthenticationServerConfigurationEnum
+from nassl._nassl import OpenSSLError, WantReadError
+from nassl.legacy_ssl_client import LegacySslClient, LegacySansIoSslClient
+from nassl.ssl_client import ClientCertificateRequested, OpenSslVersionEnum, OpenSslVerifyEnum, SslClient, \
+    SansIoSslClient, SslDeadlineExceeded, TlsMessage
+from tests.openssl_server import VulnerableOpenSslServer, NotOnLinux64Error, \
+    ClientAuthenticationServerConfigurationEnum, SystemOpenSslServer, SystemOpenSslNotAvailableError
 
 
 class CommonSslClientOnlineClientAuthenticationTests(unittest.TestCase):
@@ -162,6 +168,32 @@ class CommonSslClientOnlineTests(unittest.TestCase):
             sock.close()
 
 
+    def test_recv_into(self):
+        # Given an SslClient connecting to Google
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.settimeout(5)
+        sock.connect(('www.google.com', 443))
+
+        ssl_client = self._SSL_CLIENT_CLS(
+            ssl_version=OpenSslVersionEnum.SSLV23,
+            underlying_socket=sock,
+            ssl_verify=OpenSslVerifyEnum.NONE
+        )
+
+        try:
+            ssl_client.do_handshake()
+            ssl_client.write(b'GET / HTTP/1.0\r\n\r\n')
+
+            # When receiving the response into a buffer, it gets written to the buffer
+            buffer = bytearray(1024)
+            read_size = ssl_client.recv_into(buffer)
+            self.assertGreater(read_size, 0)
+            self.assertRegexpMatches(bytes(buffer[:read_size]), b'HTTP')
+        finally:
+            ssl_client.shutdown()
+            sock.close()
+
+
 class ModernSslClientOnlineTests(CommonSslClientOnlineTests):
 
     _SSL_CLIENT_CLS = SslClient
@@ -201,6 +233,491 @@ class LegacySslClientOnlineSsl2Tests(unittest.TestCase):
             return
 
 
+class CommonSslClientFlushTests(unittest.TestCase):
+
+    # To be defined in subclasses
+    _SSL_CLIENT_CLS = None
+
+    @classmethod
+    def setUpClass(cls):
+        if cls is CommonSslClientFlushTests:
+            raise unittest.SkipTest("Skip tests, it's a base class")
+        super(CommonSslClientFlushTests, cls).setUpClass()
+
+    def test_flush_ssl_engine(self):
+        # Given an SslClient that generated its ClientHello
+        client_sock, peer_sock = socket.socketpair()
+        ssl_client = self._SSL_CLIENT_CLS(underlying_socket=client_sock, ssl_verify=OpenSslVerifyEnum.NONE)
+        try:
+            self.assertFalse(ssl_client.do_handshake_step())
+
+            # When flushing the SSL engine, all the data is sent and the returned length is accurate
+            sent_size = ssl_client._flush_ssl_engine()
+            self.assertGreater(sent_size, 0)
+            peer_sock.settimeout(5)
+            received_data = peer_sock.recv(sent_size + 1024)
+            self.assertEqual(len(received_data), sent_size)
+
+            # And there is nothing left to send
+            self.assertEqual(ssl_client._flush_ssl_engine(), 0)
+        finally:
+            client_sock.close()
+            peer_sock.close()
+
+
+class ModernSslClientFlushTests(CommonSslClientFlushTests):
+
+    _SSL_CLIENT_CLS = SslClient
+
+
+class LegacySslClientFlushTests(CommonSslClientFlushTests):
+
+    _SSL_CLIENT_CLS = LegacySslClient
+
+
+class CommonSslClientDeadlineTests(unittest.TestCase):
+
+    # To be defined in subclasses
+    _SSL_CLIENT_CLS = None
+
+    @classmethod
+    def setUpClass(cls):
+        if cls is CommonSslClientDeadlineTests:
+            raise unittest.SkipTest("Skip tests, it's a base class")
+        super(CommonSslClientDeadlineTests, cls).setUpClass()
+
+    @staticmethod
+    def _trickle_server_hello(sock, stop_event):
+        # Send the beginning of a handshake record one byte at a time, slowly enough not to trigger the socket's timeout
+        for byte in bytearray(b'\x16\x03\x01\x10\x00' + b'\x02' * 100):
+            if stop_event.wait(0.1):
+                return
+            try:
+                sock.sendall(bytes(bytearray([byte])))
+            except socket.error:
+                return
+
+    def test_do_handshake_timeout(self):
+        # Given a peer sending its data one byte at a time
+        client_sock, peer_sock = socket.socketpair()
+        client_sock.settimeout(5)
+        stop_event = threading.Event()
+        trickle_thread = threading.Thread(target=self._trickle_server_hello, args=(peer_sock, stop_event))
+        trickle_thread.start()
+
+        ssl_client = self._SSL_CLIENT_CLS(underlying_socket=client_sock, ssl_verify=OpenSslVerifyEnum.NONE)
+        try:
+            # When doing the handshake with an overall timeout, it gets enforced despite the socket's longer timeout
+            start_time = time.time()
+            self.assertRaises(SslDeadlineExceeded, ssl_client.do_handshake, timeout=0.5)
+            self.assertLess(time.time() - start_time, 2)
+            # And the socket's timeout is left untouched
+            self.assertEqual(client_sock.gettimeout(), 5)
+        finally:
+            stop_event.set()
+            trickle_thread.join()
+            client_sock.close()
+            peer_sock.close()
+
+
+class ModernSslClientDeadlineTests(CommonSslClientDeadlineTests):
+
+    _SSL_CLIENT_CLS = SslClient
+
+
+class LegacySslClientDeadlineTests(CommonSslClientDeadlineTests):
+
+    _SSL_CLIENT_CLS = LegacySslClient
+
+
+class CommonSansIoSslClientOnlineTests(unittest.TestCase):
+
+    # To be defined in subclasses
+    _SSL_CLIENT_CLS = None
+
+    @classmethod
+    def setUpClass(cls):
+        if cls is CommonSansIoSslClientOnlineTests:
+            raise unittest.SkipTest("Skip tests, it's a base class")
+        super(CommonSansIoSslClientOnlineTests, cls).setUpClass()
+
+    def test(self):
+        # Given a server
+        try:
+            with VulnerableOpenSslServer() as server:
+                # And a sans-IO client driven using a socket
+                sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                sock.settimeout(5)
+                sock.connect((server.hostname, server.port))
+
+                ssl_client = self._SSL_CLIENT_CLS(
+                    ssl_version=OpenSslVersionEnum.SSLV23,
+                    ssl_verify=OpenSslVerifyEnum.NONE,
+                )
+
+                # When doing the handshake by exchanging the data manually, it succeeds
+                try:
+                    while not ssl_client.do_handshake_step():
+                        sock.sendall(ssl_client.pending_outgoing())
+                        ssl_client.feed_incoming(sock.recv(1024))
+                    self.assertTrue(ssl_client.is_handshake_completed())
+
+                    # When sending a GET request
+                    self.assertGreater(ssl_client.write(b'GET / HTTP/1.0\r\n\r\n'), 1)
+                    sock.sendall(ssl_client.pending_outgoing())
+
+                    # It gets a response
+                    response = None
+                    while response is None:
+                        try:
+                            response = ssl_client.read(1024)
+                        except WantReadError:
+                            ssl_client.feed_incoming(sock.recv(1024))
+                    self.assertRegexpMatches(response, b'HTTP/1.0 200 ok')
+                finally:
+                    ssl_client.shutdown()
+                    sock.close()
+
+        except NotOnLinux64Error:
+            logging.warning('WARNING: Not on Linux - skipping test')
+            return
+
+
+    _MOZILLA_PEM_PATH = os.path.join(os.path.dirname(__file__), '..', 'mozilla.pem')
+
+    def test_flight_larger_than_bio_pair(self):
+        # Given a server whose CertificateRequest lists all the CAs of a trust store, which makes its handshake flight
+        # larger than the client's BIO pair
+        try:
+            with VulnerableOpenSslServer(client_auth_config=ClientAuthenticationServerConfigurationEnum.OPTIONAL,
+                                         client_ca_file=self._MOZILLA_PEM_PATH) as server:
+                sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                sock.settimeout(5)
+                sock.connect((server.hostname, server.port))
+
+                ssl_client = self._SSL_CLIENT_CLS(
+                    ssl_version=OpenSslVersionEnum.TLSV1_2,
+                    ssl_verify=OpenSslVerifyEnum.NONE,
+                    ignore_client_authentication_requests=True,
+                )
+
+                try:
+                    self.assertFalse(ssl_client.do_handshake_step())
+                    sock.sendall(ssl_client.pending_outgoing())
+
+                    # When passing the server's whole flight to the client at once
+                    server_flight = b''
+                    sock.settimeout(1)
+                    try:
+                        while True:
+                            received_data = sock.recv(65536)
+                            if not received_data:
+                                break
+                            server_flight += received_data
+                    except socket.timeout:
+                        pass
+                    self.assertGreater(len(server_flight), 17 * 1024)
+                    ssl_client.feed_incoming(server_flight)
+
+                    # The client processes all of it and sends its second flight
+                    self.assertFalse(ssl_client.do_handshake_step())
+                    client_flight = ssl_client.pending_outgoing()
+                    self.assertTrue(client_flight)
+
+                    # And the handshake completes
+                    sock.settimeout(5)
+                    sock.sendall(client_flight)
+                    while not ssl_client.do_handshake_step():
+                        sock.sendall(ssl_client.pending_outgoing())
+                        ssl_client.feed_incoming(sock.recv(1024))
+                    self.assertTrue(ssl_client.is_handshake_completed())
+                finally:
+                    sock.close()
+
+        except NotOnLinux64Error:
+            logging.warning('WARNING: Not on Linux - skipping test')
+            return
+
+
+class ModernSansIoSslClientOnlineTests(CommonSansIoSslClientOnlineTests):
+
+    _SSL_CLIENT_CLS = SansIoSslClient
+
+
+class LegacySansIoSslClientOnlineTests(CommonSansIoSslClientOnlineTests):
+
+    _SSL_CLIENT_CLS = LegacySansIoSslClient
+
+
+class CommonSslClientOnlineConnectTests(unittest.TestCase):
+
+    # To be defined in subclasses
+    _SSL_CLIENT_CLS = None
+
+    @classmethod
+    def setUpClass(cls):
+        if cls is CommonSslClientOnlineConnectTests:
+            raise unittest.SkipTest("Skip tests, it's a base class")
+        super(CommonSslClientOnlineConnectTests, cls).setUpClass()
+
+    def test(self):
+        # Given a server
+        try:
+            with VulnerableOpenSslServer() as server:
+                ssl_client = self._SSL_CLIENT_CLS(ssl_verify=OpenSslVerifyEnum.NONE)
+
+                # When letting the client connect to the server, it creates the underlying socket
+                ssl_client.connect(server.hostname, server.port, timeout=5)
+                try:
+                    self.assertIsNotNone(ssl_client.get_underlying_socket())
+
+                    # And the handshake succeeds
+                    timings = ssl_client.enable_timings()
+                    ssl_client.do_handshake()
+                    self.assertTrue(ssl_client.is_handshake_completed())
+
+                    # And the handshake's milestones were recorded
+                    self.assertLessEqual(timings.socket_attached, timings.client_hello_sent)
+                    self.assertLessEqual(timings.client_hello_sent, timings.server_hello_received)
+                    self.assertLessEqual(timings.server_hello_received, timings.certificate_received)
+                    self.assertLessEqual(timings.certificate_received, timings.handshake_completed)
+                    self.assertGreater(timings.io_counters['server_hello_received'].bytes_received, 0)
+                finally:
+                    ssl_client.shutdown()
+                    ssl_client.get_underlying_socket().close()
+
+        except NotOnLinux64Error:
+            logging.warning('WARNING: Not on Linux - skipping test')
+            return
+
+
+class ModernSslClientOnlineConnectTests(CommonSslClientOnlineConnectTests):
+
+    _SSL_CLIENT_CLS = SslClient
+
+
+class LegacySslClientOnlineConnectTests(CommonSslClientOnlineConnectTests):
+
+    _SSL_CLIENT_CLS = LegacySslClient
+
+
+class CommonSslClientOnlineProbeTests(unittest.TestCase):
+
+    # To be defined in subclasses
+    _SSL_CLIENT_CLS = None
+
+    @classmethod
+    def setUpClass(cls):
+        if cls is CommonSslClientOnlineProbeTests:
+            raise unittest.SkipTest("Skip tests, it's a base class")
+        super(CommonSslClientOnlineProbeTests, cls).setUpClass()
+
+    def test(self):
+        # Given a server
+        try:
+            with VulnerableOpenSslServer() as server:
+                sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                sock.settimeout(5)
+                sock.connect((server.hostname, server.port))
+
+                ssl_client = self._SSL_CLIENT_CLS(
+                    ssl_version=OpenSslVersionEnum.TLSV1_2,
+                    underlying_socket=sock,
+                    ssl_verify=OpenSslVerifyEnum.NONE,
+                )
+                ssl_client.set_cipher_list('AES128-SHA')
+                ssl_client.enable_message_trace()
+
+                # When probing the server, it returns the protocol version and cipher suite selected by the server
+                try:
+                    self.assertEqual(ssl_client.do_probe(), (OpenSslVersionEnum.TLSV1_2, 'AES128-SHA'))
+                    # And the rest of the handshake was skipped
+                    self.assertFalse(ssl_client.is_handshake_completed())
+                    sent_messages = [message for message in ssl_client.get_message_trace() if message.is_sent]
+                    self.assertEqual([message.handshake_type for message in sent_messages],
+                                     [TlsMessage.HANDSHAKE_TYPE_CLIENT_HELLO])
+                finally:
+                    ssl_client.shutdown()
+                    sock.close()
+
+        except NotOnLinux64Error:
+            logging.warning('WARNING: Not on Linux - skipping test')
+            return
+
+
+class ModernSslClientOnlineProbeTests(CommonSslClientOnlineProbeTests):
+
+    _SSL_CLIENT_CLS = SslClient
+
+
+class LegacySslClientOnlineProbeTests(CommonSslClientOnlineProbeTests):
+
+    _SSL_CLIENT_CLS = LegacySslClient
+
+
+class CommonSslClientOnlineKeyExchangeTests(unittest.TestCase):
+
+    # To be defined in subclasses
+    _SSL_CLIENT_CLS = None
+
+    @classmethod
+    def setUpClass(cls):
+        if cls is CommonSslClientOnlineKeyExchangeTests:
+            raise unittest.SkipTest("Skip tests, it's a base class")
+        super(CommonSslClientOnlineKeyExchangeTests, cls).setUpClass()
+
+    def test_get_ecdh_parameters(self):
+        # Given a server using ECDHE with the P-256 curve
+        try:
+            with VulnerableOpenSslServer() as server:
+                ssl_client = self._SSL_CLIENT_CLS(
+                    ssl_version=OpenSslVersionEnum.TLSV1_2,
+                    ssl_verify=OpenSslVerifyEnum.NONE,
+                )
+                ssl_client.set_cipher_list('ECDHE')
+                ssl_client.connect(server.hostname, server.port)
+
+                try:
+                    ssl_client.do_handshake()
+
+                    # When retrieving the key exchange parameters, they are returned without parsing any text
+                    ecdh_params = ssl_client.get_ecdh_parameters()
+                    self.assertEqual(ecdh_params['group_size'], 256)
+                    self.assertEqual(ecdh_params['curve_name'], 'prime256v1')
+                    self.assertEqual(ecdh_params['nist_curve_name'], 'P-256')
+                    self.assertEqual(ecdh_params['field_type'], 'prime-field')
+                    self.assertEqual(ecdh_params['cofactor'], b'\x01')
+                    self.assertEqual(len(ecdh_params['prime']), 32)
+                    # The server's uncompressed public point
+                    self.assertEqual(len(ecdh_params['public_key']), 65)
+
+                    # And DH was not used
+                    self.assertRaises(TypeError, ssl_client.get_dh_parameters)
+                finally:
+                    ssl_client.get_underlying_socket().close()
+
+        except NotOnLinux64Error:
+            logging.warning('WARNING: Not on Linux - skipping test')
+            return
+
+
+class ModernSslClientOnlineKeyExchangeTests(CommonSslClientOnlineKeyExchangeTests):
+
+    _SSL_CLIENT_CLS = SslClient
+
+    def test_get_ecdh_parameters_x25519(self):
+        # Given a server using ECDHE with X25519
+        try:
+            with SystemOpenSslServer(groups='X25519') as server:
+                ssl_client = SslClient(ssl_version=OpenSslVersionEnum.TLSV1_2, ssl_verify=OpenSslVerifyEnum.NONE)
+                ssl_client.set_cipher_list('ECDHE')
+                ssl_client.connect(server.hostname, server.port)
+
+                try:
+                    ssl_client.do_handshake()
+
+                    # When retrieving the key exchange parameters, the curve is described by its name only
+                    ecdh_params = ssl_client.get_ecdh_parameters()
+                    self.assertEqual(ecdh_params['curve_name'], 'X25519')
+                    self.assertEqual(ecdh_params['group_size'], 253)
+                    self.assertIsNone(ecdh_params['nist_curve_name'])
+                    self.assertIsNone(ecdh_params['prime'])
+                    self.assertIsNone(ecdh_params['generator'])
+                    # And the server's raw public key is returned
+                    self.assertEqual(len(ecdh_params['public_key']), 32)
+                finally:
+                    ssl_client.get_underlying_socket().close()
+
+        except (NotOnLinux64Error, SystemOpenSslNotAvailableError):
+            logging.warning('WARNING: OpenSSL 1.1.1+ not available - skipping test')
+            return
+
+
+class LegacySslClientOnlineKeyExchangeTests(CommonSslClientOnlineKeyExchangeTests):
+
+    _SSL_CLIENT_CLS = LegacySslClient
+
+    def test_get_dh_param(self):
+        # Given a server using DHE with its default 512-bit parameters
+        try:
+            with VulnerableOpenSslServer() as server:
+                ssl_client = LegacySslClient(ssl_version=OpenSslVersionEnum.TLSV1, ssl_verify=OpenSslVerifyEnum.NONE)
+                ssl_client.set_cipher_list('DHE')
+                ssl_client.connect(server.hostname, server.port)
+
+                try:
+                    ssl_client.do_handshake()
+
+                    # The parameters are still returned in the format used by previous versions of nassl
+                    dh_param = ssl_client.get_dh_param()
+                    self.assertEqual(dh_param['Type'], 'DH')
+                    self.assertEqual(dh_param['GroupSize'], '512')
+                    self.assertEqual(dh_param['Generator'], '2')
+                    self.assertTrue(dh_param['prime'].startswith('0x'))
+
+                    self.assertRaises(TypeError, ssl_client.get_ecdh_param)
+                finally:
+                    ssl_client.get_underlying_socket().close()
+
+        except NotOnLinux64Error:
+            logging.warning('WARNING: Not on Linux - skipping test')
+            return
+
+
+class CommonSslClientOnlineSessionTests(unittest.TestCase):
+
+    # To be defined in subclasses
+    _SSL_CLIENT_CLS = None
+
+    @classmethod
+    def setUpClass(cls):
+        if cls is CommonSslClientOnlineSessionTests:
+            raise unittest.SkipTest("Skip tests, it's a base class")
+        super(CommonSslClientOnlineSessionTests, cls).setUpClass()
+
+    def _do_handshake(self, server, ssl_session=None):
+        ssl_client = self._SSL_CLIENT_CLS(ssl_version=OpenSslVersionEnum.TLSV1_2, ssl_verify=OpenSslVerifyEnum.NONE)
+        if ssl_session:
+            ssl_client.set_session(ssl_session)
+        ssl_client.connect(server.hostname, server.port)
+        try:
+            ssl_client.do_handshake()
+        finally:
+            ssl_client.get_underlying_socket().close()
+        return ssl_client.get_session()
+
+    def test_pickle_session(self):
+        # Given a session established with a server
+        try:
+            with VulnerableOpenSslServer() as server:
+                ssl_session = self._do_handshake(server)
+
+                # When pickling and unpickling it, as when sending it to another process
+                unpickled_session = pickle.loads(pickle.dumps(ssl_session))
+
+                # It is the same session
+                self.assertEqual(unpickled_session.to_der(), ssl_session.to_der())
+                self.assertEqual(unpickled_session.as_text(), ssl_session.as_text())
+
+                # And it can be resumed
+                resumed_session = self._do_handshake(server, unpickled_session)
+                self.assertEqual(resumed_session.to_der(), ssl_session.to_der())
+
+        except NotOnLinux64Error:
+            logging.warning('WARNING: Not on Linux - skipping test')
+            return
+
+
+class ModernSslClientOnlineSessionTests(CommonSslClientOnlineSessionTests):
+
+    _SSL_CLIENT_CLS = SslClient
+
+
+class LegacySslClientOnlineSessionTests(CommonSslClientOnlineSessionTests):
+
+    _SSL_CLIENT_CLS = LegacySslClient
+
+
 class ModernSslClientOnlineTls13Tests(unittest.TestCase):
     def test_tls_1_3(self):
         sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import logging
+import os
+import socket
+import unittest
+
+from nassl.legacy_ssl_client import LegacySslClient
+from nassl.ssl_client import OpenSslVersionEnum, OpenSslVerifyEnum, SslClient
+from nassl.ssl_context_cache import SslContextCache
+from tests.openssl_server import VulnerableOpenSslServer, NotOnLinux64Error
+
+
+class CommonSslContextCacheTests(unittest.TestCase):
+
+    # To be defined in subclasses
+    _SSL_CLIENT_CLS = None
+
+    _MOZILLA_PEM_PATH = os.path.join(os.path.dirname(__file__), '..', 'mozilla.pem')
+
+    @classmethod
+    def setUpClass(cls):
+        if cls is CommonSslContextCacheTests:
+            raise unittest.SkipTest("Skip tests, it's a base class")
+        super(CommonSslContextCacheTests, cls).setUpClass()
+
+    def test_same_configuration(self):
+        cache = SslContextCache()
+        ssl_ctx = cache.get_ssl_ctx(self._SSL_CLIENT_CLS, ssl_verify_locations=self._MOZILLA_PEM_PATH)
+        self.assertIs(ssl_ctx, cache.get_ssl_ctx(self._SSL_CLIENT_CLS, ssl_verify_locations=self._MOZILLA_PEM_PATH))
+        self.assertEqual(len(cache), 1)
+
+    def test_different_configurations(self):
+        cache = SslContextCache()
+        ssl_ctx = cache.get_ssl_ctx(self._SSL_CLIENT_CLS, ssl_version=OpenSslVersionEnum.TLSV1_2)
+        self.assertIsNot(ssl_ctx, cache.get_ssl_ctx(self._SSL_CLIENT_CLS, ssl_version=OpenSslVersionEnum.TLSV1))
+        self.assertIsNot(ssl_ctx, cache.get_ssl_ctx(self._SSL_CLIENT_CLS, ssl_version=OpenSslVersionEnum.TLSV1_2,
+                                                    ssl_verify=OpenSslVerifyEnum.NONE))
+        self.assertEqual(len(cache), 3)
+
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+        self.assertIsNot(ssl_ctx, cache.get_ssl_ctx(self._SSL_CLIENT_CLS, ssl_version=OpenSslVersionEnum.TLSV1_2))
+
+    def test_ssl_ctx_and_ctx_settings(self):
+        ssl_ctx = SslContextCache().get_ssl_ctx(self._SSL_CLIENT_CLS)
+        self.assertRaises(ValueError, self._SSL_CLIENT_CLS, ssl_ctx=ssl_ctx,
+                          ssl_verify_locations=self._MOZILLA_PEM_PATH)
+
+    def test_online(self):
+        # Given a server
+        try:
+            with VulnerableOpenSslServer() as server:
+                # And a shared SSL_CTX
+                ssl_ctx = SslContextCache().get_ssl_ctx(self._SSL_CLIENT_CLS, ssl_verify=OpenSslVerifyEnum.NONE)
+
+                # When doing several handshakes with clients using that SSL_CTX, they succeed
+                for _ in range(2):
+                    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                    sock.settimeout(5)
+                    sock.connect((server.hostname, server.port))
+
+                    ssl_client = self._SSL_CLIENT_CLS(underlying_socket=sock, ssl_ctx=ssl_ctx)
+                    try:
+                        ssl_client.do_handshake()
+                        self.assertTrue(ssl_client.is_handshake_completed())
+                    finally:
+                        ssl_client.shutdown()
+                        sock.close()
+
+        except NotOnLinux64Error:
+            logging.warning('WARNING: Not on Linux - skipping test')
+            return
+
+
+class ModernSslContextCacheTests(CommonSslContextCacheTests):
+
+    _SSL_CLIENT_CLS = SslClient
+
+    def test_modules_do_not_share(self):
+        cache = SslContextCache()
+        ssl_ctx = cache.get_ssl_ctx(SslClient)
+        self.assertIsNot(ssl_ctx, cache.get_ssl_ctx(LegacySslClient))
+        self.assertRaises(TypeError, SslClient, ssl_ctx=cache.get_ssl_ctx(LegacySslClient))
+
+
+class LegacySslContextCacheTests(CommonSslContextCacheTests):
+
+    _SSL_CLIENT_CLS = LegacySslClient
+
+
+def main():
+    unittest.main()
+
+
+if __name__ == '__main__':
+    main()
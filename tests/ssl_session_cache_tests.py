@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import logging
+import unittest
+
+from nassl.legacy_ssl_client import LegacySslClient
+from nassl.ssl_client import OpenSslVersionEnum, OpenSslVerifyEnum, SslClient
+from nassl.ssl_session_cache import SslSessionCache
+from tests.openssl_server import VulnerableOpenSslServer, NotOnLinux64Error
+
+
+class CommonSslSessionCacheOnlineTests(unittest.TestCase):
+
+    # To be defined in subclasses
+    _SSL_CLIENT_CLS = None
+
+    @classmethod
+    def setUpClass(cls):
+        if cls is CommonSslSessionCacheOnlineTests:
+            raise unittest.SkipTest("Skip tests, it's a base class")
+        super(CommonSslSessionCacheOnlineTests, cls).setUpClass()
+
+    def _do_handshake(self, server, session_cache, cipher_list=None):
+        ssl_client = self._SSL_CLIENT_CLS(ssl_version=OpenSslVersionEnum.TLSV1_2, ssl_verify=OpenSslVerifyEnum.NONE)
+        if cipher_list:
+            ssl_client.set_cipher_list(cipher_list)
+        ssl_client.enable_session_cache(session_cache)
+        ssl_client.connect(server.hostname, server.port)
+        try:
+            ssl_client.do_handshake()
+        finally:
+            # Closing the connection without an SSL shutdown must not prevent the session from being resumed
+            ssl_client.get_underlying_socket().close()
+        return ssl_client
+
+    def test(self):
+        # Given a server supporting session resumption
+        try:
+            with VulnerableOpenSslServer() as server:
+                session_cache = SslSessionCache()
+
+                # When connecting to it with a session cache, a full handshake is performed
+                self.assertFalse(self._do_handshake(server, session_cache).is_session_reused())
+                self.assertEqual(len(session_cache), 1)
+
+                # And the next connections resume the cached session
+                self.assertTrue(self._do_handshake(server, session_cache).is_session_reused())
+                self.assertTrue(self._do_handshake(server, session_cache).is_session_reused())
+                self.assertEqual(len(session_cache), 1)
+
+                # Until the cache is cleared
+                session_cache.clear()
+                self.assertFalse(self._do_handshake(server, session_cache).is_session_reused())
+
+        except NotOnLinux64Error:
+            logging.warning('WARNING: Not on Linux - skipping test')
+            return
+
+    def test_cipher_list(self):
+        # Given a session cached by a client offering some cipher suites
+        try:
+            with VulnerableOpenSslServer() as server:
+                session_cache = SslSessionCache()
+                self._do_handshake(server, session_cache, 'AES128-SHA')
+
+                # When connecting with different cipher suites, the cached session is not resumed
+                self.assertFalse(self._do_handshake(server, session_cache, 'AES256-SHA').is_session_reused())
+                self.assertEqual(len(session_cache), 2)
+
+                # But it is with the same ones
+                self.assertTrue(self._do_handshake(server, session_cache, 'AES128-SHA').is_session_reused())
+
+        except NotOnLinux64Error:
+            logging.warning('WARNING: Not on Linux - skipping test')
+            return
+
+    def test_eviction(self):
+        # Given a session established with a server
+        try:
+            with VulnerableOpenSslServer() as server:
+                ssl_session = self._do_handshake(server, SslSessionCache()).get_session()
+
+                # When caching more sessions than max_size, the least recently used ones get evicted
+                session_cache = SslSessionCache(max_size=2)
+                session_cache.set_session('key1', ssl_session)
+                session_cache.set_session('key2', ssl_session)
+                self.assertIsNotNone(session_cache.get_session('key1'))
+                session_cache.set_session('key3', ssl_session)
+                self.assertEqual(len(session_cache), 2)
+                self.assertIsNone(session_cache.get_session('key2'))
+                self.assertIsNotNone(session_cache.get_session('key1'))
+
+                # And expired sessions are not cached
+                session_cache = SslSessionCache(max_lifetime=0)
+                session_cache.set_session('key1', ssl_session)
+                self.assertIsNone(session_cache.get_session('key1'))
+
+        except NotOnLinux64Error:
+            logging.warning('WARNING: Not on Linux - skipping test')
+            return
+
+    def test_bad_max_size(self):
+        self.assertRaises(ValueError, SslSessionCache, max_size=0)
+
+
+class ModernSslSessionCacheOnlineTests(CommonSslSessionCacheOnlineTests):
+
+    _SSL_CLIENT_CLS = SslClient
+
+
+class LegacySslSessionCacheOnlineTests(CommonSslSessionCacheOnlineTests):
+
+    _SSL_CLIENT_CLS = LegacySslClient
@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import io
+import logging
+import os
+import socket
+import unittest
+
+from nassl.legacy_ssl_client import LegacySslClient
+from nassl.ssl_client import OpenSslVerifyEnum, SslClient
+from nassl.trust_store import TrustStore
+from tests.openssl_server import VulnerableOpenSslServer, NotOnLinux64Error
+
+
+class TrustStoreTests(unittest.TestCase):
+
+    _CERT_PATH = os.path.join(os.path.dirname(__file__), 'openssl_server', 'server-self-signed-cert.pem')
+
+    def test_from_file(self):
+        trust_store = TrustStore.from_file(self._CERT_PATH)
+        self.assertEqual(trust_store.path, self._CERT_PATH)
+
+    def test_from_file_bad(self):
+        self.assertRaises(IOError, TrustStore.from_file, 'does_not_exist.pem')
+
+    def test_from_pem_bad(self):
+        self.assertRaises(ValueError, TrustStore.from_pem, b'not a certificate')
+
+
+class CommonTrustStoreOnlineTests(unittest.TestCase):
+
+    # To be defined in subclasses
+    _SSL_CLIENT_CLS = None
+
+    _CERT_PATH = os.path.join(os.path.dirname(__file__), 'openssl_server', 'server-self-signed-cert.pem')
+
+    _X509_V_ERR_CERT_HAS_EXPIRED = 10
+    _X509_V_ERR_DEPTH_ZERO_SELF_SIGNED_CERT = 18
+
+    @classmethod
+    def setUpClass(cls):
+        if cls is CommonTrustStoreOnlineTests:
+            raise unittest.SkipTest("Skip tests, it's a base class")
+        super(CommonTrustStoreOnlineTests, cls).setUpClass()
+
+    def _get_verify_result(self, server, ssl_verify_locations):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.settimeout(5)
+        sock.connect((server.hostname, server.port))
+
+        ssl_client = self._SSL_CLIENT_CLS(
+            underlying_socket=sock,
+            ssl_verify=OpenSslVerifyEnum.NONE,
+            ssl_verify_locations=ssl_verify_locations,
+        )
+        try:
+            ssl_client.do_handshake()
+            return ssl_client.get_certificate_chain_verify_result()[0]
+        finally:
+            ssl_client.shutdown()
+            sock.close()
+
+    def test(self):
+        # Given a server with a self-signed certificate
+        try:
+            with VulnerableOpenSslServer() as server:
+                # And a trust store containing that certificate
+                with io.open(self._CERT_PATH, 'rb') as cert_file:
+                    trust_store = TrustStore.from_pem(cert_file.read())
+
+                # When validating the server's certificate with the trust store, the certificate is trusted (but it
+                # expired a while ago)
+                self.assertEqual(self._get_verify_result(server, trust_store), self._X509_V_ERR_CERT_HAS_EXPIRED)
+                # Same when the trust store gets shared with another client
+                self.assertEqual(self._get_verify_result(server, trust_store), self._X509_V_ERR_CERT_HAS_EXPIRED)
+
+                # And when not supplying the trust store, the certificate is not trusted
+                self.assertEqual(self._get_verify_result(server, None), self._X509_V_ERR_DEPTH_ZERO_SELF_SIGNED_CERT)
+
+        except NotOnLinux64Error:
+            logging.warning('WARNING: Not on Linux - skipping test')
+            return
+
+
+class ModernTrustStoreOnlineTests(CommonTrustStoreOnlineTests):
+
+    _SSL_CLIENT_CLS = SslClient
+
+
+class LegacyTrustStoreOnlineTests(CommonTrustStoreOnlineTests):
+
+    _SSL_CLIENT_CLS = LegacySslClient
+
+
+def main():
+    unittest.main()
+
+
+if __name__ == '__main__':
+    main()